@@ -0,0 +1,177 @@
+import builtins
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.dirname(BENCHMARK_DIR)
+
+# The check scripts import the homebuddy_preprocessing package next to them
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, BENCHMARK_DIR)
+
+from synthetic_dataset import generate_dataset  # noqa: E402
+
+NUM_CLASSES = 6
+
+
+# This function loads one of the hyphenated check scripts as a module
+def load_script(name: str):
+    path = os.path.join(SCRIPTS_DIR, name + ".py")
+    spec = importlib.util.spec_from_file_location(name.replace("-", "_"), path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# This function returns every benchmarked check as name -> callable(split_dir).
+# Caches built by earlier runs are disabled or removed, so each run does the full work.
+def build_checks(workers: int = 1) -> Dict[str, Callable[[str], None]]:
+    quality = load_script("check-image-quality")
+    normalization = load_script("check-normalization")
+    annotation = load_script("check-annotation")
+    image_size = load_script("check-image-size")
+    corrupted = load_script("check-corrupted-files")
+    image_labels = load_script("check-image-labels")
+    ids = load_script("check-ids")
+    duplicate = load_script("check-duplicate")
+    from homebuddy_preprocessing import image_audit
+    from homebuddy_preprocessing.label_index import default_index_dir
+
+    def images(split_dir):
+        return os.path.join(split_dir, "images")
+
+    def labels(split_dir):
+        return os.path.join(split_dir, "labels")
+
+    def cold_annotation(split_dir):
+        shutil.rmtree(default_index_dir(labels(split_dir)), ignore_errors=True)
+        annotation.validate_and_clean_annotations(labels(split_dir), images(split_dir), num_classes=NUM_CLASSES)
+
+    def cold_ids(split_dir):
+        shutil.rmtree(default_index_dir(labels(split_dir)), ignore_errors=True)
+        ids.count_class_ids(labels(split_dir), num_classes=NUM_CLASSES)
+
+    return {
+        "check-image-quality": lambda d: quality.check_and_clean_quality(images(d), labels(d), workers=workers, use_cache=False),
+        "check-image-quality-fast": lambda d: quality.check_and_clean_quality(images(d), labels(d), workers=workers, use_cache=False, reduce_factor=4),
+        "check-normalization": lambda d: normalization.check_and_clean_pixel_range(images(d), labels(d), workers=workers, use_cache=False),
+        "check-annotation": cold_annotation,
+        "check-image-size": lambda d: image_size.check_and_clean_large_images(images(d), labels(d)),
+        "check-corrupted-files": lambda d: corrupted.check_and_clean_dataset(images(d), labels(d)),
+        "check-image-labels": lambda d: image_labels.check_and_clean_labels(images(d), labels(d)),
+        "check-ids": cold_ids,
+        "check-duplicate": lambda d: duplicate.find_duplicate_images(images(d), workers=workers),
+        "image_audit": lambda d: image_audit.audit_images(images(d), use_cache=False),
+    }
+
+
+# This function times one check, best of several runs.
+# Deletion prompts are answered "n" and the check's own output is discarded.
+def time_check(check: Callable[[str], None], split_dir: str, repeats: int) -> float:
+    real_input = builtins.input
+    builtins.input = lambda *args: "n"
+    try:
+        best = float("inf")
+        for _ in range(repeats):
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                check(split_dir)
+                best = min(best, time.perf_counter() - start)
+        return best
+    finally:
+        builtins.input = real_input
+
+
+# This function generates the dataset for one size, reusing it when it already exists
+def prepare_dataset(work_dir: str, num_images: int, seed: int) -> str:
+    root = os.path.join(work_dir, f"synthetic-{num_images}")
+    split_dir = os.path.join(root, "train")
+    marker = os.path.join(root, "generated.json")
+
+    if not os.path.exists(marker):
+        shutil.rmtree(root, ignore_errors=True)
+        print(f"Generating synthetic dataset with {num_images} images...")
+        counts = generate_dataset(root, num_images=num_images, num_classes=NUM_CLASSES, seed=seed)
+        with open(marker, "w") as f:
+            json.dump(counts, f)
+    return split_dir
+
+
+# This function compares results with a baseline and returns the checks that got slower than the tolerance.
+# Differences below min_delta seconds are timer noise on the fast label checks and are never flagged.
+def find_regressions(results: Dict, baseline: Dict, tolerance: float, min_delta: float = 0.01) -> List[str]:
+    regressions = []
+    for size, checks in results.items():
+        for name, seconds in checks.items():
+            old = baseline.get(size, {}).get(name)
+            if old and seconds > old * (1 + tolerance) and seconds - old > min_delta:
+                regressions.append(f"{name} @ {size} images: {old:.3f}s -> {seconds:.3f}s (+{100 * (seconds / old - 1):.0f}%)")
+    return regressions
+
+
+# This function runs every check at several dataset sizes and compares the timings with a stored baseline.
+# With update_baseline=True (or when no baseline exists yet) the results become the new baseline.
+# Returns the list of regressions; timings within tolerance of the baseline are not flagged.
+def run_benchmarks(
+    sizes: Sequence[int] = (100, 500, 2000),
+    work_dir: str = os.path.join(BENCHMARK_DIR, "work"),
+    baseline_path: str = os.path.join(BENCHMARK_DIR, "baseline.json"),
+    checks: Optional[Sequence[str]] = None,
+    repeats: int = 3,
+    tolerance: float = 0.2,
+    workers: int = 1,
+    update_baseline: bool = False,
+    seed: int = 0,
+) -> List[str]:
+
+    all_checks = build_checks(workers)
+    selected = {name: all_checks[name] for name in (checks or all_checks)}
+
+    results: Dict[str, Dict[str, float]] = {}
+    for num_images in sizes:
+        split_dir = prepare_dataset(work_dir, num_images, seed)
+        results[str(num_images)] = {}
+        print(f"\n---- {num_images} images ----")
+        for name, check in selected.items():
+            seconds = time_check(check, split_dir, repeats)
+            results[str(num_images)][name] = round(seconds, 4)
+            print(f"{name:>24}: {seconds:8.3f}s  {num_images / seconds:10.1f} files/s")
+
+    baseline = None
+    if os.path.exists(baseline_path):
+        with open(baseline_path, "r") as f:
+            baseline = json.load(f)
+
+    regressions = []
+    if baseline:
+        if baseline.get("machine") != platform.node():
+            print(f"\nWarning: baseline was recorded on '{baseline.get('machine')}', timings may not be comparable.")
+        regressions = find_regressions(results, baseline["results"], tolerance)
+
+        print("\n**** SUMMARY ****")
+        if regressions:
+            print(f"{len(regressions)} regressions (more than {100 * tolerance:.0f}% slower than baseline):")
+            for line in regressions:
+                print(f" - {line}")
+        else:
+            print("No regressions against the baseline.")
+
+    if update_baseline or baseline is None:
+        with open(baseline_path, "w") as f:
+            json.dump({"machine": platform.node(), "python": platform.python_version(), "repeats": repeats, "results": results}, f, indent=2)
+        print(f"\nBaseline saved to {baseline_path}")
+
+    return regressions
+
+
+if __name__ == "__main__":
+    regressions = run_benchmarks(sizes=(100, 500, 2000), repeats=3)
+    sys.exit(1 if regressions else 0)
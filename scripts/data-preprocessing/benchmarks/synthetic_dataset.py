@@ -0,0 +1,133 @@
+import os
+import random
+import cv2
+import numpy as np
+from typing import Dict, Sequence, Tuple
+
+CLASS_NAMES = ["book", "cup", "glasses", "keys", "phone", "shoes"]
+
+# Faults the generator can inject, and how each one is expected to be reported:
+#   corrupt      image bytes cut short or replaced with garbage   -> unreadable / corrupted
+#   bad_box      class ID out of range, box outside the frame,
+#                negative size or a malformed line                -> annotation errors
+#   empty_label  label file with no boxes                         -> empty label files
+#   no_label     image without a label file                       -> missing labels
+BAD_BOX_KINDS = ("class_id", "out_of_frame", "negative_size", "malformed")
+
+
+# This function draws a synthetic photo-like image: a smooth gradient with a few filled shapes.
+# Pure noise would make JPEG encoding and decoding unrealistically slow.
+def _draw_image(rng: np.random.Generator, width: int, height: int) -> np.ndarray:
+    x = np.linspace(0, 1, width, dtype=np.float32)
+    y = np.linspace(0, 1, height, dtype=np.float32)[:, None]
+    base = rng.uniform(40, 200, size=3).astype(np.float32)
+    slope = rng.uniform(-50, 50, size=(2, 3)).astype(np.float32)
+    img = base + x[None, :, None] * slope[0] + y[..., None] * slope[1]
+    img = np.clip(img, 0, 255).astype(np.uint8)
+
+    for _ in range(int(rng.integers(2, 6))):
+        color = tuple(int(c) for c in rng.integers(0, 256, size=3))
+        x1, y1 = int(rng.integers(0, width)), int(rng.integers(0, height))
+        x2, y2 = int(rng.integers(0, width)), int(rng.integers(0, height))
+        cv2.rectangle(img, (x1, y1), (x2, y2), color, thickness=-1)
+    return img
+
+
+# This function returns the label lines of one image with valid, normalized boxes
+def _random_boxes(rng: random.Random, num_classes: int, max_boxes: int):
+    lines = []
+    for _ in range(rng.randint(1, max_boxes)):
+        w, h = rng.uniform(0.05, 0.6), rng.uniform(0.05, 0.6)
+        cx, cy = rng.uniform(w / 2, 1 - w / 2), rng.uniform(h / 2, 1 - h / 2)
+        lines.append(f"{rng.randrange(num_classes)} {cx:.6f} {cy:.6f} {w:.6f} {h:.6f}")
+    return lines
+
+
+# This function returns one label line with the given kind of error
+def _bad_box(rng: random.Random, kind: str, num_classes: int) -> str:
+    if kind == "class_id":
+        return f"{num_classes + rng.randrange(5)} 0.500000 0.500000 0.200000 0.200000"
+    if kind == "out_of_frame":
+        return f"{rng.randrange(num_classes)} {rng.uniform(1.01, 1.5):.6f} 0.500000 0.200000 0.200000"
+    if kind == "negative_size":
+        return f"{rng.randrange(num_classes)} 0.500000 0.500000 -0.100000 0.200000"
+    return "0.5 0.5 0.2"
+
+
+# This function generates a YOLO dataset split (<root>/<split>/images and labels) with known faults.
+# Every ratio is the fraction of images that get that fault; the result is fully determined by seed.
+# Returns the number of files written and of each injected fault, so benchmark results can be checked.
+def generate_dataset(
+    root: str,
+    num_images: int = 100,
+    split: str = "train",
+    image_sizes: Sequence[Tuple[int, int]] = ((640, 640), (640, 480), (1024, 768), (320, 240)),
+    png_ratio: float = 0.2,
+    corrupt_ratio: float = 0.02,
+    bad_box_ratio: float = 0.05,
+    empty_label_ratio: float = 0.03,
+    no_label_ratio: float = 0.01,
+    num_classes: int = 6,
+    max_boxes: int = 5,
+    jpeg_quality: int = 90,
+    seed: int = 0,
+) -> Dict[str, int]:
+
+    image_dir = os.path.join(root, split, "images")
+    label_dir = os.path.join(root, split, "labels")
+    os.makedirs(image_dir, exist_ok=True)
+    os.makedirs(label_dir, exist_ok=True)
+
+    rng = random.Random(seed)
+    np_rng = np.random.default_rng(seed)
+    counts = {"images": 0, "labels": 0, "png": 0, "corrupt": 0, "bad_box": 0, "empty_label": 0, "no_label": 0, "bytes": 0}
+
+    for i in range(num_images):
+        stem = f"synthetic_{i:06d}"
+        width, height = image_sizes[rng.randrange(len(image_sizes))]
+        is_png = rng.random() < png_ratio
+        ext = ".png" if is_png else ".jpg"
+
+        img = _draw_image(np_rng, width, height)
+        params = [] if is_png else [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality]
+        _, encoded = cv2.imencode(ext, img, params)
+        data = encoded.tobytes()
+
+        if rng.random() < corrupt_ratio:
+            # Either a truncated file or random bytes behind a valid-looking name
+            data = data[:rng.randint(0, 64)] if rng.random() < 0.5 else bytes(np_rng.integers(0, 256, 512, dtype=np.uint8))
+            counts["corrupt"] += 1
+
+        with open(os.path.join(image_dir, stem + ext), "wb") as f:
+            f.write(data)
+        counts["images"] += 1
+        counts["png"] += is_png
+        counts["bytes"] += len(data)
+
+        if rng.random() < no_label_ratio:
+            counts["no_label"] += 1
+            continue
+
+        if rng.random() < empty_label_ratio:
+            lines = []
+            counts["empty_label"] += 1
+        else:
+            lines = _random_boxes(rng, num_classes, max_boxes)
+            if rng.random() < bad_box_ratio:
+                lines[rng.randrange(len(lines))] = _bad_box(rng, rng.choice(BAD_BOX_KINDS), num_classes)
+                counts["bad_box"] += 1
+
+        with open(os.path.join(label_dir, stem + ".txt"), "w") as f:
+            f.write("".join(line + "\n" for line in lines))
+        counts["labels"] += 1
+
+    names = CLASS_NAMES[:num_classes] + [f"class_{i}" for i in range(len(CLASS_NAMES), num_classes)]
+    with open(os.path.join(root, "data.yaml"), "w") as f:
+        f.write(f"train: ../train/images\nval: ../valid/images\ntest: ../test/images\n\nnc: {num_classes}\nnames: {names}\n")
+
+    return counts
+
+
+if __name__ == "__main__":
+    summary = generate_dataset("C:/Middlesex/HomeBuddy/synthetic-dataset", num_images=500)
+    print(summary)
@@ -1,31 +1,10 @@
-import os
-from collections import defaultdict
+# The code lives in homebuddy_preprocessing.check_duplicate; this script runs it on the example paths below.
+# Installed, the same command runs as: homebuddy-preprocess check-duplicate ...
+from homebuddy_preprocessing.check_duplicate import find_duplicate_filenames, find_duplicate_images
 
-def find_duplicate_filenames(root_folder):
 
-    filenames = defaultdict(list)
-    duplicates = []
+if __name__ == "__main__":
+    DATASET_DIR = "C:/Middlesex/HomeBuddy/merged-dataset"
 
-    print(f"Scanning for duplicate filenames in '{root_folder}'...")
-
-    for dirpath, _, file_list in os.walk(root_folder):
-        for filename in file_list:
-            filenames[filename].append(os.path.join(dirpath, filename))
-
-    for filename, paths in filenames.items():
-        if len(paths) > 1:
-            duplicates.append(paths)
-
-    if not duplicates:
-        print("No duplicate filenames found.")
-    else:
-        print("Found the following sets of duplicate filenames:")
-        for i, path_list in enumerate(duplicates, 1):
-            print(f"\nSet {i} (Filename: '{os.path.basename(path_list[0])}'):")
-            for filepath in path_list:
-                print(f"  - {filepath}")
-
-
-DATASET_DIR = "C:/Middlesex/HomeBuddy/merged-dataset"
-
-find_duplicate_filenames(DATASET_DIR)
+    find_duplicate_filenames(DATASET_DIR)
+    find_duplicate_images(DATASET_DIR, max_distance=4, workers=4)
@@ -0,0 +1,8 @@
+"""
+Dataset checks and preprocessing tools for the HomeBuddy YOLO datasets.
+
+Modules are imported on demand: importing the package (or running the CLI) does not load
+numpy, OpenCV or Pillow until a module that needs them is used.
+"""
+
+__version__ = "0.1.0"
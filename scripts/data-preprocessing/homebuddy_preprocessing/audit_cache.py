@@ -0,0 +1,94 @@
+import os
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Bump this when the fields produced by image_audit.measure_image change
+AUDIT_CACHE_VERSION = "1.1"
+
+
+# This function returns where the audit cache of an images directory lives.
+# Like Ultralytics labels.cache it sits in the split folder, e.g. train/audit.cache.
+def default_cache_path(image_dir: str) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(image_dir)), "audit.cache")
+
+
+class AuditCache:
+    """
+    Per-file image measurements stored on disk and keyed by path, size and mtime.
+    A file whose size or modification time changed is treated as a miss and re-measured.
+    Records are also keyed by decode mode (see image_audit.decode_mode), so exact and fast-mode
+    measurements of the same file are kept side by side and never mixed up.
+    """
+
+    def __init__(self, cache_path: str, mode: str = "full"):
+        self.cache_path = cache_path
+        self.mode = mode
+        self.root = os.path.dirname(os.path.abspath(cache_path))
+        self.entries: Dict[str, Dict] = {}
+        self.seen = set()
+        self.hits = 0
+        self.misses = 0
+
+        if os.path.exists(cache_path):
+            try:
+                data = np.load(cache_path, allow_pickle=True).item()
+                if data.get("version") == AUDIT_CACHE_VERSION:
+                    self.entries = data["entries"]
+            except Exception as e:
+                print(f"Ignoring unreadable audit cache {cache_path}: {e}")
+
+    def _key(self, path: str) -> str:
+        return os.path.relpath(os.path.abspath(path), self.root).replace("\\", "/")
+
+    # Returns the cached record of a file, or None when it is new or changed
+    def lookup(self, path: str) -> Optional[Dict]:
+        key = self._key(path)
+        self.seen.add(key)
+        entry = self.entries.get(key)
+        if entry is not None:
+            try:
+                st = os.stat(path)
+            except OSError:
+                st = None
+            if st is not None and entry["size"] == st.st_size and entry["mtime"] == st.st_mtime_ns and self.mode in entry["records"]:
+                self.hits += 1
+                return entry["records"][self.mode]
+
+        self.misses += 1
+        return None
+
+    # Stores freshly measured records together with the size and mtime they were measured at
+    def update(self, records: Dict[str, Dict]):
+        for path, record in records.items():
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            key = self._key(path)
+            self.seen.add(key)
+            entry = self.entries.get(key)
+            if entry is None or entry["size"] != st.st_size or entry["mtime"] != st.st_mtime_ns:
+                entry = self.entries[key] = {"size": st.st_size, "mtime": st.st_mtime_ns, "records": {}}
+            entry["records"][self.mode] = record
+
+    # Writes the cache, dropping entries for files that were not part of this run.
+    # Runs over a subset of the files pass prune=False to keep the other entries.
+    def save(self, prune: bool = True):
+        entries = {key: entry for key, entry in self.entries.items() if key in self.seen or not prune}
+        tmp_path = self.cache_path + ".npy"
+        try:
+            np.save(tmp_path, {"version": AUDIT_CACHE_VERSION, "entries": entries})
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            print(f"Could not write audit cache {self.cache_path}: {e}")
+
+    def summary(self) -> str:
+        return f"Audit cache ({self.mode}): {self.hits} hits, {self.misses} misses ({self.cache_path})"
+
+
+# This function pairs every path with its cached record (or None on a miss).
+# The pairs are what the chunk workers in image_audit.py consume.
+def cached_items(paths: Iterable[str], cache: Optional[AuditCache]) -> List[Tuple[str, Optional[Dict]]]:
+    if cache is None:
+        return [(path, None) for path in paths]
+    return [(path, cache.lookup(path)) for path in paths]
@@ -0,0 +1,85 @@
+import os
+
+from .image_pairing import pair_dataset
+from .instrumentation import RunReport
+from .label_index import open_label_index
+from .prompts import confirm
+from .ultralytics_cache import load_ultralytics_cache, write_ultralytics_cache
+from .yolo_labels import invalid_files
+
+# This function validates YOLO annotations
+# Labels come from the memory-mapped label index of the text files; the checks run as array operations.
+# The Ultralytics labels.cache is not used for the checks: it stores boxes as float32, so boxes on the
+# frame edge would fail the bounds check. If issues found, user confirmation is required for deletion;
+# an up-to-date labels.cache is then updated.
+def validate_and_clean_annotations(label_dir, image_dir, num_classes=1, timing_report=None):
+    timer = RunReport("validate_and_clean_annotations", report_path=timing_report)
+
+    with timer.stage("read"):
+        cached = load_ultralytics_cache(image_dir, label_dir)
+        labels = open_label_index(label_dir).label_table()
+    total_files_checked = len(labels.files)
+    total_annotations = len(labels.table)
+    timer.count(total_files_checked)
+
+    with timer.stage("check"):
+        errors = [os.path.join(label_dir, labels.files[i]) for i in invalid_files(labels, num_classes)]
+        empty_files = [os.path.join(label_dir, labels.files[i]) for i in labels.empty]
+    timer.finish()
+
+    print(f"\nChecked {total_files_checked} label files with {total_annotations} total annotations.")
+    print(f"{len(errors)} files have annotation errors.")
+    print(f"{len(empty_files)} files are empty.\n")
+
+    files_to_delete = errors + empty_files
+    if not files_to_delete:
+        print("All annotations are valid! Nothing to be deleted..")
+        return
+
+    # Ask before deleting
+    if not confirm(f"Do you want to delete these {len(files_to_delete)} invalid/empty label files AND their images? (yes/no): ", accept="yes"):
+        print("Deletion cancelled. No files were removed.")
+        return
+
+    deleted_labels = 0
+    deleted_images = 0
+    missing_images = []
+    removed_images = []
+
+    # One listing of both directories instead of probing every extension per label
+    with timer.stage("listing"):
+        pairing = pair_dataset(image_dir, label_dir, image_ext=(".jpg", ".jpeg", ".png"))
+
+    with timer.stage("delete"):
+        for label_path in files_to_delete:
+            base_name = os.path.splitext(os.path.basename(label_path))[0]
+
+            try:
+                os.remove(label_path)
+                deleted_labels += 1
+            except FileNotFoundError:
+                continue
+            except Exception as e:
+                print(f"Error deleting label {label_path}: {e}")
+
+            image_paths = pairing.images.get(base_name, [])
+            for image_path in image_paths:
+                try:
+                    os.remove(image_path)
+                    deleted_images += 1
+                    removed_images.append(image_path)
+                except Exception as e:
+                    print(f"Error deleting image {image_path}: {e}")
+
+            if not image_paths:
+                missing_images.append(base_name)
+    timer.save()
+
+    if cached:
+        write_ultralytics_cache(cached, image_dir, removed_images)
+
+    print(f"\nDeleted {deleted_labels} label files and {deleted_images} images.")
+    if missing_images:
+        print("These labels had no matching images:")
+        for name in missing_images:
+            print(f"  - {name}")
@@ -0,0 +1,73 @@
+import os
+import cv2
+import numpy as np
+
+from .image_pairing import pair_dataset, remove_file
+from .instrumentation import RunReport
+from .prompts import confirm
+
+# This function checks if there is any corrupted file in a specific directory.
+# If corrupted file is found, user confirmation is required for deletion.
+def check_and_clean_dataset(image_dir, label_dir=None, timing_report=None):
+    corrupted_files = []
+    timer = RunReport("check_and_clean_dataset", report_path=timing_report)
+
+    with timer.stage("listing"):
+        img_paths = []
+        for root, _, files in os.walk(image_dir):
+            for file in files:
+                if file.lower().endswith(('.jpg', '.jpeg', '.png')):
+                    img_paths.append(os.path.join(root, file))
+    total_files = timer.total = len(img_paths)
+
+    for img_path in img_paths:
+        # Same as cv2.imread, split so reading and decoding are timed apart
+        with timer.stage("read"):
+            try:
+                data = np.fromfile(img_path, dtype=np.uint8)
+            except OSError:
+                data = None
+        timer.count(1, 0 if data is None else data.size)
+
+        img = None
+        if data is not None and data.size:
+            with timer.stage("decode"):
+                img = cv2.imdecode(data, cv2.IMREAD_COLOR)
+
+        if img is None:
+            corrupted_files.append(img_path)
+        timer.progress()
+    timer.finish()
+
+    print(f"\nTotal image files checked: {total_files}")
+
+    if not corrupted_files:
+        print("All images are readable.")
+        return
+
+    print(f"\n{len(corrupted_files)} corrupted or unreadable images found:-\n")
+    for f in corrupted_files:
+        print(f" - {f}")
+
+    # Ask before deleting corrupted files
+    if confirm("\nDo you want to delete these corrupted files and their corresponding labels? (y/n): "):
+        # Labels are matched by stem from one listing of the labels directory
+        pairing = pair_dataset(image_dir, label_dir) if label_dir else None
+
+        deleted_count = 0
+        with timer.stage("delete"):
+            for img_path in corrupted_files:
+                try:
+                    os.remove(img_path)
+                    deleted_count += 1
+                except Exception as e:
+                    print(f"Error deleting {img_path}: {e}")
+
+                label_path = pairing.label_for(img_path) if pairing else None
+                if label_path:
+                    remove_file(label_path, "label")
+        timer.save()
+
+        print(f"\n{deleted_count} corrupted images and their labels deleted..")
+    else:
+        print("\nNo files were deleted.")
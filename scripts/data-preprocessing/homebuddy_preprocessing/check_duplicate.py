@@ -0,0 +1,154 @@
+import os
+from collections import defaultdict
+
+from .image_hashing import HashBuckets, dhash_chunk, file_digest, group_matches
+from .instrumentation import RunReport
+from .process_pool import map_chunks
+
+SPLITS = ("train", "valid", "test")
+IMAGE_EXT = (".jpg", ".jpeg", ".png", ".bmp")
+
+def find_duplicate_filenames(root_folder):
+
+    filenames = defaultdict(list)
+    duplicates = []
+
+    print(f"Scanning for duplicate filenames in '{root_folder}'...")
+
+    for dirpath, _, file_list in os.walk(root_folder):
+        for filename in file_list:
+            filenames[filename].append(os.path.join(dirpath, filename))
+
+    for filename, paths in filenames.items():
+        if len(paths) > 1:
+            duplicates.append(paths)
+
+    if not duplicates:
+        print("No duplicate filenames found.")
+    else:
+        print("Found the following sets of duplicate filenames:")
+        for i, path_list in enumerate(duplicates, 1):
+            print(f"\nSet {i} (Filename: '{os.path.basename(path_list[0])}'):")
+            for filepath in path_list:
+                print(f"  - {filepath}")
+
+
+# This function returns the dataset split (train/valid/test) a file belongs to, if any
+def split_of(path, root_folder):
+    parts = os.path.relpath(path, root_folder).replace("\\", "/").split("/")
+    for part in parts:
+        if part in SPLITS:
+            return part
+    return None
+
+
+# This function prints one set of duplicate images and flags it when it spans several splits
+def _print_duplicate_set(i, paths, root_folder, leaks):
+    splits = sorted({split_of(p, root_folder) for p in paths} - {None})
+    leak_note = f"  <-- LEAKAGE across {', '.join(splits)}" if len(splits) > 1 else ""
+    if leak_note:
+        leaks.append((paths, splits))
+    print(f"\nSet {i} ({len(paths)} images){leak_note}:")
+    for filepath in paths:
+        print(f"  - {filepath}")
+
+
+# This function finds images with identical bytes and images that look the same under
+# different names (e.g. Roboflow re-exports). Exact duplicates are found by comparing file
+# sizes first and hashing only the files that share a size; near duplicates by dHash
+# looked up in LSH buckets, so the images are never compared pair by pair.
+def find_duplicate_images(root_folder, max_distance=4, workers=1, chunk_size=256, timing_report=None):
+
+    print(f"Scanning for duplicate images in '{root_folder}'...")
+    timer = RunReport("find_duplicate_images", report_path=timing_report)
+
+    paths = []
+    sizes = defaultdict(list)
+    with timer.stage("listing"):
+        for dirpath, dirnames, file_list in os.walk(root_folder):
+            dirnames.sort()
+            for filename in sorted(file_list):
+                if filename.lower().endswith(IMAGE_EXT):
+                    path = os.path.join(dirpath, filename)
+                    paths.append(path)
+                    sizes[os.path.getsize(path)].append(path)
+    timer.total = len(paths)
+
+    print(f"Total images found: {len(paths)}")
+
+    # Exact duplicates: only files sharing a byte size can have the same content
+    digests = {}
+    by_digest = defaultdict(list)
+    with timer.stage("read"):
+        for size, same_size in sizes.items():
+            if len(same_size) < 2:
+                continue
+            for path in same_size:
+                digests[path] = file_digest(path)
+                by_digest[digests[path]].append(path)
+            timer.count(0, size * len(same_size))
+    exact_sets = [group for group in by_digest.values() if len(group) > 1]
+
+    # Near duplicates: perceptual hash of every image, grouped through the LSH buckets
+    def on_chunk(chunk):
+        timer.count(len(chunk))
+        timer.progress()
+
+    with timer.stage("decode"):
+        chunks = map_chunks(dhash_chunk, paths, workers=workers, chunk_size=chunk_size, on_result=on_chunk)
+    hashes = [h for chunk in chunks for h in chunk]
+
+    with timer.stage("check"):
+        buckets = HashBuckets(max_distance=max_distance)
+        hashed_ids = []
+        matches = []
+        unreadable = []
+        for path, value in zip(paths, hashes):
+            if value is None:
+                unreadable.append(path)
+                continue
+            new_id = len(hashed_ids)
+            hashed_ids.append(path)
+            matches.extend((old_id, new_id) for old_id in buckets.add(value))
+
+        near_sets = []
+        for group in group_matches(len(hashed_ids), matches):
+            group_paths = [hashed_ids[i] for i in group]
+            # Skip sets that are fully explained by byte-identical copies
+            if len({digests.get(p, p) for p in group_paths}) > 1:
+                near_sets.append(group_paths)
+    timer.finish()
+
+    leaks = []
+
+    if exact_sets:
+        print(f"\nFound {len(exact_sets)} sets of byte-identical images:")
+        for i, group in enumerate(exact_sets, 1):
+            _print_duplicate_set(i, group, root_folder, leaks)
+    else:
+        print("\nNo byte-identical images found.")
+
+    if near_sets:
+        print(f"\nFound {len(near_sets)} sets of near-duplicate images (dHash distance <= {max_distance}):")
+        for i, group in enumerate(near_sets, 1):
+            _print_duplicate_set(i, group, root_folder, leaks)
+    else:
+        print("\nNo near-duplicate images found.")
+
+    if unreadable:
+        print(f"\n{len(unreadable)} images could not be hashed:")
+        for path in unreadable:
+            print(f"  - {path}")
+
+    print("\n**** LEAKAGE REPORT ****")
+    if not leaks:
+        print("No duplicate images are shared between train, valid and test.")
+    else:
+        per_pair = defaultdict(int)
+        for _, splits in leaks:
+            per_pair[" / ".join(splits)] += 1
+        print(f"{len(leaks)} duplicate sets span more than one split:")
+        for pair, count in sorted(per_pair.items()):
+            print(f" - {pair}: {count} sets")
+
+    return {"exact": exact_sets, "near": near_sets, "leaks": leaks, "unreadable": unreadable}
@@ -0,0 +1,73 @@
+import os
+import numpy as np
+from collections import Counter
+
+from .instrumentation import RunReport
+from .label_index import STATUS_MALFORMED, open_label_index
+
+# This function counts the class IDs of one label file line by line.
+# It is only used for files the label index marked as malformed.
+def _class_ids_in_file(label_path, num_classes):
+    try:
+        with open(label_path, "r") as f:
+            lines = f.readlines()
+    except:
+        return set()
+
+    ids_in_file = set()
+
+    for line in lines:
+        parts = line.strip().split()
+        if not parts:
+            continue
+
+        try:
+            cls_id = int(parts[0])
+            if 0 <= cls_id < num_classes:
+                ids_in_file.add(cls_id)
+        except ValueError:
+            continue
+
+    return ids_in_file
+
+
+# This function counts in how many label files each class ID appears.
+# Every labels directory under label_root is queried through its label index.
+# Class IDs outside 0..num_classes-1 are reported separately; see dataset_stats for box counts and geometry.
+def count_class_ids(label_root, num_classes=6, timing_report=None):
+
+    file_count_per_class = Counter()
+    out_of_range = Counter()
+    timer = RunReport("count_class_ids", report_path=timing_report)
+
+    for dirpath, dirnames, files in os.walk(label_root):
+        dirnames[:] = [d for d in dirnames if not d.endswith(".index")]
+        if not any(file.endswith(".txt") for file in files):
+            continue
+
+        with timer.stage("read"):
+            index = open_label_index(dirpath)
+        timer.count(len(index))
+
+        # Count each (file, class) pair once
+        with timer.stage("check"):
+            cls = index.boxes[:, 0].astype(np.int64)
+            file_idx = index.file_idx_column()
+            in_range = (cls >= 0) & (cls < num_classes)
+            out_of_range.update(cls[~in_range].tolist())
+            pairs = np.unique(file_idx[in_range] * num_classes + cls[in_range])
+            for cls_id, count in enumerate(np.bincount(pairs % num_classes, minlength=num_classes)):
+                file_count_per_class[cls_id] += int(count)
+
+            for i in index.files_with_status(STATUS_MALFORMED):
+                for cls_id in _class_ids_in_file(index.path(i), num_classes):
+                    file_count_per_class[cls_id] += 1
+    timer.finish()
+
+    print("\nFile count per class ID:")
+    for cls_id in range(num_classes):
+        print(f"Class {cls_id}: {file_count_per_class[cls_id]} files")
+    # Boxes of malformed files are not included here
+    if out_of_range:
+        print(f"Boxes with class IDs outside 0..{num_classes - 1}: "
+              + ", ".join(f"{cls_id} ({count})" for cls_id, count in sorted(out_of_range.items())))
@@ -0,0 +1,54 @@
+import os
+
+from .image_pairing import pair_dataset
+from .instrumentation import RunReport
+from .prompts import confirm
+
+# This function checks if all images have their corresponding label files.
+# Image files without label files will be asked for deletion.
+# Both directories are listed once and matched by file stem.
+def check_and_clean_labels(image_dir, label_dir, timing_report=None):
+    timer = RunReport("check_and_clean_labels", report_path=timing_report)
+    with timer.stage("listing"):
+        pairing = pair_dataset(image_dir, label_dir, image_ext=('.jpg', '.jpeg', '.png'))
+
+    total_files = sum(len(paths) for paths in pairing.images.values())
+    label_files = total_files
+    timer.count(total_files + len(pairing.labels))
+    timer.finish()
+    missing_labels = [os.path.basename(path) for path in pairing.orphan_images]
+
+    print(f"\nTotal image files checked: {total_files}")
+    print(f"Total label files expected: {label_files}")
+
+    if pairing.orphan_labels:
+        print(f"{len(pairing.orphan_labels)} label files have no matching image.")
+    if pairing.conflicts:
+        print(f"{len(pairing.conflicts)} names have more than one image (e.g. .jpg and .png):")
+        for stem, paths in pairing.conflicts.items():
+            print(f"  - {stem}: {', '.join(os.path.basename(p) for p in paths)}")
+
+    if not missing_labels:
+        print("\nAll images have their label files..")
+        return
+
+    print(f"\n{len(missing_labels)} image files are missing labels!\n")
+    for m in missing_labels:
+        print(m)
+
+    # Ask user before deleting missing label images
+    if confirm("\nDo you want to delete these images with missing labels? (y/n): "):
+        deleted_count = 0
+        with timer.stage("delete"):
+            for img_path in pairing.orphan_images:
+                try:
+                    os.remove(img_path)
+                    deleted_count += 1
+                    print(f"Deleted image: {img_path}")
+                except Exception as e:
+                    print(f"Error deleting {img_path}: {e}")
+        timer.save()
+
+        print(f"\n{deleted_count} images without labels have been deleted.")
+    else:
+        print("\nNo files were deleted.")
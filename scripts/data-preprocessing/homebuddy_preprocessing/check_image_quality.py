@@ -0,0 +1,138 @@
+import os
+from typing import Optional, Tuple
+
+from .audit_cache import AuditCache, cached_items, default_cache_path
+from .image_audit import QUALITY_ISSUE_TYPES, check_quality_chunk, decode_mode
+from .image_pairing import pair_dataset, remove_file
+from .instrumentation import RunReport
+from .process_pool import map_chunks, merge_issue_dicts
+from .prompts import ask, confirm
+
+
+# This function checks the quality of all images in a directory.
+# If issues are found, user confirmation is required for deletion.
+# workers=1 scans in this process; workers=None or 0 uses every CPU core.
+def check_and_clean_quality(
+    image_dir: str,
+    label_dir: str = None,
+    min_size: Tuple[int, int] = (64, 64),
+    max_aspect_ratio: float = 5.0,
+    low_variance_thresh: float = 3.0,
+    valid_ext: Tuple[str, ...] = (".jpg", ".jpeg", ".png"),
+    workers: Optional[int] = 1,
+    chunk_size: int = 64,
+    use_cache: bool = True,
+    timing_report: Optional[str] = None,
+    reduce_factor: int = 1,
+    delete_types: str = "all",
+):
+    # timing_report is an optional path for a JSON file with the stage timings of this run
+    # reduce_factor 2, 4 or 8 decodes at reduced resolution in grayscale (fast mode, see image_audit.measure_image)
+    # delete_types answers the issue type prompt when prompts are confirmed automatically (--yes)
+
+    timer = RunReport("check_and_clean_quality", report_path=timing_report)
+    with timer.stage("listing"):
+        paths = []
+        for root, dirs, files in os.walk(image_dir):
+            dirs.sort()
+            for filename in sorted(files):
+                if filename.lower().endswith(valid_ext):
+                    paths.append(os.path.join(root, filename))
+    timer.total = len(paths)
+    total_files = len(paths)
+
+    print(f"\nScanning images in: {image_dir}\n")
+
+    # Unchanged images are served from <split>/audit.cache and are not decoded again
+    cache = AuditCache(default_cache_path(image_dir), decode_mode(reduce_factor)) if use_cache else None
+
+    chunk_results = map_chunks(
+        check_quality_chunk,
+        cached_items(paths, cache),
+        workers=workers,
+        chunk_size=chunk_size,
+        on_result=lambda result: timer.add(result[2]),
+        reduce_factor=reduce_factor,
+        min_size=min_size,
+        max_aspect_ratio=max_aspect_ratio,
+        low_variance_thresh=low_variance_thresh,
+    )
+    issues = merge_issue_dicts([chunk_issues for chunk_issues, _, _ in chunk_results], QUALITY_ISSUE_TYPES)
+
+    if cache:
+        for _, measured, _ in chunk_results:
+            cache.update(measured)
+        cache.save()
+        print(cache.summary())
+    timer.finish()
+
+    print(f"Total images checked: {total_files}\n")
+
+    # Check if any issues found
+    if not any(issues.values()):
+        print("All images meet the quality standards.")
+        return
+
+    print("Image quality issues found:\n")
+    for key, files in issues.items():
+        if files:
+            title = key.replace("_", " ").title()
+            print(f" - {title}: {len(files)}")
+
+    print("\nAvailable issue types: unreadable, zero_size, too_small, extreme_aspect, low_variance")
+    choice = ask("Enter issue types to delete (comma separated) or 'all': ", delete_types)
+
+    if choice == 'all':
+        issue_types_to_remove = list(issues.keys())
+    else:
+        issue_types_to_remove = [c.strip() for c in choice.split(',') if c.strip() in issues]
+
+    files_to_delete = []
+    for issue_type in issue_types_to_remove:
+        for entry in issues[issue_type]:
+            img_path = entry.split(" (")[0]
+            files_to_delete.append((img_path, issue_type))
+
+    if not files_to_delete:
+        print("\nNo files found for the selected issue types.")
+        return
+
+    print(f"{len(files_to_delete)} files to be deleted!\n")
+
+    # Labels are matched by stem from one listing of the labels directory
+    pairing = pair_dataset(image_dir, label_dir, image_ext=valid_ext)
+
+    for idx, (img_path, issue_type) in enumerate(files_to_delete, 1):
+        label_path = pairing.label_for(img_path)
+
+        print(f"{idx}. Issue: {issue_type}")
+        print(f"Image: {img_path}")
+        print(f"Label: {label_path if label_path else os.path.splitext(os.path.basename(img_path))[0] + '.txt (not found)'}")
+        print()
+
+    if not confirm(f"\nDo you want to delete all {len(files_to_delete)} images and their labels? (y/n): "):
+        print("\nNo files were deleted.")
+        return
+
+    deleted_images = 0
+    deleted_labels = 0
+
+    print(f"\n{'=' * 70}")
+    print("Deleting files...\n")
+
+    with timer.stage("delete"):
+        for img_path, _ in files_to_delete:
+            label_path = pairing.label_for(img_path)
+
+            # Delete image
+            if remove_file(img_path, "image"):
+                deleted_images += 1
+
+            # Delete label
+            if label_path and remove_file(label_path, "label"):
+                deleted_labels += 1
+    timer.save()
+
+    print("****SUMMARY****")
+    print(f"Total images deleted: {deleted_images}")
+    print(f"Total labels deleted: {deleted_labels}")
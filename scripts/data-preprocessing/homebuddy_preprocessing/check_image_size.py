@@ -0,0 +1,105 @@
+import os
+from PIL import Image
+
+from .image_pairing import pair_dataset, remove_file
+from .instrumentation import RunReport
+from .prompts import confirm
+from .ultralytics_cache import cached_image_sizes, load_ultralytics_cache, write_ultralytics_cache
+
+# This function checks image sizes and deletes large/very large images and their labels
+# Sizes come from the split's Ultralytics labels.cache when it is up to date; otherwise only the
+# image headers are read (PIL opens lazily), so the read stage covers the whole scan.
+def check_and_clean_large_images(image_dir, label_dir, target_width=640, target_height=640, min_size=820, timing_report=None):
+
+    sizes = []
+    total_files_checked = 0
+    timer = RunReport("check_and_clean_large_images", report_path=timing_report)
+
+    # One listing of both directories; labels are looked up by stem when deleting
+    with timer.stage("listing"):
+        pairing = pair_dataset(image_dir, label_dir, image_ext=('.jpg', '.jpeg', '.png', '.bmp'))
+    timer.total = sum(len(paths) for paths in pairing.images.values())
+
+    with timer.stage("read"):
+        cached = load_ultralytics_cache(image_dir, label_dir)
+        cached_sizes = cached_image_sizes(cached) if cached else {}
+
+    for stem in sorted(pairing.images):
+        for image_path in pairing.images[stem]:
+            total_files_checked += 1
+            file = os.path.basename(image_path)
+            if file in cached_sizes:
+                sizes.append(cached_sizes[file] + (file,))
+                timer.count(1, cached=1)
+                continue
+            with timer.stage("read"):
+                try:
+                    with Image.open(image_path) as img:
+                        width, height = img.size
+                        sizes.append((width, height, file))
+                except Exception as e:
+                    print(f"Error reading {file}: {e}")
+            timer.count(1)
+            timer.progress()
+    timer.finish()
+
+    print(f"\nTotal image files checked: {total_files_checked}")
+
+    if not sizes:
+        print("No images found.")
+        return
+
+    target_size_images = [s for s in sizes if s[0] == target_width and s[1] == target_height]
+    perfect_range_images = [s for s in sizes if 416 <= s[0] <= 640 and 416 <= s[1] <= 640]
+    large_images = [s for s in sizes if s[0] > min_size or s[1] > min_size]
+    very_large_images = [s for s in sizes if s[0] > 4000 or s[1] > 4000]
+
+    print(f"Target size ({target_width}x{target_height}): {len(target_size_images)}")
+    print(f"Perfect range (416–640px): {len(perfect_range_images)}")
+    print(f"Large images (>{min_size}px): {len(large_images)}")
+    print(f"Very large images (>4000px): {len(very_large_images)}")
+
+    if not large_images:
+        print("\nAll image sizes are within acceptable range.")
+        return
+
+
+    print("\nLarge images found!")
+    for width, height, filename in large_images[:20]:
+        category = "VERY LARGE" if (width > 4000 or height > 4000) else "LARGE"
+        print(f" - [{category}] {filename}: {width}x{height}")
+
+    if len(large_images) > 20:
+        print(f"  ...and {len(large_images) - 20} more.")
+
+    if not confirm(f"\nDo you want to delete these {len(large_images)} large images AND their labels? (y/n): "):
+        print("\nNo files were deleted.")
+        return
+
+    deleted_images = 0
+    deleted_labels = 0
+    removed_images = []
+
+    print("\n🗑 Deleting files...\n")
+
+    with timer.stage("delete"):
+        for width, height, filename in large_images:
+            img_path = os.path.join(image_dir, filename)
+            label_path = pairing.label_for(filename)
+
+            # Delete image
+            if remove_file(img_path, "image"):
+                deleted_images += 1
+                removed_images.append(img_path)
+
+            # Delete corresponding label if exists
+            if label_path and remove_file(label_path, "label"):
+                deleted_labels += 1
+    timer.save()
+
+    if cached:
+        write_ultralytics_cache(cached, image_dir, removed_images)
+
+    print("\n**** SUMMARY ****")
+    print(f"Total images deleted: {deleted_images}")
+    print(f"Total labels deleted: {deleted_labels}")
@@ -0,0 +1,75 @@
+import os
+import numpy as np
+
+from .instrumentation import RunReport
+from .label_index import STATUS_MALFORMED, STATUS_UNREADABLE, open_label_index
+
+# This function verifies that all YOLO label files contain only the expected class ID
+# Each directory is queried through its label index instead of re-opening every file
+def check_class_ids(label_dirs, expected_id, timing_report=None):
+    timer = RunReport("check_class_ids", report_path=timing_report)
+    total_files_checked = 0
+    total_files_mismatched = 0
+    mismatched_files = []
+
+    print(f"\nVerifying that all class IDs equal '{expected_id}'...\n")
+
+    for label_dir in label_dirs:
+        if not os.path.isdir(label_dir):
+            print(f"Warning: Directory not found, skipping: {label_dir}")
+            continue
+
+        print(f"Checking directory: {label_dir}")
+
+        with timer.stage("read"):
+            index = open_label_index(label_dir)
+        total_files_checked += len(index)
+        timer.count(len(index))
+
+        # Box rows of well-formed files; line numbers count non-empty lines like the original check
+        with timer.stage("check"):
+            cls = np.asarray(index.boxes[:, 0])
+            file_idx = index.file_idx_column()
+            for row in np.flatnonzero(cls != expected_id):
+                i = int(file_idx[row])
+                line_num = int(row - index.offsets[i]) + 1
+                mismatched_files.append((index.path(i), line_num, int(cls[row])))
+                total_files_mismatched += 1
+
+        # Malformed files are not in the box table, check them line by line
+        for i in index.files_with_status(STATUS_MALFORMED):
+            filename = index.files[i]
+            filepath = index.path(i)
+
+            try:
+                with open(filepath, 'r') as f:
+                    lines = [line.strip() for line in f.readlines() if line.strip()]
+            except Exception as e:
+                print(f"Error reading {filename}: {e}")
+                continue
+
+            for line_num, line in enumerate(lines, start=1):
+                parts = line.split()
+                if not parts:
+                    continue
+
+                try:
+                    class_id = int(parts[0])
+                    if class_id != expected_id:
+                        mismatched_files.append((filepath, line_num, class_id))
+                        total_files_mismatched += 1
+                except ValueError:
+                    print(f"Invalid format in {filename} on line {line_num}")
+
+        for i in index.files_with_status(STATUS_UNREADABLE):
+            print(f"Error reading {index.files[i]}")
+
+    timer.finish()
+    print(f"Total label files checked: {total_files_checked}")
+
+    if mismatched_files:
+        print(f"{total_files_mismatched} mismatched class IDs")
+        for file, line_num, found_id in mismatched_files:
+            print(f"File: {file}, Line: {line_num}, Found ID: {found_id} (Expected: {expected_id})")
+    else:
+        print(f"Verification successful! All files contain only class ID '{expected_id}'.")
@@ -0,0 +1,111 @@
+import os
+from typing import Optional, Tuple
+
+from .audit_cache import AuditCache, cached_items, default_cache_path
+from .image_audit import RANGE_RESULT_TYPES, check_range_chunk, decode_mode
+from .image_pairing import pair_dataset, remove_file
+from .instrumentation import RunReport
+from .process_pool import map_chunks, merge_issue_dicts
+from .prompts import confirm
+
+
+# This function checks image pixel ranges and deletes invalid images and their labels
+# workers=1 scans in this process; workers=None or 0 uses every CPU core.
+def check_and_clean_pixel_range(
+    image_dir,
+    label_dir,
+    valid_ext: Tuple[str, ...] = (".jpg", ".jpeg", ".png"),
+    workers: Optional[int] = 1,
+    chunk_size: int = 64,
+    use_cache: bool = True,
+    timing_report: Optional[str] = None,
+    reduce_factor: int = 1,
+):
+    # timing_report is an optional path for a JSON file with the stage timings of this run
+    # reduce_factor 2, 4 or 8 decodes at reduced resolution in grayscale (fast mode, see image_audit.measure_image)
+
+    timer = RunReport("check_and_clean_pixel_range", report_path=timing_report)
+    with timer.stage("listing"):
+        paths = []
+        for root, dirs, files in os.walk(image_dir):
+            dirs.sort()
+            for filename in sorted(files):
+                if filename.lower().endswith(valid_ext):
+                    paths.append(os.path.join(root, filename))
+    timer.total = len(paths)
+    total_files_checked = len(paths)
+
+    # Unchanged images are served from <split>/audit.cache and are not decoded again
+    cache = AuditCache(default_cache_path(image_dir), decode_mode(reduce_factor)) if use_cache else None
+
+    chunk_results = map_chunks(
+        check_range_chunk,
+        cached_items(paths, cache),
+        workers=workers,
+        chunk_size=chunk_size,
+        on_result=lambda result: timer.add(result[2]),
+        reduce_factor=reduce_factor,
+    )
+    results = merge_issue_dicts([chunk_result for chunk_result, _, _ in chunk_results], RANGE_RESULT_TYPES)
+
+    if cache:
+        for _, measured, _ in chunk_results:
+            cache.update(measured)
+        cache.save()
+        print(cache.summary())
+    timer.finish()
+    valid_range = results["valid_range"]
+    invalid_range = results["invalid_range"]
+    unreadable = results["unreadable"]
+
+    print(f"\nTotal image files checked: {total_files_checked}\n")
+
+    # --- Report ---
+    if valid_range:
+        print(f"{len(valid_range)} valid range images found..")
+    if invalid_range:
+        print(f"{len(invalid_range)} unexpected range images found..")
+        for e in invalid_range:
+            print(f" - {e}")
+    if unreadable:
+        print(f"Unreadable ({len(unreadable)} images):")
+        for e in unreadable:
+            print(f" - {e}")
+    if not invalid_range and not unreadable:
+        print("All images are in standard [0, 255] uint8 range")
+
+    # --- Ask user for deletion ---
+    files_to_delete = invalid_range + unreadable
+    if not files_to_delete:
+        return
+
+    if not confirm(f"\nDo you want to delete these {len(files_to_delete)} invalid images and their labels? (y/n): "):
+        print("\nNo files were deleted!")
+        return
+
+    deleted_images = 0
+    deleted_labels = 0
+
+    print("\nDeleting files...\n")
+
+    # Labels are matched by stem from one listing of the labels directory
+    pairing = pair_dataset(image_dir, label_dir, image_ext=valid_ext)
+
+    with timer.stage("delete"):
+        for entry in files_to_delete:
+            # Extract the path (entry may include extra info like ranges)
+            img_path = entry.split(" (")[0]
+            label_path = pairing.label_for(img_path)
+
+            # Delete image
+            if remove_file(img_path, "image"):
+                deleted_images += 1
+
+            # Delete corresponding label if exists
+            if label_path and remove_file(label_path, "label"):
+                deleted_labels += 1
+    timer.save()
+
+    print("\n**** SUMMARY ****")
+    print(f"Total images deleted: {deleted_images}")
+    print(f"Total labels deleted: {deleted_labels}")
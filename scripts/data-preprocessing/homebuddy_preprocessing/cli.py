@@ -0,0 +1,231 @@
+import argparse
+import importlib
+import inspect
+import sys
+from typing import Callable, List, Optional, Tuple
+
+# Only the standard library is imported here. The module of a subcommand (and with it numpy, OpenCV or
+# Pillow) is imported once the subcommand is chosen, so label-only commands never load the image stack.
+
+PROG = "homebuddy-preprocess"
+
+# Parsed arguments that are consumed by the CLI itself and not passed on to the command
+_CLI_ARGS = ("command", "entry", "yes", "dry_run", "convert")
+
+
+def _size(value: str) -> Tuple[int, int]:
+    width, _, height = value.lower().partition("x")
+    try:
+        return int(width), int(height or width)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got '{value}'")
+
+
+def _class_mapping(values: List[str]) -> dict:
+    mapping = {}
+    for value in values:
+        old_id, _, new_id = value.partition(":")
+        try:
+            mapping[int(old_id)] = int(new_id)
+        except ValueError:
+            raise SystemExit(f"{PROG} new-mapping: error: expected OLD:NEW class ids, got '{value}'")
+    return mapping
+
+
+def _issue_types(value: str) -> Tuple[str, ...]:
+    return tuple(t.strip() for t in value.split(",") if t.strip())
+
+
+def _target_size(kwargs: dict) -> dict:
+    kwargs["target_width"], kwargs["target_height"] = kwargs.pop("target")
+    return kwargs
+
+
+# This function adds one subcommand. target is "module:function" inside this package; the module is
+# imported only when the subcommand runs. Commands that delete or rewrite files get --yes and --dry-run.
+# convert turns the parsed keyword arguments into the ones the function takes, where they differ.
+def _command(subparsers, name: str, target: str, help: str, timing: bool = True, prompts: bool = True,
+             convert: Optional[Callable] = None):
+    parser = subparsers.add_parser(name, help=help, description=help)
+    if prompts:
+        answers = parser.add_mutually_exclusive_group()
+        answers.add_argument("--yes", "-y", action="store_true", help="confirm every deletion prompt without asking")
+        answers.add_argument("--dry-run", action="store_true", help="report only, nothing is deleted or rewritten")
+    if timing:
+        parser.add_argument("--timing-report", metavar="PATH", help="write the stage timings of the run to a JSON file")
+    parser.set_defaults(entry=target, convert=convert)
+    return parser
+
+
+def _add_image_label_dirs(parser, label_required: bool = True):
+    parser.add_argument("image_dir", help="images directory, e.g. merged-dataset/test/images")
+    if label_required:
+        parser.add_argument("label_dir", help="labels directory, e.g. merged-dataset/test/labels")
+    else:
+        parser.add_argument("label_dir", nargs="?", help="labels directory; labels of deleted images are deleted too")
+
+
+def _add_image_scan_options(parser, workers_default: Optional[int] = 1):
+    parser.add_argument("--workers", type=int, default=workers_default, help="worker processes, 0 uses every CPU core")
+    parser.add_argument("--reduce-factor", type=int, default=1, choices=(1, 2, 4, 8),
+                        help="decode at 1/N resolution in grayscale (fast mode)")
+    parser.add_argument("--no-cache", dest="use_cache", action="store_false", help="ignore and do not write audit.cache")
+
+
+def _add_quality_options(parser):
+    parser.add_argument("--min-size", type=_size, default=(64, 64), metavar="WxH", help="smallest acceptable image size")
+    parser.add_argument("--max-aspect-ratio", type=float, default=5.0)
+    parser.add_argument("--low-variance-thresh", type=float, default=3.0)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog=PROG,
+        description="Checks and cleanup tools for the HomeBuddy YOLO datasets. "
+                    "Commands that delete files ask first; --yes confirms and --dry-run only reports.",
+    )
+    subparsers = parser.add_subparsers(dest="command", metavar="COMMAND", required=True)
+
+    p = _command(subparsers, "check-annotation", "check_annotation:validate_and_clean_annotations",
+                 "validate YOLO annotations and delete invalid or empty label files with their images")
+    p.add_argument("label_dir")
+    p.add_argument("image_dir")
+    p.add_argument("--num-classes", type=int, default=1)
+
+    p = _command(subparsers, "check-corrupted-files", "check_corrupted_files:check_and_clean_dataset",
+                 "find images OpenCV cannot decode and delete them with their labels")
+    _add_image_label_dirs(p, label_required=False)
+
+    p = _command(subparsers, "check-duplicate", "check_duplicate:find_duplicate_images",
+                 "find exact and near-duplicate images, including across splits", prompts=False)
+    p.add_argument("root_folder", help="dataset or split directory")
+    p.add_argument("--max-distance", type=int, default=4, help="largest dHash distance counted as a near duplicate")
+    p.add_argument("--workers", type=int, default=1, help="worker processes, 0 uses every CPU core")
+
+    p = _command(subparsers, "check-duplicate-names", "check_duplicate:find_duplicate_filenames",
+                 "find file names that occur more than once", timing=False, prompts=False)
+    p.add_argument("root_folder", help="dataset or split directory")
+
+    p = _command(subparsers, "check-ids", "check_ids:count_class_ids",
+                 "count in how many label files each class ID appears", prompts=False)
+    p.add_argument("label_root", help="labels directory, or a dataset directory to count every labels folder in it")
+    p.add_argument("--num-classes", type=int, default=6)
+
+    p = _command(subparsers, "check-image-labels", "check_image_labels:check_and_clean_labels",
+                 "find images without a label file and delete them")
+    _add_image_label_dirs(p)
+
+    p = _command(subparsers, "check-image-quality", "check_image_quality:check_and_clean_quality",
+                 "find unreadable, tiny, extreme-aspect and low-variance images and delete them with their labels")
+    _add_image_label_dirs(p, label_required=False)
+    _add_quality_options(p)
+    _add_image_scan_options(p)
+    p.add_argument("--delete-types", default="all", help="issue types deleted with --yes, comma separated or 'all'")
+
+    p = _command(subparsers, "check-image-size", "check_image_size:check_and_clean_large_images",
+                 "report image sizes and delete large images with their labels")
+    _add_image_label_dirs(p)
+    p.add_argument("--target", type=_size, default=(640, 640), metavar="WxH", help="training image size")
+    p.add_argument("--max-size", dest="min_size", type=int, default=820, help="images larger than this are deleted")
+    p.set_defaults(convert=_target_size)
+
+    p = _command(subparsers, "check-mapping", "check_mapping:check_class_ids",
+                 "check that every label in the given directories uses one class ID", prompts=False)
+    p.add_argument("label_dirs", nargs="+")
+    p.add_argument("--expected-id", type=int, required=True)
+
+    p = _command(subparsers, "check-normalization", "check_normalization:check_and_clean_pixel_range",
+                 "find images with an unusable pixel range and delete them with their labels")
+    _add_image_label_dirs(p)
+    _add_image_scan_options(p)
+
+    p = _command(subparsers, "delete-specific-annotation", "delete_specific_annotation:delete_specific_class",
+                 "remove every box of one class ID from the label files", timing=False)
+    p.add_argument("label_dir")
+    p.add_argument("target_class_id", type=int)
+
+    p = _command(subparsers, "new-mapping", "new_mapping:remap_class_ids",
+                 "remap class IDs in the label files", timing=False)
+    p.add_argument("label_dir")
+    p.add_argument("class_mapping", nargs="+", metavar="OLD:NEW")
+    p.set_defaults(convert=lambda kw: dict(kw, class_mapping=_class_mapping(kw["class_mapping"])))
+
+    p = _command(subparsers, "stats", "dataset_stats:dataset_statistics",
+                 "class counts, box size and aspect ratio histograms, objects per image and image sizes", prompts=False)
+    p.add_argument("dataset_dir", help="dataset directory with one folder per split")
+    p.add_argument("--num-classes", type=int, default=6)
+    p.add_argument("--splits", nargs="+", default=("train", "valid", "test"))
+    p.add_argument("--class-names", nargs="+", help="class names in class ID order, for the report")
+    p.add_argument("--workers", type=int, default=None, help="worker processes, default every CPU core")
+    p.add_argument("--no-image-sizes", dest="read_image_sizes", action="store_false",
+                   help="do not read image headers (no pixel-based histograms unless labels.cache is up to date)")
+    p.add_argument("--report", dest="report_path", metavar="PATH", help="write the statistics to a JSON file")
+
+    p = _command(subparsers, "audit", "image_audit:audit_and_clean_images",
+                 "run every image check in one pass and delete the selected issues")
+    _add_image_label_dirs(p, label_required=False)
+    _add_quality_options(p)
+    p.add_argument("--reduce-factor", type=int, default=1, choices=(1, 2, 4, 8),
+                   help="decode at 1/N resolution in grayscale (fast mode)")
+    p.add_argument("--no-cache", dest="use_cache", action="store_false", help="ignore and do not write audit.cache")
+    p.add_argument("--delete-types", default="all", help="issue types deleted with --yes, comma separated or 'all'")
+
+    p = _command(subparsers, "incremental-audit", "incremental_audit:incremental_audit",
+                 "audit only the files of a split that changed since the last audit")
+    p.add_argument("split_dir", help="split directory with images/ and labels/")
+    p.add_argument("--num-classes", type=int, default=6)
+    _add_quality_options(p)
+    p.add_argument("--delete-issue-types", type=_issue_types,
+                   default=("unreadable", "zero_size", "invalid_annotation", "empty_label", "missing_label"),
+                   help="comma separated issue types offered for deletion")
+    p.add_argument("--full", action="store_true", help="ignore the manifest and audit every file")
+
+    p = _command(subparsers, "preresize", "letterbox:preresize_dataset",
+                 "write a resized copy of a dataset for training", prompts=False)
+    p.add_argument("dataset_dir")
+    p.add_argument("out_dir")
+    p.add_argument("--target", type=int, default=640)
+    p.add_argument("--mode", choices=("resize", "letterbox"), default="resize")
+    p.add_argument("--workers", type=int, default=None, help="worker processes, default every CPU core")
+
+    p = _command(subparsers, "pack", "shard_pack:pack_split",
+                 "pack the images and labels of a split into shard files", timing=False, prompts=False)
+    p.add_argument("split_dir")
+    p.add_argument("out_dir")
+
+    p = _command(subparsers, "unpack", "shard_pack:unpack_shards",
+                 "write a packed split back into images/ and labels/", timing=False, prompts=False)
+    p.add_argument("shard_dir")
+    p.add_argument("split_dir")
+
+    return parser
+
+
+# This function imports the function behind a subcommand
+def resolve(target: str) -> Callable:
+    module_name, _, function_name = target.partition(":")
+    module = importlib.import_module(f"{__package__}.{module_name}")
+    return getattr(module, function_name)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    yes, dry_run = getattr(args, "yes", False), getattr(args, "dry_run", False)
+    from .prompts import set_answer_mode
+    set_answer_mode("yes" if yes else "no" if dry_run else "ask")
+
+    kwargs = {key: value for key, value in vars(args).items() if key not in _CLI_ARGS}
+    if args.convert is not None:
+        kwargs = args.convert(kwargs)
+
+    function = resolve(args.entry)
+    # Commands that rewrite label files in place have their own dry run
+    if "dry_run" in inspect.signature(function).parameters:
+        kwargs["dry_run"] = dry_run
+    function(**kwargs)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+import json
+import os
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .image_hashing import file_digest
+from .image_pairing import IMAGE_EXT, LABEL_EXT
+
+# Bump this when the entry layout below changes
+MANIFEST_VERSION = "1.0"
+
+# A manifest maps the path of every image and label of a split, relative to the split folder
+# (e.g. "images/a.jpg", "labels/a.txt"), to an entry:
+#   size    file size in bytes
+#   mtime   modification time in nanoseconds
+#   sha1    content hash, only recomputed when size or mtime changed
+#   issues  [issue type, detail] pairs found by the last audit of this file
+
+
+class ManifestDiff(NamedTuple):
+    added: List[str]
+    modified: List[str]     # content changed; a new mtime with the same sha1 is not a modification
+    removed: List[str]
+    unchanged: List[str]
+
+    @property
+    def changed(self) -> List[str]:
+        return self.added + self.modified
+
+
+# This function returns where the manifest of a split lives, e.g. train/manifest.json
+def default_manifest_path(split_dir: str) -> str:
+    return os.path.join(split_dir, "manifest.json")
+
+
+# This function reads a manifest; a missing or unreadable manifest is empty, so everything counts as added
+def load_manifest(manifest_path: str) -> Dict[str, Dict]:
+    if not os.path.exists(manifest_path):
+        return {}
+    try:
+        with open(manifest_path, "r") as f:
+            data = json.load(f)
+        if data.get("version") == MANIFEST_VERSION:
+            return data["entries"]
+        print(f"Ignoring manifest {manifest_path} with version {data.get('version')}")
+    except Exception as e:
+        print(f"Ignoring unreadable manifest {manifest_path}: {e}")
+    return {}
+
+
+# This function writes a manifest through a temporary file and an atomic rename
+def save_manifest(manifest_path: str, entries: Dict[str, Dict]):
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"version": MANIFEST_VERSION, "entries": entries}, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+# This function lists the images and labels of a split with the size and mtime of each file.
+# Returns manifest key -> (absolute path, size, mtime_ns).
+def scan_split(split_dir: str, image_ext: Tuple[str, ...] = IMAGE_EXT) -> Dict[str, Tuple[str, int, int]]:
+    found = {}
+    for sub, extensions in (("images", image_ext), ("labels", (LABEL_EXT,))):
+        directory = os.path.join(split_dir, sub)
+        if not os.path.isdir(directory):
+            continue
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.name.lower().endswith(extensions) and entry.is_file():
+                    st = entry.stat()
+                    found[f"{sub}/{entry.name}"] = (entry.path, st.st_size, st.st_mtime_ns)
+    return found
+
+
+# This function builds the new manifest entries of a split and diffs them against the previous manifest.
+# Files whose size and mtime are unchanged keep their hash; only the others are read and hashed.
+def update_manifest(
+    previous: Dict[str, Dict],
+    scanned: Dict[str, Tuple[str, int, int]],
+) -> Tuple[Dict[str, Dict], ManifestDiff, int]:
+
+    entries = {}
+    added, modified, unchanged = [], [], []
+    hashed_bytes = 0
+
+    for key in sorted(scanned):
+        path, size, mtime = scanned[key]
+        old = previous.get(key)
+        if old is not None and old["size"] == size and old["mtime"] == mtime:
+            entries[key] = old
+            unchanged.append(key)
+            continue
+
+        sha1 = file_digest(path)
+        hashed_bytes += size
+        if old is None:
+            added.append(key)
+            issues = []
+        elif old["sha1"] != sha1:
+            modified.append(key)
+            issues = []
+        else:
+            # Touched but identical: keep the audit result
+            unchanged.append(key)
+            issues = old.get("issues", [])
+        entries[key] = {"size": size, "mtime": mtime, "sha1": sha1, "issues": issues}
+
+    removed = sorted(key for key in previous if key not in scanned)
+    return entries, ManifestDiff(added, modified, removed, unchanged), hashed_bytes
+
+
+# This function returns the file stems touched by a diff, so an image is re-checked when only its label changed
+def changed_stems(keys: List[str]) -> List[str]:
+    return sorted({os.path.splitext(key.split("/", 1)[1])[0] for key in keys})
+
+
+# This function returns the manifest key of a file inside a split
+def manifest_key(split_dir: str, path: str) -> str:
+    return os.path.relpath(os.path.abspath(path), os.path.abspath(split_dir)).replace("\\", "/")
+
+
+# This function collects the issues stored for files that did not change, grouped by issue type
+def known_issues(entries: Dict[str, Dict], keys: Optional[List[str]] = None) -> Dict[str, List[Tuple[str, str]]]:
+    grouped: Dict[str, List[Tuple[str, str]]] = {}
+    for key in keys if keys is not None else entries:
+        for issue_type, detail in entries[key].get("issues", []):
+            grouped.setdefault(issue_type, []).append((key, detail))
+    return grouped
@@ -0,0 +1,373 @@
+import json
+import os
+import numpy as np
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .image_pairing import IMAGE_EXT, pair_dataset
+from .instrumentation import RunReport, StageTimer
+from .process_pool import map_chunks
+from .yolo_labels import CLASS_ID, FILE_IDX, H, W, load_label_table
+
+# Histogram bin edges are fixed, so the statistics of any chunk, worker process or split merge by adding counts.
+# Each histogram has len(edges) + 1 bins: below edges[0], one bin per pair of edges, and edges[-1] or above.
+AREA_BINS = np.geomspace(1e-6, 1.0, 61)       # box area as a fraction of the image area, 10 bins per decade
+SIZE_BINS = np.geomspace(1e-3, 1.0, 61)       # sqrt(box area in pixels) / long image side, 20 bins per decade
+ASPECT_BINS = np.geomspace(1 / 16, 16, 41)    # box width / height in pixels, ~15% per bin
+
+# Objects per image are counted exactly up to this number; images with more share the last bin
+MAX_OBJECTS = 64
+
+# Training sizes and box sizes (pixels) the small-object table of the report is printed for
+REPORT_IMGSZ = (320, 416, 512, 640, 800)
+REPORT_MIN_PIXELS = (8, 16, 32)
+
+
+def _histogram_index(values: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    return np.searchsorted(edges, values, side="right")
+
+
+# This function adds values to a (num_classes, bins) histogram with one bincount call
+def _add_class_histogram(hist: np.ndarray, cls: np.ndarray, values: np.ndarray, edges: np.ndarray):
+    num_bins = hist.shape[1]
+    flat = cls * num_bins + _histogram_index(values, edges)
+    hist += np.bincount(flat, minlength=hist.size).reshape(hist.shape)
+
+
+# This function returns an approximate quantile (0..1) of a histogram: the geometric middle of the bin it falls in
+def histogram_quantile(hist: np.ndarray, edges: np.ndarray, q: float) -> Optional[float]:
+    total = hist.sum()
+    if total == 0:
+        return None
+    i = int(np.searchsorted(np.cumsum(hist), q * total, side="left"))
+    if i == 0:
+        return float(edges[0])
+    if i >= len(edges):
+        return float(edges[-1])
+    return float(np.sqrt(edges[i - 1] * edges[i]))
+
+
+# This function returns how many histogram entries are certainly below value (bins whose upper edge is <= value)
+def histogram_count_below(hist: np.ndarray, edges: np.ndarray, value: float) -> int:
+    return int(hist[:int(np.searchsorted(edges, value, side="right"))].sum())
+
+
+class DatasetStats:
+    """
+    Streaming statistics of a YOLO dataset: class counts, box geometry histograms, objects per image
+    and image sizes. Chunks add their boxes with add_labels; partial statistics from worker processes
+    or other splits are combined with merge. Memory does not grow with the number of boxes.
+    """
+
+    def __init__(self, num_classes: int):
+        self.num_classes = num_classes
+        self.images = 0
+        self.unreadable_images = 0
+        self.label_files = 0
+        self.empty_label_files = 0
+        self.malformed_label_files = 0
+        self.unreadable_label_files = 0
+        self.invalid_boxes = 0                      # width or height not > 0
+        self.boxes_without_image_size = 0           # not in the pixel-based histograms
+
+        self.boxes_per_class = np.zeros(num_classes, dtype=np.int64)
+        self.files_per_class = np.zeros(num_classes, dtype=np.int64)
+        self.out_of_range_ids: Counter = Counter()  # class ID -> boxes, for IDs outside 0..num_classes-1
+        self.objects_per_image = np.zeros(MAX_OBJECTS + 1, dtype=np.int64)
+        self.image_sizes: Counter = Counter()       # "WxH" -> images
+
+        self.area_hist = np.zeros((num_classes, len(AREA_BINS) + 1), dtype=np.int64)
+        self.size_hist = np.zeros((num_classes, len(SIZE_BINS) + 1), dtype=np.int64)
+        self.aspect_hist = np.zeros((num_classes, len(ASPECT_BINS) + 1), dtype=np.int64)
+
+    # Adds the boxes of a label table. image_sizes holds (width, height) or None per label file of the table.
+    def add_labels(self, table: np.ndarray, num_files: int, image_sizes: Sequence[Optional[Tuple[int, int]]]):
+        file_idx = table[:, FILE_IDX].astype(np.int64)
+        cls = table[:, CLASS_ID].astype(np.int64)
+        w, h = table[:, W], table[:, H]
+
+        counts = np.bincount(file_idx, minlength=num_files)
+        self.objects_per_image += np.bincount(np.minimum(counts, MAX_OBJECTS), minlength=MAX_OBJECTS + 1)
+
+        in_range = (cls >= 0) & (cls < self.num_classes)
+        if not in_range.all():
+            ids, id_counts = np.unique(cls[~in_range], return_counts=True)
+            self.out_of_range_ids.update(dict(zip(ids.tolist(), id_counts.tolist())))
+
+        pairs = np.unique(file_idx[in_range] * self.num_classes + cls[in_range])
+        self.files_per_class += np.bincount(pairs % self.num_classes, minlength=self.num_classes)
+
+        valid = (w > 0) & (h > 0)
+        self.invalid_boxes += int((in_range & ~valid).sum())
+        keep = in_range & valid
+        file_idx, cls, w, h = file_idx[keep], cls[keep], w[keep], h[keep]
+        self.boxes_per_class += np.bincount(cls, minlength=self.num_classes)
+        _add_class_histogram(self.area_hist, cls, w * h, AREA_BINS)
+
+        sizes = np.array([s if s else (np.nan, np.nan) for s in image_sizes], dtype=np.float64).reshape(-1, 2)
+        image_w, image_h = sizes[file_idx, 0], sizes[file_idx, 1]
+        known = (image_w > 0) & (image_h > 0)  # False for NaN as well
+        self.boxes_without_image_size += int((~known).sum())
+        pw, ph = w[known] * image_w[known], h[known] * image_h[known]
+        _add_class_histogram(self.size_hist, cls[known], np.sqrt(pw * ph) / np.maximum(image_w[known], image_h[known]), SIZE_BINS)
+        _add_class_histogram(self.aspect_hist, cls[known], pw / ph, ASPECT_BINS)
+
+    def add_image(self, size: Optional[Tuple[int, int]]):
+        self.images += 1
+        if size is None:
+            self.unreadable_images += 1
+        else:
+            self.image_sizes[f"{size[0]}x{size[1]}"] += 1
+
+    def merge(self, other: "DatasetStats"):
+        if other.num_classes != self.num_classes:
+            raise ValueError(f"Cannot merge statistics of {other.num_classes} classes into {self.num_classes}")
+        for name in ("images", "unreadable_images", "label_files", "empty_label_files", "malformed_label_files",
+                     "unreadable_label_files", "invalid_boxes", "boxes_without_image_size"):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        for name in ("boxes_per_class", "files_per_class", "objects_per_image", "area_hist", "size_hist", "aspect_hist"):
+            getattr(self, name)[...] += getattr(other, name)
+        self.out_of_range_ids.update(other.out_of_range_ids)
+        self.image_sizes.update(other.image_sizes)
+        return self
+
+    def to_dict(self) -> Dict:
+        data = {key: (value.tolist() if isinstance(value, np.ndarray) else value) for key, value in vars(self).items()}
+        data["out_of_range_ids"] = {str(k): v for k, v in self.out_of_range_ids.items()}
+        data["image_sizes"] = dict(self.image_sizes.most_common())
+        data["bins"] = {"area": AREA_BINS.tolist(), "size": SIZE_BINS.tolist(), "aspect": ASPECT_BINS.tolist()}
+        return data
+
+    # Rebuilds statistics saved with to_dict, e.g. to merge the reports of separate runs
+    @classmethod
+    def from_dict(cls, data: Dict) -> "DatasetStats":
+        stats = cls(data["num_classes"])
+        for key, value in data.items():
+            if key in ("bins", "num_classes"):
+                continue
+            current = getattr(stats, key)
+            if isinstance(current, np.ndarray):
+                setattr(stats, key, np.array(value, dtype=np.int64))
+            elif isinstance(current, Counter):
+                setattr(stats, key, Counter({int(k) if key == "out_of_range_ids" else k: v for k, v in value.items()}))
+            else:
+                setattr(stats, key, value)
+        return stats
+
+    @property
+    def total_boxes(self) -> int:
+        return int(self.boxes_per_class.sum())
+
+
+def _image_size(image_path: str) -> Optional[Tuple[int, int]]:
+    from PIL import Image
+
+    try:
+        with Image.open(image_path) as img:
+            w, h = img.size
+            # EXIF orientations 5-8 are rotated by 90 degrees when the image is loaded for training
+            if img.getexif().get(0x0112) in (5, 6, 7, 8):
+                w, h = h, w
+            return w, h
+    except Exception:
+        return None
+
+
+# This function computes the statistics of one chunk of (image path or None, label file name or None, known size).
+# It runs in a worker process. Image sizes that are not known yet are read from the image headers.
+def stats_chunk(
+    items: List[Tuple[Optional[str], Optional[str], Optional[Tuple[int, int]]]],
+    label_dir: str,
+    num_classes: int,
+    read_image_sizes: bool = True,
+) -> Tuple[DatasetStats, StageTimer]:
+
+    stats = DatasetStats(num_classes)
+    timer = StageTimer()
+
+    sizes = []
+    with timer.stage("read"):
+        for image_path, _, size in items:
+            if image_path is None:
+                sizes.append(None)
+                continue
+            if size is None and read_image_sizes:
+                size = _image_size(image_path)
+                stats.add_image(size)
+            elif size is not None:
+                stats.add_image(size)
+                timer.count(0, cached=1)
+            else:
+                stats.images += 1
+            sizes.append(size)
+    timer.count(len(items))
+
+    labelled = [i for i, (_, label_file, _) in enumerate(items) if label_file]
+    # Images without a label file are background images with no objects
+    stats.objects_per_image[0] += sum(1 for image_path, label_file, _ in items if image_path and not label_file)
+    if not labelled:
+        return stats, timer
+
+    with timer.stage("read"):
+        labels = load_label_table(label_dir, [items[i][1] for i in labelled])
+    with timer.stage("check"):
+        stats.label_files += len(labels.files)
+        stats.empty_label_files += len(labels.empty)
+        stats.malformed_label_files += len(labels.malformed)
+        stats.unreadable_label_files += len(labels.unreadable)
+        # Malformed and unreadable files have no rows in the table and are left out of objects per image
+        skipped = set(labels.malformed) | set(labels.unreadable)
+        stats.add_labels(labels.table, len(labels.files), [sizes[i] for i in labelled])
+        stats.objects_per_image[0] -= len(skipped)
+    return stats, timer
+
+
+# This function collects the statistics of one split (split/images, split/labels) in one pass.
+# Image sizes come from the split's Ultralytics labels.cache when it is up to date, otherwise from
+# the image headers (read_image_sizes=False skips them and the pixel-based histograms).
+def collect_split_stats(
+    split_dir: str,
+    num_classes: int,
+    workers: Optional[int] = None,
+    chunk_size: int = 512,
+    read_image_sizes: bool = True,
+    timer: Optional[RunReport] = None,
+) -> DatasetStats:
+
+    timer = timer or RunReport("collect_split_stats")
+    image_dir, label_dir = os.path.join(split_dir, "images"), os.path.join(split_dir, "labels")
+
+    with timer.stage("listing"):
+        pairing = pair_dataset(image_dir, label_dir, image_ext=IMAGE_EXT)
+        known_sizes = {}
+        if read_image_sizes and os.path.isdir(image_dir):
+            from .ultralytics_cache import cached_image_sizes, load_ultralytics_cache
+            cached = load_ultralytics_cache(image_dir, label_dir)
+            known_sizes = cached_image_sizes(cached) if cached else {}
+
+        items = []
+        for stem in sorted(set(pairing.images) | set(pairing.labels)):
+            image_path = pairing.image_for(stem)
+            label_path = pairing.labels.get(stem)
+            size = known_sizes.get(os.path.basename(image_path)) if image_path else None
+            items.append((image_path, os.path.basename(label_path) if label_path else None, size))
+    timer.total = (timer.total or 0) + len(items)
+
+    results = map_chunks(
+        stats_chunk,
+        items,
+        workers=workers,
+        chunk_size=chunk_size,
+        on_result=lambda result: timer.add(result[1]),
+        label_dir=label_dir,
+        num_classes=num_classes,
+        read_image_sizes=read_image_sizes,
+    )
+
+    stats = DatasetStats(num_classes)
+    for chunk_stats, _ in results:
+        stats.merge(chunk_stats)
+    return stats
+
+
+def _fmt(value: Optional[float], digits: int = 3) -> str:
+    return "-" if value is None else f"{value:.{digits}g}"
+
+
+# This function prints the report of one DatasetStats
+def print_stats(stats: DatasetStats, title: str = "Dataset", class_names: Optional[Sequence[str]] = None):
+    names = list(class_names or []) + [str(i) for i in range(len(class_names or []), stats.num_classes)]
+
+    print(f"\n**** {title.upper()} STATISTICS ****")
+    print(f"Images: {stats.images} ({stats.unreadable_images} unreadable), label files: {stats.label_files} "
+          f"({stats.empty_label_files} empty, {stats.malformed_label_files} malformed, {stats.unreadable_label_files} unreadable)")
+    print(f"Boxes: {stats.total_boxes} ({stats.invalid_boxes} with zero or negative size left out)")
+    if stats.out_of_range_ids:
+        ids = ", ".join(f"{k}: {v}" for k, v in sorted(stats.out_of_range_ids.items()))
+        print(f"Boxes with class IDs outside 0..{stats.num_classes - 1}: {sum(stats.out_of_range_ids.values())} ({ids})")
+    if stats.boxes_without_image_size:
+        print(f"Boxes without a known image size (left out of size and aspect ratio): {stats.boxes_without_image_size}")
+
+    print("\nPer class (size = sqrt(box area) / long image side, aspect = width / height in pixels, medians):")
+    print(f"{'class':>12} {'boxes':>9} {'files':>8} {'area p50':>9} {'size p5':>8} {'size p50':>9} {'size p95':>9} {'aspect p50':>11}")
+    for c in range(stats.num_classes):
+        print(f"{names[c]:>12} {stats.boxes_per_class[c]:>9} {stats.files_per_class[c]:>8} "
+              f"{_fmt(histogram_quantile(stats.area_hist[c], AREA_BINS, 0.5)):>9} "
+              f"{_fmt(histogram_quantile(stats.size_hist[c], SIZE_BINS, 0.05)):>8} "
+              f"{_fmt(histogram_quantile(stats.size_hist[c], SIZE_BINS, 0.5)):>9} "
+              f"{_fmt(histogram_quantile(stats.size_hist[c], SIZE_BINS, 0.95)):>9} "
+              f"{_fmt(histogram_quantile(stats.aspect_hist[c], ASPECT_BINS, 0.5)):>11}")
+
+    size_hist = stats.size_hist.sum(axis=0)
+    aspect_hist = stats.aspect_hist.sum(axis=0)
+    if size_hist.sum():
+        print("\nAspect ratio (all classes): " + ", ".join(
+            f"p{int(q * 100)} {_fmt(histogram_quantile(aspect_hist, ASPECT_BINS, q))}" for q in (0.05, 0.25, 0.5, 0.75, 0.95)))
+        print("Boxes smaller than N pixels when the long side is resized to imgsz (lower bound, histogram bins):")
+        print(f"{'imgsz':>7} " + " ".join(f"{f'<{p}px':>8}" for p in REPORT_MIN_PIXELS))
+        total = size_hist.sum()
+        for imgsz in REPORT_IMGSZ:
+            cells = [histogram_count_below(size_hist, SIZE_BINS, p / imgsz) / total for p in REPORT_MIN_PIXELS]
+            print(f"{imgsz:>7} " + " ".join(f"{cell:>8.1%}" for cell in cells))
+
+    objects = stats.objects_per_image
+    if objects.sum():
+        mean = float((objects * np.arange(MAX_OBJECTS + 1)).sum() / objects.sum())
+        print(f"\nObjects per image: mean {mean:.2f} ({MAX_OBJECTS}+ counted as {MAX_OBJECTS}), "
+              f"p50 {int(np.searchsorted(np.cumsum(objects), 0.5 * objects.sum()))}, "
+              f"p95 {int(np.searchsorted(np.cumsum(objects), 0.95 * objects.sum()))}, "
+              f"no objects: {objects[0]}, {MAX_OBJECTS} or more: {objects[-1]}")
+
+    if stats.image_sizes:
+        print(f"Image sizes: {len(stats.image_sizes)} distinct, most common: "
+              + ", ".join(f"{size} ({count})" for size, count in stats.image_sizes.most_common(5)))
+
+
+# This function collects the statistics of every split of a dataset in one pass, prints a report per split
+# and for the whole dataset, and optionally writes all of them to a JSON file.
+# workers=None or 0 uses every CPU core.
+def dataset_statistics(
+    dataset_dir: str,
+    num_classes: int = 6,
+    splits: Tuple[str, ...] = ("train", "valid", "test"),
+    workers: Optional[int] = None,
+    chunk_size: int = 512,
+    read_image_sizes: bool = True,
+    class_names: Optional[Sequence[str]] = None,
+    report_path: Optional[str] = None,
+    timing_report: Optional[str] = None,
+) -> Dict[str, DatasetStats]:
+
+    timer = RunReport("dataset_statistics", report_path=timing_report)
+    per_split = {}
+    for split in splits:
+        split_dir = os.path.join(dataset_dir, split)
+        if not os.path.isdir(split_dir):
+            print(f"Warning: {split_dir} not found, skipping.")
+            continue
+        per_split[split] = collect_split_stats(split_dir, num_classes, workers, chunk_size, read_image_sizes, timer)
+    timer.finish()
+
+    total = DatasetStats(num_classes)
+    for split, stats in per_split.items():
+        print_stats(stats, split, class_names)
+        total.merge(stats)
+    if len(per_split) > 1:
+        print_stats(total, "all splits", class_names)
+
+    if report_path:
+        with open(report_path, "w") as f:
+            json.dump({"splits": {s: st.to_dict() for s, st in per_split.items()}, "total": total.to_dict()}, f)
+        print(f"\nStatistics saved to {report_path}")
+
+    per_split["total"] = total
+    return per_split
+
+
+if __name__ == "__main__":
+    dataset_statistics(
+        dataset_dir="C:/Middlesex/HomeBuddy/merged-dataset",
+        num_classes=6,
+        workers=4,
+        report_path="C:/Middlesex/HomeBuddy/merged-dataset/stats.json",
+    )
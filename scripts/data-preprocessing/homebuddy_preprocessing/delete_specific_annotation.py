@@ -0,0 +1,18 @@
+from .label_rewrite import rewrite_labels
+
+def delete_specific_class(label_dir, target_class_id, dry_run=False):
+    """
+    Deletes all lines from YOLO label files where the class ID equals `target_class_id`.
+    Files are rewritten atomically and only when a line is actually deleted.
+    """
+    print(f"Target class ID to delete: {target_class_id}")
+
+    summary = rewrite_labels(label_dir, [("drop", target_class_id)], dry_run=dry_run)
+
+    if summary['lines_dropped'] > 0:
+        if dry_run:
+            print(f"{summary['lines_dropped']} lines with class ID '{target_class_id}' would be removed.")
+        else:
+            print(f"All lines with class ID '{target_class_id}' have been removed.")
+    else:
+        print(f"No lines found with class ID '{target_class_id}'. Nothing deleted.")
@@ -0,0 +1,507 @@
+import io
+import os
+import cv2
+import numpy as np
+from PIL import Image
+from typing import Dict, List, Optional, Tuple
+
+from .audit_cache import AuditCache, default_cache_path
+from .image_pairing import pair_dataset, remove_file
+from .instrumentation import RunReport, StageTimer
+from .prompts import ask, confirm
+
+# Every issue type the audit can report, in the order they are printed
+ISSUE_TYPES = (
+    "unreadable",
+    "zero_size",
+    "too_small",
+    "extreme_aspect",
+    "low_variance",
+    "invalid_range",
+    "large",
+    "very_large",
+)
+QUALITY_ISSUE_TYPES = ("unreadable", "zero_size", "too_small", "extreme_aspect", "low_variance")
+RANGE_RESULT_TYPES = ("valid_range", "invalid_range", "unreadable")
+
+# Reduced-resolution grayscale decoding used by the fast mode (reduce_factor > 1).
+# JPEG decoders scale down while decoding (DCT scaling), so a 1/4 decode does a fraction of the work;
+# other formats are decoded in full and then resized, so they do not get faster.
+REDUCED_GRAYSCALE_FLAGS = {
+    2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    8: cv2.IMREAD_REDUCED_GRAYSCALE_8,
+}
+
+# EXIF orientations that swap width and height; cv2.imdecode applies them, PIL's header size does not
+_TRANSPOSED_ORIENTATIONS = (5, 6, 7, 8)
+
+
+# This function returns the name audit records of a decode mode are cached under
+def decode_mode(reduce_factor: int = 1) -> str:
+    if reduce_factor == 1:
+        return "full"
+    if reduce_factor not in REDUCED_GRAYSCALE_FLAGS:
+        raise ValueError(f"reduce_factor must be 1 or one of {sorted(REDUCED_GRAYSCALE_FLAGS)}, got {reduce_factor}")
+    return f"reduced{reduce_factor}"
+
+
+# This function reads the image size from the file header only, as cv2 would report it after EXIF rotation
+def _header_size(data: np.ndarray) -> Optional[Tuple[int, int]]:
+    try:
+        with Image.open(io.BytesIO(data.tobytes())) as img:
+            w, h = img.size
+            if img.getexif().get(0x0112) in _TRANSPOSED_ORIENTATIONS:
+                w, h = h, w
+            return w, h
+    except Exception:
+        return None
+
+
+# This function decodes an image once and collects every statistic the audit checks need.
+# The returned record is a plain dict so it can be reused by any check.
+# Reading, decoding and the pixel statistics are timed as separate stages when a timer is given.
+#
+# reduce_factor 2, 4 or 8 is the fast mode: width and height come from the file header, and min, max
+# and variance are computed on a 1/reduce_factor grayscale decode. Downscaling averages neighbouring
+# pixels, so the variance comes out lower than the exact one, almost never higher.
+# Measured with variance_error_report on merged-dataset (8538 images), relative to the exact variance:
+#   reduce_factor 2: median -0.7%, 99th percentile 10.8%, worst -33.2%, highest overestimate +1.4%
+#   reduce_factor 4: median -2.5%, 99th percentile 22.6%, worst -56.8%, never higher
+#   reduce_factor 8: median -6.0%, 99th percentile 35.9%, worst -75.4%, never higher
+# The images with large errors are detailed, high-variance ones (lowest exact variance is about 138), so no
+# image changed low_variance classification at thresholds 3.0 or 4.0; header sizes matched in every case.
+# Decode throughput on this dataset: 277 images/s full, 574 at 2, 735 at 4, 836 at 8 (one core).
+# The range values are those of the grayscale decode; a decoded image is always uint8, so the
+# range check itself cannot differ.
+def measure_image(path: str, timer: Optional[StageTimer] = None, reduce_factor: int = 1) -> Dict:
+    record = {
+        "readable": False,
+        "width": 0,
+        "height": 0,
+        "dtype": None,
+        "min": None,
+        "max": None,
+        "variance": None,
+    }
+
+    timer = timer if timer is not None else StageTimer()
+
+    # Reading the bytes ourselves and decoding them with imdecode is what cv2.imread does internally,
+    # but it lets the read and decode stages be timed apart
+    with timer.stage("read"):
+        try:
+            data = np.fromfile(path, dtype=np.uint8)
+        except OSError:
+            data = None
+    timer.count(1, 0 if data is None else data.size)
+    if data is None or data.size == 0:
+        return record
+
+    if reduce_factor > 1:
+        return _measure_reduced(data, record, timer, reduce_factor)
+
+    with timer.stage("decode"):
+        img = cv2.imdecode(data, cv2.IMREAD_COLOR)
+    if img is None:
+        return record
+
+    with timer.stage("check"):
+        h, w = img.shape[:2]
+        record.update(readable=True, width=w, height=h, dtype=str(img.dtype))
+        if w == 0 or h == 0:
+            return record
+
+        record["min"] = float(np.min(img))
+        record["max"] = float(np.max(img))
+
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        record["variance"] = float(np.var(gray))
+    return record
+
+
+# This function is the fast path of measure_image: header size plus a reduced grayscale decode
+def _measure_reduced(data: np.ndarray, record: Dict, timer: StageTimer, reduce_factor: int) -> Dict:
+    with timer.stage("read"):
+        size = _header_size(data)
+    if size is None:
+        return record
+
+    with timer.stage("decode"):
+        gray = cv2.imdecode(data, REDUCED_GRAYSCALE_FLAGS[reduce_factor])
+    if gray is None:
+        return record
+
+    with timer.stage("check"):
+        w, h = size
+        record.update(readable=True, width=w, height=h, dtype=str(gray.dtype))
+        if w == 0 or h == 0 or gray.size == 0:
+            return record
+
+        record["min"] = float(np.min(gray))
+        record["max"] = float(np.max(gray))
+        record["variance"] = float(np.var(gray))
+    return record
+
+
+# This function measures how far the fast-mode statistics are from the exact ones on a set of images.
+# It decodes every image in full and at each reduce factor, and reports the relative variance error,
+# size mismatches and how many images would change low_variance classification at each threshold.
+def variance_error_report(
+    paths: List[str],
+    reduce_factors: Tuple[int, ...] = (2, 4, 8),
+    thresholds: Tuple[float, ...] = (3.0, 4.0),
+) -> Dict[int, Dict]:
+
+    exact = {path: measure_image(path) for path in paths}
+    exact = {path: record for path, record in exact.items() if record["variance"] is not None}
+
+    report = {}
+    for factor in reduce_factors:
+        errors, size_mismatches, flips = [], 0, {t: 0 for t in thresholds}
+        for path, record in exact.items():
+            fast = measure_image(path, reduce_factor=factor)
+            if fast["variance"] is None:
+                continue
+            if (fast["width"], fast["height"]) != (record["width"], record["height"]):
+                size_mismatches += 1
+            if record["variance"] > 0:
+                errors.append(fast["variance"] / record["variance"] - 1)
+            for t in thresholds:
+                flips[t] += (fast["variance"] < t) != (record["variance"] < t)
+
+        errors = np.array(errors) if errors else np.zeros(1)
+        report[factor] = {
+            "images": len(exact),
+            "median_rel_error": float(np.median(errors)),
+            "worst_rel_error": float(errors[np.argmax(np.abs(errors))]),
+            "max_rel_error": float(np.max(errors)),
+            "p99_abs_rel_error": float(np.percentile(np.abs(errors), 99)),
+            "size_mismatches": size_mismatches,
+            "classification_flips": flips,
+        }
+        print(f"reduce_factor {factor}: median {100 * report[factor]['median_rel_error']:+.2f}%, "
+              f"worst {100 * report[factor]['worst_rel_error']:+.2f}%, "
+              f"max {100 * report[factor]['max_rel_error']:+.2f}%, "
+              f"p99 |error| {100 * report[factor]['p99_abs_rel_error']:.2f}%, "
+              f"size mismatches {size_mismatches}, low_variance flips {flips}")
+    return report
+
+
+# This function sorts one measured image into the issue buckets it falls into
+def classify_image(
+    path: str,
+    record: Dict,
+    issues: Dict[str, List[Tuple[str, str]]],
+    min_size: Tuple[int, int] = (64, 64),
+    max_aspect_ratio: float = 5.0,
+    low_variance_thresh: float = 3.0,
+    large_size: int = 820,
+    very_large_size: int = 4000,
+):
+    if not record["readable"]:
+        issues["unreadable"].append((path, ""))
+        return
+
+    w, h = record["width"], record["height"]
+    if w == 0 or h == 0:
+        issues["zero_size"].append((path, ""))
+        return
+
+    min_w, min_h = min_size
+    if w < min_w or h < min_h:
+        issues["too_small"].append((path, f"{w}x{h}"))
+
+    ar = max(w / h, h / w)
+    if ar > max_aspect_ratio:
+        issues["extreme_aspect"].append((path, f"AR={ar:.2f}, {w}x{h}"))
+
+    # The fast mode takes the size from the header; a decode without pixels has no statistics to check
+    var = record["variance"]
+    if var is not None and var < low_variance_thresh:
+        issues["low_variance"].append((path, f"var={var:.2f}"))
+
+    min_val, max_val = record["min"], record["max"]
+    if min_val is not None and max_val is not None and (
+            record["dtype"] != "uint8" or not (0 <= min_val <= 255 and 0 <= max_val <= 255)):
+        issues["invalid_range"].append((path, f"range=[{min_val:.4f}, {max_val:.4f}], dtype={record['dtype']}"))
+
+    # Independent checks: a very large image is also a large one
+    if w > large_size or h > large_size:
+        issues["large"].append((path, f"{w}x{h}"))
+    if w > very_large_size or h > very_large_size:
+        issues["very_large"].append((path, f"{w}x{h}"))
+
+
+# This function measures every (path, cached record) pair that has no cached record yet.
+# It returns all records in input order plus the freshly measured ones for the audit cache.
+def measure_items(
+    items: List[Tuple[str, Optional[Dict]]],
+    timer: Optional[StageTimer] = None,
+    reduce_factor: int = 1,
+) -> Tuple[List[Tuple[str, Dict]], Dict[str, Dict]]:
+    records = []
+    measured = {}
+    for path, record in items:
+        if record is None:
+            record = measure_image(path, timer, reduce_factor)
+            measured[path] = record
+        elif timer is not None:
+            timer.count(1, cached=1)
+        records.append((path, record))
+    return records, measured
+
+
+# This function decodes and measures one chunk of images.
+# It runs in a worker process when check_and_clean_quality (check-image-quality.py) uses several workers.
+# Items are (path, cached record or None) pairs; only uncached images are decoded.
+# The chunk's stage timings are returned with the results, to be merged into the run report.
+def check_quality_chunk(
+    items: List[Tuple[str, Optional[Dict]]],
+    min_size: Tuple[int, int],
+    max_aspect_ratio: float,
+    low_variance_thresh: float,
+    reduce_factor: int = 1,
+) -> Tuple[Dict[str, List[str]], Dict[str, Dict], StageTimer]:
+
+    found: Dict[str, List[Tuple[str, str]]] = {key: [] for key in ISSUE_TYPES}
+    timer = StageTimer()
+
+    # The rules are classify_image's; only the quality issues are reported, as "path (detail)"
+    records, measured = measure_items(items, timer, reduce_factor)
+    for path, record in records:
+        classify_image(path, record, found, min_size, max_aspect_ratio, low_variance_thresh)
+    issues = {key: [f"{path} ({detail})" if detail else path for path, detail in found[key]]
+              for key in QUALITY_ISSUE_TYPES}
+
+    return issues, measured, timer
+
+
+# This function decodes one chunk of images and sorts them by pixel range.
+# It runs in a worker process when check_and_clean_pixel_range (check-normalization.py) uses several workers.
+# Items are (path, cached record or None) pairs; only uncached images are decoded.
+# The chunk's stage timings are returned with the results, to be merged into the run report.
+def check_range_chunk(
+    items: List[Tuple[str, Optional[Dict]]],
+    reduce_factor: int = 1,
+) -> Tuple[Dict[str, List[str]], Dict[str, Dict], StageTimer]:
+    results: Dict[str, List[str]] = {key: [] for key in RANGE_RESULT_TYPES}
+    timer = StageTimer()
+
+    records, measured = measure_items(items, timer, reduce_factor)
+    for path, record in records:
+        if not record["readable"] or record["min"] is None:
+            results["unreadable"].append(path)
+            continue
+
+        min_val = record["min"]
+        max_val = record["max"]
+
+        if record["dtype"] == "uint8" and 0 <= min_val <= 255 and 0 <= max_val <= 255:
+            results["valid_range"].append(f"{path} (range=[{min_val:.0f}, {max_val:.0f}])")
+        else:
+            results["invalid_range"].append(f"{path} (range=[{min_val:.4f}, {max_val:.4f}], dtype={record['dtype']})")
+
+    return results, measured, timer
+
+
+# This function runs every image check on a directory, decoding each image only once
+def audit_images(
+    image_dir: str,
+    min_size: Tuple[int, int] = (64, 64),
+    max_aspect_ratio: float = 5.0,
+    low_variance_thresh: float = 3.0,
+    large_size: int = 820,
+    very_large_size: int = 4000,
+    valid_ext: Tuple[str, ...] = (".jpg", ".jpeg", ".png", ".bmp"),
+    use_cache: bool = True,
+    timer: Optional[RunReport] = None,
+    paths: Optional[List[str]] = None,
+    reduce_factor: int = 1,
+) -> Dict:
+    # use_cache reuses measurements from <split>/audit.cache for files whose size and mtime are unchanged
+    # timer, when given, collects the listing/read/decode/check timings and drives the progress line
+    # paths restricts the audit to these images instead of walking image_dir (incremental audits)
+    # reduce_factor 2, 4 or 8 measures on a reduced grayscale decode (fast mode, see measure_image)
+
+    issues: Dict[str, List[Tuple[str, str]]] = {key: [] for key in ISSUE_TYPES}
+    cache = AuditCache(default_cache_path(image_dir), decode_mode(reduce_factor)) if use_cache else None
+    timer = timer if timer is not None else RunReport("audit_images", show_progress=False)
+
+    full_scan = paths is None
+    if full_scan:
+        with timer.stage("listing"):
+            paths = []
+            for root, dirs, files in os.walk(image_dir):
+                dirs.sort()
+                paths.extend(os.path.join(root, f) for f in sorted(files) if f.lower().endswith(valid_ext))
+    timer.total = len(paths)
+
+    for path in paths:
+        record = cache.lookup(path) if cache else None
+        if record is None:
+            record = measure_image(path, timer, reduce_factor)
+            if cache:
+                cache.update({path: record})
+        else:
+            timer.count(1, cached=1)
+
+        with timer.stage("check"):
+            classify_image(
+                path,
+                record,
+                issues,
+                min_size=min_size,
+                max_aspect_ratio=max_aspect_ratio,
+                low_variance_thresh=low_variance_thresh,
+                large_size=large_size,
+                very_large_size=very_large_size,
+            )
+        timer.progress()
+
+    if cache:
+        cache.save(prune=full_scan)
+        print(cache.summary())
+
+    return {"image_dir": image_dir, "total": len(paths), "issues": issues}
+
+
+# This function prints the combined report produced by audit_images
+def print_audit_report(report: Dict, max_listed: int = 20):
+    print(f"\nTotal images checked: {report['total']}\n")
+
+    issues = report["issues"]
+    if not any(issues.values()):
+        print("All images passed every check.")
+        return
+
+    print("Image issues found:\n")
+    for key in ISSUE_TYPES:
+        entries = issues[key]
+        if not entries:
+            continue
+        title = key.replace("_", " ").title()
+        print(f" - {title}: {len(entries)}")
+        for path, detail in entries[:max_listed]:
+            print(f"     {path}" + (f" ({detail})" if detail else ""))
+        if len(entries) > max_listed:
+            print(f"     ...and {len(entries) - max_listed} more.")
+
+
+# This function merges the selected issue buckets into one deletion plan.
+# An image that fails several checks appears once, with all of its issue types.
+# Labels are matched by stem from one listing of the labels directory; missing labels are None.
+def build_deletion_plan(report: Dict, issue_types: List[str], label_dir: Optional[str] = None) -> List[Tuple[str, Optional[str], List[str]]]:
+    plan: Dict[str, Tuple[str, Optional[str], List[str]]] = {}
+    pairing = pair_dataset(report["image_dir"], label_dir)
+
+    for issue_type in ISSUE_TYPES:
+        if issue_type not in issue_types:
+            continue
+        for img_path, _ in report["issues"][issue_type]:
+            if img_path in plan:
+                plan[img_path][2].append(issue_type)
+            else:
+                plan[img_path] = (img_path, pairing.label_for(img_path), [issue_type])
+
+    return list(plan.values())
+
+
+# This function deletes every image and label in a deletion plan
+def delete_planned_files(plan: List[Tuple[str, Optional[str], List[str]]]) -> Tuple[int, int]:
+    deleted_images = 0
+    deleted_labels = 0
+
+    for img_path, label_path, _ in plan:
+        if remove_file(img_path, "image"):
+            deleted_images += 1
+
+        if label_path and remove_file(label_path, "label"):
+            deleted_labels += 1
+
+    return deleted_images, deleted_labels
+
+
+# This function audits all images in a directory in a single decode pass.
+# If issues are found, user confirmation is required for deletion.
+def audit_and_clean_images(
+    image_dir: str,
+    label_dir: str = None,
+    min_size: Tuple[int, int] = (64, 64),
+    max_aspect_ratio: float = 5.0,
+    low_variance_thresh: float = 3.0,
+    large_size: int = 820,
+    very_large_size: int = 4000,
+    valid_ext: Tuple[str, ...] = (".jpg", ".jpeg", ".png", ".bmp"),
+    use_cache: bool = True,
+    timing_report: Optional[str] = None,
+    reduce_factor: int = 1,
+    delete_types: str = "all",
+):
+    # timing_report is an optional path for a JSON file with the stage timings of this run
+    # reduce_factor 2, 4 or 8 switches to the fast reduced-resolution measurements
+    # delete_types answers the issue type prompt when prompts are confirmed automatically (--yes)
+
+    print(f"\nAuditing images in: {image_dir}")
+    timer = RunReport("audit_and_clean_images", report_path=timing_report)
+
+    report = audit_images(
+        image_dir,
+        min_size=min_size,
+        max_aspect_ratio=max_aspect_ratio,
+        low_variance_thresh=low_variance_thresh,
+        large_size=large_size,
+        very_large_size=very_large_size,
+        valid_ext=valid_ext,
+        use_cache=use_cache,
+        timer=timer,
+        reduce_factor=reduce_factor,
+    )
+    timer.finish()
+    print_audit_report(report)
+
+    if not any(report["issues"].values()):
+        return
+
+    print(f"\nAvailable issue types: {', '.join(ISSUE_TYPES)}")
+    choice = ask("Enter issue types to delete (comma separated) or 'all': ", delete_types)
+
+    if choice == 'all':
+        issue_types_to_remove = list(ISSUE_TYPES)
+    else:
+        issue_types_to_remove = [c.strip() for c in choice.split(',') if c.strip() in report["issues"]]
+
+    plan = build_deletion_plan(report, issue_types_to_remove, label_dir)
+    if not plan:
+        print("\nNo files found for the selected issue types.")
+        return
+
+    print(f"\n{len(plan)} images to be deleted!\n")
+    for idx, (img_path, label_path, issue_types) in enumerate(plan, 1):
+        print(f"{idx}. Issues: {', '.join(issue_types)}")
+        print(f"Image: {img_path}")
+        print(f"Label: {label_path if label_path else '(not found)'}")
+        print()
+
+    if not confirm(f"\nDo you want to delete all {len(plan)} images and their labels? (y/n): "):
+        print("\nNo files were deleted.")
+        return
+
+    print("\nDeleting files...\n")
+    with timer.stage("delete"):
+        deleted_images, deleted_labels = delete_planned_files(plan)
+    timer.save()
+
+    print("\n**** SUMMARY ****")
+    print(f"Total images deleted: {deleted_images}")
+    print(f"Total labels deleted: {deleted_labels}")
+
+
+if __name__ == "__main__":
+    audit_and_clean_images(
+        image_dir="C:/Middlesex/HomeBuddy/merged-dataset/test/images",
+        label_dir="C:/Middlesex/HomeBuddy/merged-dataset/test/labels",
+        min_size=(416, 416),
+        max_aspect_ratio=10.0,
+        low_variance_thresh=4.0,
+    )
@@ -0,0 +1,99 @@
+import hashlib
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from PIL import Image
+
+
+# This function hashes a file in fixed-size blocks, so large files are never fully loaded
+def file_digest(path: str, algorithm: str = "sha1", block_size: int = 1 << 20) -> str:
+    digest = hashlib.new(algorithm)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# This function computes the 64-bit difference hash (dHash) of an image.
+# Visually identical images (re-encoded, resized, renamed) end up a few bits apart.
+def dhash(path: str, hash_size: int = 8) -> Optional[int]:
+    try:
+        with Image.open(path) as img:
+            # Let the JPEG decoder scale down while decoding, the hash only needs a tiny thumbnail
+            img.draft("L", (hash_size * 8, hash_size * 8))
+            small = img.convert("L").resize((hash_size + 1, hash_size), Image.BILINEAR)
+    except Exception:
+        return None
+
+    pixels = small.tobytes()
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+# This function computes the dHash of one chunk of images, for use with process_pool.map_chunks
+def dhash_chunk(paths: List[str], hash_size: int = 8) -> List[Optional[int]]:
+    return [dhash(path, hash_size) for path in paths]
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class HashBuckets:
+    """
+    LSH index for finding hashes within a Hamming distance of each other.
+    The hash bits are split into max_distance + 1 bands; by the pigeonhole principle two hashes
+    at most max_distance bits apart agree on at least one band, so only hashes that share a band
+    bucket are ever compared.
+    """
+
+    def __init__(self, max_distance: int = 4, hash_bits: int = 64):
+        self.max_distance = max_distance
+        num_bands = max_distance + 1
+        edges = [round(i * hash_bits / num_bands) for i in range(num_bands + 1)]
+        self.bands = [(edges[i], edges[i + 1] - edges[i]) for i in range(num_bands)]
+        self.buckets: List[Dict[int, List[int]]] = [defaultdict(list) for _ in self.bands]
+        self.hashes: List[int] = []
+
+    def _keys(self, value: int) -> Iterable[int]:
+        for shift, width in self.bands:
+            yield (value >> shift) & ((1 << width) - 1)
+
+    # Adds a hash and returns the ids of previously added hashes within max_distance
+    def add(self, value: int) -> List[int]:
+        candidates: Set[int] = set()
+        for band, key in zip(self.buckets, self._keys(value)):
+            candidates.update(band.get(key, ()))
+
+        matches = [i for i in candidates if hamming_distance(self.hashes[i], value) <= self.max_distance]
+
+        new_id = len(self.hashes)
+        self.hashes.append(value)
+        for band, key in zip(self.buckets, self._keys(value)):
+            band[key].append(new_id)
+        return sorted(matches)
+
+
+# This function groups items connected by near-duplicate matches (union-find)
+def group_matches(num_items: int, matches: Iterable[Tuple[int, int]]) -> List[List[int]]:
+    parent = list(range(num_items))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for a, b in matches:
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    groups: Dict[int, List[int]] = defaultdict(list)
+    for i in range(num_items):
+        groups[find(i)].append(i)
+    return [members for members in groups.values() if len(members) > 1]
@@ -0,0 +1,85 @@
+import os
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+IMAGE_EXT = (".jpg", ".jpeg", ".png", ".bmp")
+LABEL_EXT = ".txt"
+
+
+class DatasetPairing(NamedTuple):
+    images: Dict[str, List[str]]        # stem -> image paths, in IMAGE_EXT order
+    labels: Dict[str, str]              # stem -> label path
+    pairs: Dict[str, Tuple[str, str]]   # stem -> (image path, label path) for stems with both
+    orphan_images: List[str]            # images without a label file
+    orphan_labels: List[str]            # label files without any image
+    conflicts: Dict[str, List[str]]     # stems with more than one image (e.g. a.jpg and a.png)
+
+    def image_for(self, stem: str) -> Optional[str]:
+        paths = self.images.get(stem)
+        return paths[0] if paths else None
+
+    def label_for(self, image_path: str) -> Optional[str]:
+        return self.labels.get(os.path.splitext(os.path.basename(image_path))[0])
+
+
+# This function lists the files of one directory with os.scandir, keyed by stem.
+# Only the directory listing is read: no per-file stat or exists calls.
+def scan_by_stem(directory: Optional[str], extensions: Tuple[str, ...]) -> Dict[str, List[str]]:
+    found: Dict[str, List[str]] = {}
+    if not directory or not os.path.isdir(directory):
+        return found
+
+    with os.scandir(directory) as it:
+        for entry in it:
+            stem, ext = os.path.splitext(entry.name)
+            ext = ext.lower()
+            if ext in extensions and entry.is_file():
+                found.setdefault(stem, []).append(entry.path)
+
+    # Keep the extension preference order stable, so the chosen image never depends on listing order
+    for stem, paths in found.items():
+        paths.sort(key=lambda p: (extensions.index(os.path.splitext(p)[1].lower()), p))
+    return found
+
+
+# This function returns the labels directory that sits next to an images directory
+def sibling_label_dir(image_dir: str) -> str:
+    head, tail = os.path.split(os.path.normpath(image_dir))
+    return os.path.join(head, "labels") if tail == "images" else image_dir
+
+
+# This function pairs the images and labels of a split in O(n).
+# Each directory is listed once and matched by file stem.
+def pair_dataset(image_dir: str, label_dir: Optional[str] = None, image_ext: Tuple[str, ...] = IMAGE_EXT) -> DatasetPairing:
+    image_ext = tuple(ext.lower() for ext in image_ext)
+    label_dir = label_dir or sibling_label_dir(image_dir)
+
+    images = scan_by_stem(image_dir, image_ext)
+    labels = {stem: paths[0] for stem, paths in scan_by_stem(label_dir, (LABEL_EXT,)).items()}
+
+    pairs = {}
+    orphan_images = []
+    for stem in sorted(images):
+        label_path = labels.get(stem)
+        if label_path is None:
+            orphan_images.extend(images[stem])
+        else:
+            pairs[stem] = (images[stem][0], label_path)
+
+    orphan_labels = [labels[stem] for stem in sorted(labels) if stem not in images]
+    conflicts = {stem: paths for stem, paths in sorted(images.items()) if len(paths) > 1}
+
+    return DatasetPairing(images, labels, pairs, orphan_images, orphan_labels, conflicts)
+
+
+# This function deletes a file that is known to exist from a directory listing.
+# Returns True when the file was removed.
+def remove_file(path: str, kind: str = "file") -> bool:
+    try:
+        os.remove(path)
+        print(f"Deleted {kind}: {path}")
+        return True
+    except FileNotFoundError:
+        return False
+    except Exception as e:
+        print(f"Error deleting {kind} {path}: {e}")
+        return False
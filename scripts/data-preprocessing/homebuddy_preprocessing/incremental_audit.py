@@ -0,0 +1,147 @@
+import os
+from typing import Dict, List, Optional, Tuple
+
+from .dataset_manifest import (
+    changed_stems,
+    default_manifest_path,
+    known_issues,
+    load_manifest,
+    manifest_key,
+    save_manifest,
+    scan_split,
+    update_manifest,
+)
+from .image_audit import ISSUE_TYPES, audit_images
+from .image_pairing import pair_dataset, remove_file
+from .instrumentation import RunReport
+from .prompts import confirm
+from .yolo_labels import invalid_files, load_label_table
+
+LABEL_ISSUE_TYPES = ("missing_label", "invalid_annotation", "empty_label", "unreadable_label")
+
+
+# This function checks the label files of the changed stems and returns their issues by manifest key
+def _check_changed_labels(split_dir, pairing, stems, num_classes) -> Dict[str, List[Tuple[str, str]]]:
+    issues: Dict[str, List[Tuple[str, str]]] = {}
+    label_dir = os.path.join(split_dir, "labels")
+
+    label_files = []
+    for stem in stems:
+        label_path = pairing.labels.get(stem)
+        if label_path:
+            label_files.append(os.path.basename(label_path))
+        elif stem in pairing.images:
+            issues.setdefault(manifest_key(split_dir, pairing.images[stem][0]), []).append(("missing_label", ""))
+
+    labels = load_label_table(label_dir, label_files)
+    for issue_type, indices in (
+        ("invalid_annotation", invalid_files(labels, num_classes)),
+        ("empty_label", labels.empty),
+        ("unreadable_label", labels.unreadable),
+    ):
+        for i in indices:
+            issues.setdefault(f"labels/{labels.files[i]}", []).append((issue_type, ""))
+    return issues
+
+
+# This function audits only the images and labels that were added or modified since the last audit.
+# The split's manifest.json records size, mtime and content hash of every file plus the issues found;
+# files whose content did not change are not opened again and keep their recorded issues.
+# The manifest is written once the audit completes, without the files deleted during the run;
+# a dry run writes nothing (no manifest, no audit cache), so the next run still sees the same changes.
+def incremental_audit(
+    split_dir: str,
+    num_classes: int = 6,
+    min_size: Tuple[int, int] = (64, 64),
+    max_aspect_ratio: float = 5.0,
+    low_variance_thresh: float = 3.0,
+    delete_issue_types: Tuple[str, ...] = ("unreadable", "zero_size", "invalid_annotation", "empty_label", "missing_label"),
+    full: bool = False,
+    dry_run: bool = False,
+    timing_report: Optional[str] = None,
+):
+    # full=True ignores the stored manifest and audits every file
+
+    timer = RunReport("incremental_audit", report_path=timing_report)
+    manifest_path = default_manifest_path(split_dir)
+    previous = {} if full else load_manifest(manifest_path)
+
+    with timer.stage("listing"):
+        scanned = scan_split(split_dir)
+        pairing = pair_dataset(os.path.join(split_dir, "images"), os.path.join(split_dir, "labels"))
+    with timer.stage("read"):
+        entries, diff, hashed_bytes = update_manifest(previous, scanned)
+    timer.count(0, hashed_bytes)
+
+    print(f"\nIncremental audit of: {split_dir}")
+    print(f"Files in manifest: {len(previous)}, on disk: {len(scanned)}")
+    print(f"Added: {len(diff.added)}, modified: {len(diff.modified)}, removed: {len(diff.removed)}, unchanged: {len(diff.unchanged)}")
+
+    stems = changed_stems(diff.changed + diff.removed)
+    image_paths = [pairing.images[stem][0] for stem in stems if stem in pairing.images]
+
+    # Issues of changed files are recomputed; an image is re-checked when only its label changed
+    for stem in stems:
+        for path in pairing.images.get(stem, []) + ([pairing.labels[stem]] if stem in pairing.labels else []):
+            entries[manifest_key(split_dir, path)]["issues"] = []
+
+    report = audit_images(
+        os.path.join(split_dir, "images"),
+        min_size=min_size,
+        max_aspect_ratio=max_aspect_ratio,
+        low_variance_thresh=low_variance_thresh,
+        timer=timer,
+        paths=image_paths,
+        use_cache=not dry_run,
+    )
+    for issue_type in ISSUE_TYPES:
+        for path, detail in report["issues"][issue_type]:
+            entries[manifest_key(split_dir, path)]["issues"].append([issue_type, detail])
+
+    with timer.stage("check"):
+        label_issues = _check_changed_labels(split_dir, pairing, stems, num_classes)
+    for key, found in label_issues.items():
+        entries[key]["issues"].extend([issue_type, detail] for issue_type, detail in found)
+    timer.finish()
+
+    changed_keys = {manifest_key(split_dir, p) for stem in stems for p in pairing.images.get(stem, [])}
+    changed_keys.update(f"labels/{stem}.txt" for stem in stems if stem in pairing.labels)
+    new_issues = known_issues(entries, sorted(changed_keys))
+    carried = known_issues(entries, sorted(set(entries) - changed_keys))
+
+    print(f"\nImages audited: {len(image_paths)} of {sum(len(p) for p in pairing.images.values())}")
+    print("\n**** SUMMARY ****")
+    for issue_type in ISSUE_TYPES + LABEL_ISSUE_TYPES:
+        new, old = new_issues.get(issue_type, []), carried.get(issue_type, [])
+        if new or old:
+            print(f" - {issue_type.replace('_', ' ').title()}: {len(new)} new, {len(old)} from earlier audits")
+            for key, detail in new[:20]:
+                print(f"     {key}" + (f" ({detail})" if detail else ""))
+            for key, detail in old[:max(0, 20 - len(new))]:
+                print(f"     {key}" + (f" ({detail}, " if detail else " (") + "earlier audit)")
+    if not new_issues and not carried:
+        print("No issues found.")
+
+    # Files with issues are deleted as image/label pairs, including issues recorded by earlier audits
+    # that were not deleted then (declined or dry run)
+    to_delete = sorted({os.path.splitext(key.split("/", 1)[1])[0]
+                        for issues in (new_issues, carried)
+                        for issue_type in delete_issue_types for key, _ in issues.get(issue_type, [])})
+    if to_delete:
+        if confirm(f"\nDo you want to delete the {len(to_delete)} images/labels with {', '.join(delete_issue_types)} issues? (y/n): "):
+            with timer.stage("delete"):
+                for stem in to_delete:
+                    for path in pairing.images.get(stem, []):
+                        if remove_file(path, "image"):
+                            entries.pop(manifest_key(split_dir, path), None)
+                    if stem in pairing.labels and remove_file(pairing.labels[stem], "label"):
+                        entries.pop(manifest_key(split_dir, pairing.labels[stem]), None)
+        else:
+            print("\nNo files were deleted.")
+
+    timer.save()
+    if dry_run:
+        print(f"\nDry run: manifest {manifest_path} not updated")
+        return
+    save_manifest(manifest_path, entries)
+    print(f"\nManifest saved: {manifest_path} ({len(entries)} files)")
@@ -0,0 +1,136 @@
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+# Stages reported by the preprocessing checks, in the order they are printed
+STAGES = ("listing", "read", "decode", "check", "delete")
+
+
+class StageTimer:
+    """
+    Accumulates wall time per stage plus file and byte counters.
+    It is a plain picklable object, so worker processes can return one to be merged by the caller.
+    """
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = defaultdict(float)
+        self.files = 0
+        self.bytes = 0
+        self.cached = 0
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] += time.perf_counter() - start
+
+    def count(self, files: int = 1, nbytes: int = 0, cached: int = 0):
+        self.files += files
+        self.bytes += nbytes
+        self.cached += cached
+
+    def merge(self, other: "StageTimer"):
+        for name, seconds in other.seconds.items():
+            self.seconds[name] += seconds
+        self.files += other.files
+        self.bytes += other.bytes
+        self.cached += other.cached
+
+
+class RunReport(StageTimer):
+    """
+    Timing report of one check run, kept in the main process.
+    Shows a live progress line (at most a few updates per second) and can write a JSON report.
+    Stage times from worker processes are summed, so with several workers they can exceed the wall time.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        total: Optional[int] = None,
+        show_progress: bool = True,
+        report_path: Optional[str] = None,
+        refresh_interval: float = 0.5,
+    ):
+        super().__init__()
+        self.name = name
+        self.total = total
+        self.show_progress = show_progress and sys.stdout.isatty()
+        self.report_path = report_path
+        self.refresh_interval = refresh_interval
+        self.started = time.perf_counter()
+        self._last_refresh = 0.0
+        self._progress_shown = False
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def rates(self):
+        elapsed = max(self.elapsed(), 1e-9)
+        return self.files / elapsed, self.bytes / elapsed / 1e6
+
+    # Merges the timings returned by a worker chunk and refreshes the progress line
+    def add(self, timings: StageTimer):
+        self.merge(timings)
+        self.progress()
+
+    # Redraws the progress line, throttled so it stays cheap inside hot loops
+    def progress(self):
+        if not self.show_progress:
+            return
+        now = time.perf_counter()
+        if now - self._last_refresh < self.refresh_interval:
+            return
+        self._last_refresh = now
+
+        files_per_sec, mb_per_sec = self.rates()
+        done = f"{self.files}/{self.total}" if self.total else f"{self.files}"
+        sys.stdout.write(f"\r[{self.name}] {done} files  {files_per_sec:.1f} files/s  {mb_per_sec:.1f} MB/s   ")
+        sys.stdout.flush()
+        self._progress_shown = True
+
+    def to_dict(self) -> Dict:
+        files_per_sec, mb_per_sec = self.rates()
+        return {
+            "name": self.name,
+            "wall_seconds": round(self.elapsed(), 4),
+            "files": self.files,
+            "cached_files": self.cached,
+            "bytes": self.bytes,
+            "files_per_sec": round(files_per_sec, 2),
+            "mb_per_sec": round(mb_per_sec, 2),
+            "stages": {name: round(seconds, 4) for name, seconds in self.seconds.items()},
+        }
+
+    # Writes the JSON timing report, if a report path was given
+    def save(self):
+        if not self.report_path:
+            return
+        directory = os.path.dirname(os.path.abspath(self.report_path))
+        os.makedirs(directory, exist_ok=True)
+        with open(self.report_path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    # Prints the per-stage timing table and saves the JSON report
+    def finish(self):
+        if self._progress_shown:
+            sys.stdout.write("\n")
+            self._progress_shown = False
+
+        report = self.to_dict()
+        print(f"\n---- Timing: {self.name} ----")
+        stage_total = sum(self.seconds.values()) or 1e-9
+        ordered = [s for s in STAGES if s in self.seconds] + [s for s in self.seconds if s not in STAGES]
+        for name in ordered:
+            seconds = self.seconds[name]
+            print(f"{name:>10}: {seconds:8.3f}s ({100 * seconds / stage_total:5.1f}%)")
+        print(f"{'wall':>10}: {report['wall_seconds']:8.3f}s")
+        print(f"Throughput: {report['files_per_sec']} files/s, {report['mb_per_sec']} MB/s"
+              + (f" ({self.cached} files from cache)" if self.cached else ""))
+        self.save()
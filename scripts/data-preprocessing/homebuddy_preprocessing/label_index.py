@@ -0,0 +1,163 @@
+import json
+import os
+import shutil
+import numpy as np
+from typing import List, Optional, Tuple
+
+from .yolo_labels import LabelTable, load_label_table
+
+# Bump this when the on-disk layout below changes
+LABEL_INDEX_VERSION = "1.0"
+
+# Per-file status codes stored in status.npy
+STATUS_OK, STATUS_EMPTY, STATUS_MALFORMED, STATUS_UNREADABLE = 0, 1, 2, 3
+
+# On-disk layout of an index directory:
+#   boxes.npy    (N, 5) float64 rows of class, cx, cy, w, h for every box of the split
+#   offsets.npy  (F + 1,) int64, boxes of file i are boxes[offsets[i]:offsets[i + 1]]
+#   status.npy   (F,) int8 status code of every file
+#   files.json   version, file names and the size/mtime each file had when the index was built
+
+
+# This function returns where the label index of a labels directory lives, e.g. train/labels/.labels.index.
+# It sits inside the labels directory, so every labels directory of a split gets its own index.
+def default_index_dir(label_dir: str) -> str:
+    return os.path.join(os.path.abspath(label_dir), ".labels.index")
+
+
+# This function lists the label files of a directory with the size and mtime of each one
+def scan_label_files(label_dir: str) -> List[Tuple[str, int, int]]:
+    entries = []
+    with os.scandir(label_dir) as it:
+        for entry in it:
+            if entry.name.lower().endswith(".txt") and entry.is_file():
+                st = entry.stat()
+                entries.append((entry.name, st.st_size, st.st_mtime_ns))
+    entries.sort()
+    return entries
+
+
+class LabelIndex:
+    """
+    Memory-mapped view of a compiled labels directory.
+    Use open_label_index() to get one; it is rebuilt whenever a label file changes.
+    in_memory() holds the same arrays without an index directory, for labels the user cannot write next to.
+    """
+
+    def __init__(self, label_dir: str, index_dir: str):
+        self.label_dir = label_dir
+        self.index_dir = index_dir
+
+        with open(os.path.join(index_dir, "files.json"), "r") as f:
+            meta = json.load(f)
+        if meta.get("version") != LABEL_INDEX_VERSION:
+            raise ValueError(f"Unsupported label index version: {meta.get('version')}")
+
+        self.files: List[str] = meta["files"]
+        self.signature = [tuple(s) for s in meta["signature"]]
+        self.boxes = np.load(os.path.join(index_dir, "boxes.npy"), mmap_mode="r")
+        self.offsets = np.load(os.path.join(index_dir, "offsets.npy"), mmap_mode="r")
+        self.status = np.load(os.path.join(index_dir, "status.npy"), mmap_mode="r")
+
+    @classmethod
+    def in_memory(cls, label_dir: str, signature) -> "LabelIndex":
+        index = cls.__new__(cls)
+        index.label_dir = label_dir
+        index.index_dir = None
+        index.signature = [tuple(s) for s in signature]
+        index.files, index.boxes, index.offsets, index.status = compile_labels(label_dir, signature)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def path(self, file_idx: int) -> str:
+        return os.path.join(self.label_dir, self.files[file_idx])
+
+    # Returns the (n, 5) boxes of one file without reading the rest of the index
+    def boxes_of(self, file_idx: int) -> np.ndarray:
+        return self.boxes[self.offsets[file_idx]:self.offsets[file_idx + 1]]
+
+    # Returns the file index of every box row
+    def file_idx_column(self) -> np.ndarray:
+        return np.repeat(np.arange(len(self.files), dtype=np.int64), np.diff(self.offsets))
+
+    def files_with_status(self, status: int) -> List[int]:
+        return np.flatnonzero(np.asarray(self.status) == status).tolist()
+
+    # Returns the index contents in the layout produced by yolo_labels.load_label_table
+    def label_table(self) -> LabelTable:
+        table = np.column_stack([self.file_idx_column().astype(np.float64), self.boxes])
+        return LabelTable(
+            self.files,
+            table,
+            self.files_with_status(STATUS_MALFORMED),
+            self.files_with_status(STATUS_EMPTY),
+            self.files_with_status(STATUS_UNREADABLE),
+        )
+
+
+# This function reads the label files of a signature into the arrays of an index: file names, boxes,
+# offsets and status
+def compile_labels(label_dir: str, signature) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+    files = [name for name, _, _ in signature]
+
+    labels = load_label_table(label_dir, files)
+
+    status = np.zeros(len(files), dtype=np.int8)
+    status[labels.empty] = STATUS_EMPTY
+    status[labels.malformed] = STATUS_MALFORMED
+    status[labels.unreadable] = STATUS_UNREADABLE
+
+    counts = np.bincount(labels.table[:, 0].astype(np.int64), minlength=len(files))
+    offsets = np.zeros(len(files) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+
+    # The table is already grouped by file in file order, so the box rows line up with offsets
+    return files, np.ascontiguousarray(labels.table[:, 1:]), offsets, status
+
+
+# This function compiles a labels directory into an index directory
+def build_label_index(label_dir: str, index_dir: Optional[str] = None, signature=None) -> str:
+    index_dir = index_dir or default_index_dir(label_dir)
+    if signature is None:
+        signature = scan_label_files(label_dir)
+    files, boxes, offsets, status = compile_labels(label_dir, signature)
+
+    tmp_dir = index_dir + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    np.save(os.path.join(tmp_dir, "boxes.npy"), boxes)
+    np.save(os.path.join(tmp_dir, "offsets.npy"), offsets)
+    np.save(os.path.join(tmp_dir, "status.npy"), status)
+    with open(os.path.join(tmp_dir, "files.json"), "w") as f:
+        json.dump({"version": LABEL_INDEX_VERSION, "files": files, "signature": signature}, f)
+
+    shutil.rmtree(index_dir, ignore_errors=True)
+    os.replace(tmp_dir, index_dir)
+    return index_dir
+
+
+# This function opens the index of a labels directory.
+# The index is (re)built when it is missing, unreadable, or any label file was added, removed or modified.
+# When it cannot be written (e.g. a read-only dataset), the labels are read into memory for this run instead.
+def open_label_index(label_dir: str, index_dir: Optional[str] = None) -> LabelIndex:
+    index_dir = index_dir or default_index_dir(label_dir)
+    signature = [tuple(s) for s in scan_label_files(label_dir)]
+
+    try:
+        index = LabelIndex(label_dir, index_dir)
+        if index.signature == signature:
+            return index
+        index = None  # release the memory maps before the files are replaced
+    except (OSError, ValueError, KeyError):
+        pass
+
+    print(f"Building label index for {label_dir} ({len(signature)} files)...")
+    try:
+        build_label_index(label_dir, index_dir, signature)
+    except OSError as e:
+        shutil.rmtree(index_dir + ".tmp", ignore_errors=True)
+        print(f"Could not write label index {index_dir}: {e}; reading the labels without it")
+        return LabelIndex.in_memory(label_dir, signature)
+    return LabelIndex(label_dir, index_dir)
@@ -0,0 +1,222 @@
+import os
+import shutil
+import tempfile
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+# An operation is one of:
+#   ("remap", {old_id: new_id, ...})   change class IDs
+#   ("drop", class_id or [class_id, ...])  delete boxes of these classes
+#   ("clamp", None)                    clip boxes to the image frame, dropping boxes with no area left
+# Operations are applied to every line in the order they are given.
+Operation = Tuple[str, Union[Dict[int, int], int, Sequence[int], None]]
+
+OPERATION_TYPES = ("remap", "drop", "clamp")
+
+# Boxes that overshoot the frame by less than this are left alone (rounding in exported labels)
+CLAMP_TOLERANCE = 1e-6
+
+
+# This function checks an operation list and normalizes it for apply_operations
+def _prepare_operations(operations: List[Operation]) -> List[Tuple[str, object]]:
+    prepared = []
+    for op, arg in operations:
+        if op == "remap":
+            prepared.append((op, {int(k): int(v) for k, v in arg.items()}))
+        elif op == "drop":
+            prepared.append((op, {int(arg)} if isinstance(arg, int) else {int(a) for a in arg}))
+        elif op == "clamp":
+            prepared.append((op, None))
+        else:
+            raise ValueError(f"Unknown label operation '{op}', expected one of {', '.join(OPERATION_TYPES)}")
+    return prepared
+
+
+# This function clips one YOLO box to the [0, 1] frame, returns None if nothing is left
+def _clamp_box(cx: float, cy: float, w: float, h: float) -> Optional[Tuple[float, float, float, float]]:
+    x1, x2 = cx - w / 2, cx + w / 2
+    y1, y2 = cy - h / 2, cy + h / 2
+    if min(x1, y1) >= -CLAMP_TOLERANCE and max(x2, y2) <= 1 + CLAMP_TOLERANCE and w > 0 and h > 0:
+        return cx, cy, w, h
+
+    x1, x2 = max(0.0, x1), min(1.0, x2)
+    y1, y2 = max(0.0, y1), min(1.0, y2)
+    if x2 <= x1 or y2 <= y1:
+        return None
+    return (x1 + x2) / 2, (y1 + y2) / 2, x2 - x1, y2 - y1
+
+
+# This function applies the operations to the lines of one label file.
+# Lines no operation edits are kept exactly as they were (spacing included); malformed lines are kept and reported.
+def apply_operations(lines: List[str], operations: List[Tuple[str, object]]) -> Tuple[List[str], Counter, List[str]]:
+    counts = Counter()
+    invalid_lines = []
+    new_lines = []
+
+    for line in lines:
+        parts = line.split()
+        try:
+            class_id = int(parts[0])
+        except (ValueError, IndexError):
+            invalid_lines.append(line)
+            new_lines.append(line)
+            continue
+
+        kept, edited = True, False
+        for op, arg in operations:
+            if op == "remap":
+                if class_id in arg:
+                    class_id = arg[class_id]
+                    edited |= parts[0] != str(class_id)
+                    parts[0] = str(class_id)
+                    counts["remapped"] += 1
+            elif op == "drop":
+                if class_id in arg:
+                    counts["dropped"] += 1
+                    kept = False
+                    break
+            elif op == "clamp":
+                try:
+                    box = tuple(map(float, parts[1:5]))
+                except ValueError:
+                    continue
+                if len(box) != 4:
+                    continue
+                clamped = _clamp_box(*box)
+                if clamped is None:
+                    counts["clamped_away"] += 1
+                    kept = False
+                    break
+                if clamped != box:
+                    parts[1:5] = [f"{v:.6f}" for v in clamped]
+                    counts["clamped"] += 1
+                    edited = True
+
+        if kept:
+            new_lines.append(" ".join(parts) if edited else line)
+
+    return new_lines, counts, invalid_lines
+
+
+# This function writes a file through a temporary file in the same directory and an atomic rename,
+# so a crash never leaves a truncated label file behind. The file keeps its permissions.
+def atomic_write_lines(filepath: str, lines: List[str]):
+    directory = os.path.dirname(os.path.abspath(filepath))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            for line in lines:
+                f.write(line + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates the file as 0600
+        if os.path.exists(filepath):
+            shutil.copymode(filepath, tmp_path)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+# This function rewrites one label file, only touching it when its content changes
+def _rewrite_file(filepath: str, operations: List[Tuple[str, object]], dry_run: bool) -> Dict:
+    result = {"file": filepath, "counts": Counter(), "invalid": [], "changed": False, "before": [], "after": [], "error": None}
+
+    try:
+        with open(filepath, "r") as f:
+            lines = [line.strip() for line in f.readlines() if line.strip()]
+    except Exception as e:
+        result["error"] = f"Error reading {os.path.basename(filepath)}: {e}"
+        return result
+
+    new_lines, counts, invalid = apply_operations(lines, operations)
+    result["counts"], result["invalid"] = counts, invalid
+
+    if new_lines == lines:
+        return result
+
+    result["changed"] = True
+    result["before"], result["after"] = lines, new_lines
+    if not dry_run:
+        try:
+            atomic_write_lines(filepath, new_lines)
+        except Exception as e:
+            result["error"] = f"Error writing to {os.path.basename(filepath)}: {e}"
+            result["changed"] = False
+    return result
+
+
+# This function applies an ordered list of operations to every label file of a directory
+# in a single threaded pass. With dry_run=True nothing is written and a diff summary is printed.
+def rewrite_labels(
+    label_dir: str,
+    operations: List[Operation],
+    dry_run: bool = False,
+    workers: int = 8,
+    max_diffs: int = 10,
+) -> Dict:
+
+    prepared = _prepare_operations(operations)
+    files = sorted(os.path.join(label_dir, f) for f in os.listdir(label_dir) if f.endswith(".txt"))
+
+    print(f"\nScanning label directory: {label_dir}")
+    print("Operations: " + ", ".join(f"{op}({arg})" if arg is not None else op for op, arg in prepared))
+    if dry_run:
+        print("Dry run: no files will be written.")
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        results = list(pool.map(lambda path: _rewrite_file(path, prepared, dry_run), files))
+
+    totals = Counter()
+    changed = []
+    for result in results:
+        if result["error"]:
+            print(result["error"])
+        for line in result["invalid"]:
+            print(f"Invalid format in {os.path.basename(result['file'])}: '{line}'")
+        totals.update(result["counts"])
+        if result["changed"]:
+            changed.append(result)
+
+    if dry_run and changed:
+        print(f"\nFirst {min(max_diffs, len(changed))} of {len(changed)} files that would change:")
+        for result in changed[:max_diffs]:
+            print(f"\n--- {result['file']}")
+            for line in result["before"]:
+                if line not in result["after"]:
+                    print(f"-  {line}")
+            for line in result["after"]:
+                if line not in result["before"]:
+                    print(f"+  {line}")
+
+    summary = {
+        "files_checked": len(files),
+        "files_modified": len(changed),
+        "lines_remapped": totals["remapped"],
+        "lines_dropped": totals["dropped"],
+        "boxes_clamped": totals["clamped"],
+        "boxes_clamped_away": totals["clamped_away"],
+    }
+
+    print("\n**** SUMMARY ****" + (" (dry run)" if dry_run else ""))
+    print(f"Label files checked: {summary['files_checked']}")
+    print(f"Files {'to be modified' if dry_run else 'modified'}: {summary['files_modified']}")
+    print(f"Lines remapped: {summary['lines_remapped']}")
+    print(f"Lines dropped: {summary['lines_dropped']}")
+    print(f"Boxes clamped: {summary['boxes_clamped']}")
+    print(f"Boxes clamped away: {summary['boxes_clamped_away']}")
+    return summary
+
+
+if __name__ == "__main__":
+    rewrite_labels(
+        label_dir="C:/Middlesex/HomeBuddy/dataset/shoes/test/labels",
+        operations=[
+            ("drop", 1),
+            ("remap", {0: 5}),
+            ("clamp", None),
+        ],
+        dry_run=True,
+    )
@@ -0,0 +1,212 @@
+import os
+import shutil
+import cv2
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+from .image_pairing import IMAGE_EXT, pair_dataset
+from .instrumentation import RunReport, StageTimer
+from .process_pool import map_chunks
+
+RESIZE_MODES = ("resize", "letterbox")
+
+# Same grey Ultralytics pads letterboxed images with
+PAD_VALUE = 114
+
+
+# This function computes how an image of size w x h is placed on the output canvas.
+# "resize" scales the long side down to target and keeps the aspect ratio (no padding); smaller images are
+# left as they are, Ultralytics scales them up when it loads them.
+# "letterbox" scales the long side to target, up or down as Ultralytics' load_image does, and then pads to a
+# target x target square, centred; Ultralytics does not rescale the padded image, so objects keep the size
+# they would have in normal training. Returns (new_w, new_h, canvas_w, canvas_h, pad_x, pad_y).
+def fit_geometry(w: int, h: int, target: int, mode: str) -> Tuple[int, int, int, int, int, int]:
+    scale = target / max(w, h)
+    if mode == "resize":
+        scale = min(1.0, scale)
+    new_w, new_h = max(1, round(w * scale)), max(1, round(h * scale))
+    if mode == "resize":
+        return new_w, new_h, new_w, new_h, 0, 0
+    pad_x, pad_y = (target - new_w) // 2, (target - new_h) // 2
+    return new_w, new_h, target, target, pad_x, pad_y
+
+
+# This function maps YOLO label lines of the original image onto the output canvas.
+# The per-axis scale uses the rounded output size, so boxes match the written pixels exactly.
+# Malformed lines are kept unchanged and returned separately, like label_rewrite does.
+def transform_label_lines(lines: List[str], geometry: Tuple[int, int, int, int, int, int]) -> Tuple[List[str], List[str]]:
+    new_w, new_h, canvas_w, canvas_h, pad_x, pad_y = geometry
+    sx, sy = new_w / canvas_w, new_h / canvas_h
+    ox, oy = pad_x / canvas_w, pad_y / canvas_h
+
+    out, malformed = [], []
+    for line in lines:
+        parts = line.split()
+        try:
+            int(parts[0])
+            cx, cy, bw, bh = map(float, parts[1:5])
+        except (ValueError, IndexError):
+            malformed.append(line)
+            out.append(line)
+            continue
+        out.append(" ".join([parts[0], f"{cx * sx + ox:.6f}", f"{cy * sy + oy:.6f}", f"{bw * sx:.6f}", f"{bh * sy:.6f}"] + parts[5:]))
+    return out, malformed
+
+
+# This function resizes one chunk of (image path, label path or None) pairs into the output directories.
+# It runs in a worker process; images that already fit are copied byte for byte instead of re-encoded.
+def resize_chunk(
+    items: List[Tuple[str, Optional[str]]],
+    out_image_dir: str,
+    out_label_dir: str,
+    target: int,
+    mode: str,
+    jpeg_quality: int = 95,
+) -> Tuple[Dict[str, int], List[str], StageTimer]:
+
+    counts = {"resized": 0, "copied": 0, "unreadable": 0, "labels": 0, "malformed_lines": 0}
+    messages = []
+    timer = StageTimer()
+
+    for image_path, label_path in items:
+        name = os.path.basename(image_path)
+        with timer.stage("read"):
+            try:
+                data = np.fromfile(image_path, dtype=np.uint8)
+            except OSError:
+                data = np.zeros(0, dtype=np.uint8)
+        timer.count(1, data.size)
+        with timer.stage("decode"):
+            img = cv2.imdecode(data, cv2.IMREAD_COLOR) if data.size else None
+        if img is None:
+            counts["unreadable"] += 1
+            messages.append(f"Unreadable image skipped: {image_path}")
+            continue
+
+        h, w = img.shape[:2]
+        geometry = fit_geometry(w, h, target, mode)
+        new_w, new_h, canvas_w, canvas_h, pad_x, pad_y = geometry
+
+        with timer.stage("write"):
+            if (new_w, new_h, canvas_w, canvas_h) == (w, h, w, h):
+                shutil.copyfile(image_path, os.path.join(out_image_dir, name))
+                counts["copied"] += 1
+            else:
+                interpolation = cv2.INTER_AREA if new_w < w else cv2.INTER_LINEAR
+                resized = cv2.resize(img, (new_w, new_h), interpolation=interpolation) if (new_w, new_h) != (w, h) else img
+                if (canvas_w, canvas_h) != (new_w, new_h):
+                    canvas = np.full((canvas_h, canvas_w, 3), PAD_VALUE, dtype=np.uint8)
+                    canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = resized
+                    resized = canvas
+                ext = os.path.splitext(name)[1].lower()
+                params = [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality] if ext in (".jpg", ".jpeg") else []
+                ok, encoded = cv2.imencode(ext, resized, params)
+                if not ok:
+                    messages.append(f"Could not encode {image_path}")
+                    continue
+                encoded.tofile(os.path.join(out_image_dir, name))
+                counts["resized"] += 1
+
+        if label_path is None:
+            continue
+        with open(label_path, "r") as f:
+            lines = [line.strip() for line in f if line.strip()]
+        new_lines, malformed = transform_label_lines(lines, geometry)
+        for line in malformed:
+            messages.append(f"Invalid format kept unchanged in {os.path.basename(label_path)}: '{line}'")
+        counts["malformed_lines"] += len(malformed)
+        with open(os.path.join(out_label_dir, os.path.basename(label_path)), "w") as f:
+            f.write("".join(line + "\n" for line in new_lines))
+        counts["labels"] += 1
+
+    return counts, messages, timer
+
+
+# This function writes a resized copy of a YOLO dataset (split/images, split/labels and data.yaml) to out_dir.
+# Training then reads images at the training size instead of decoding full-size photos every epoch.
+# workers=None or 0 uses every CPU core.
+def preresize_dataset(
+    dataset_dir: str,
+    out_dir: str,
+    target: int = 640,
+    mode: str = "resize",
+    splits: Tuple[str, ...] = ("train", "valid", "test"),
+    workers: Optional[int] = None,
+    chunk_size: int = 32,
+    jpeg_quality: int = 95,
+    timing_report: Optional[str] = None,
+) -> Dict[str, Dict[str, int]]:
+
+    if mode not in RESIZE_MODES:
+        raise ValueError(f"Unknown resize mode '{mode}', expected one of {', '.join(RESIZE_MODES)}")
+    if os.path.abspath(dataset_dir) == os.path.abspath(out_dir):
+        raise ValueError("out_dir must differ from dataset_dir, the original images are never overwritten")
+
+    timer = RunReport("preresize_dataset", report_path=timing_report)
+    summary = {}
+
+    for split in splits:
+        split_dir = os.path.join(dataset_dir, split)
+        if not os.path.isdir(os.path.join(split_dir, "images")):
+            print(f"Warning: {split_dir} has no images folder, skipping.")
+            continue
+
+        with timer.stage("listing"):
+            pairing = pair_dataset(os.path.join(split_dir, "images"), os.path.join(split_dir, "labels"), image_ext=IMAGE_EXT)
+            # Every image of a name (a.jpg and a.png) is resized, each with the name's label
+            items = [(path, pairing.labels.get(stem)) for stem, paths in sorted(pairing.images.items()) for path in paths]
+        if pairing.conflicts:
+            print(f"{len(pairing.conflicts)} names in {split_dir} have more than one image; each is resized with the same label")
+        timer.total = (timer.total or 0) + len(items)
+
+        out_image_dir = os.path.join(out_dir, split, "images")
+        out_label_dir = os.path.join(out_dir, split, "labels")
+        os.makedirs(out_image_dir, exist_ok=True)
+        os.makedirs(out_label_dir, exist_ok=True)
+
+        print(f"\nResizing {len(items)} images of {split_dir} ({mode} to {target}px)...")
+        results = map_chunks(
+            resize_chunk,
+            items,
+            workers=workers,
+            chunk_size=chunk_size,
+            on_result=lambda result: timer.add(result[2]),
+            out_image_dir=out_image_dir,
+            out_label_dir=out_label_dir,
+            target=target,
+            mode=mode,
+            jpeg_quality=jpeg_quality,
+        )
+
+        counts = {"resized": 0, "copied": 0, "unreadable": 0, "labels": 0, "malformed_lines": 0}
+        for chunk_counts, messages, _ in results:
+            for key, value in chunk_counts.items():
+                counts[key] += value
+            for message in messages:
+                print(message)
+        summary[split] = counts
+
+    # The layout is the same, so the relative paths of the original data.yaml stay valid
+    data_yaml = os.path.join(dataset_dir, "data.yaml")
+    if os.path.exists(data_yaml):
+        shutil.copyfile(data_yaml, os.path.join(out_dir, "data.yaml"))
+    else:
+        print(f"Warning: {data_yaml} not found, write data.yaml for {out_dir} by hand.")
+
+    timer.finish()
+    print("\n**** SUMMARY ****")
+    for split, counts in summary.items():
+        print(f"{split}: {counts['resized']} resized, {counts['copied']} copied unchanged, "
+              f"{counts['unreadable']} unreadable, {counts['labels']} labels written")
+    print(f"Resized dataset: {out_dir}")
+    return summary
+
+
+if __name__ == "__main__":
+    preresize_dataset(
+        dataset_dir="C:/Middlesex/HomeBuddy/merged-dataset",
+        out_dir="C:/Middlesex/HomeBuddy/merged-dataset-640",
+        target=640,
+        mode="resize",
+        workers=4,
+    )
@@ -0,0 +1,12 @@
+from .label_rewrite import rewrite_labels
+
+# This function remaps class IDs in YOLO label files according to the new dataset
+# Files are rewritten atomically and only when a line actually changes
+def remap_class_ids(label_dir, class_mapping, dry_run=False):
+
+    summary = rewrite_labels(label_dir, [("remap", class_mapping)], dry_run=dry_run)
+
+    print(f"\nClass ID remapping {'dry run ' if dry_run else ''}completed.")
+    print(f"No of label files checked: {summary['files_checked']}")
+    print(f"No of files modified: {summary['files_modified']}")
+    print(f"Total lines changed: {summary['lines_remapped']}")
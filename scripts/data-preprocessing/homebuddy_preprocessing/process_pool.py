@@ -0,0 +1,52 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+
+# This function splits a list into consecutive chunks of at most chunk_size items
+def split_into_chunks(items: Sequence, chunk_size: int) -> List[Sequence]:
+    chunk_size = max(1, int(chunk_size))
+    return [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+
+
+# This function runs func(chunk, **kwargs) for every chunk of items.
+# With more than one worker the chunks are spread across a process pool;
+# results are always returned in chunk order, so merging them is deterministic.
+# on_result, if given, is called with each chunk result as soon as it is available (e.g. to update progress).
+# func must be defined at module level so worker processes can import it.
+def map_chunks(
+    func: Callable,
+    items: Sequence,
+    workers: Optional[int] = 1,
+    chunk_size: int = 64,
+    on_result: Optional[Callable] = None,
+    **kwargs,
+) -> List:
+    chunks = split_into_chunks(list(items), chunk_size)
+    if workers is None or workers <= 0:
+        workers = os.cpu_count() or 1
+
+    results = []
+    if workers == 1 or len(chunks) <= 1:
+        for chunk in chunks:
+            results.append(func(chunk, **kwargs))
+            if on_result:
+                on_result(results[-1])
+        return results
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+        for result in pool.map(partial(func, **kwargs), chunks):
+            results.append(result)
+            if on_result:
+                on_result(result)
+    return results
+
+
+# This function merges per-chunk issue dicts into one dict, keeping chunk order
+def merge_issue_dicts(parts: Iterable[Dict[str, List]], keys: Iterable[str]) -> Dict[str, List]:
+    merged: Dict[str, List] = {key: [] for key in keys}
+    for part in parts:
+        for key, entries in part.items():
+            merged[key].extend(entries)
+    return merged
@@ -0,0 +1,45 @@
+from typing import Optional
+
+# How the deletion prompts of the checks are answered:
+#   "ask"  read the answer from the terminal (running a script by hand)
+#   "yes"  confirm every prompt without asking (--yes)
+#   "no"   decline every prompt, so the checks only report (--dry-run)
+ANSWER_MODES = ("ask", "yes", "no")
+
+_answer_mode = "ask"
+
+
+# This function sets how prompts are answered for the rest of the run
+def set_answer_mode(mode: str):
+    global _answer_mode
+    if mode not in ANSWER_MODES:
+        raise ValueError(f"Unknown answer mode '{mode}', expected one of {', '.join(ANSWER_MODES)}")
+    _answer_mode = mode
+
+
+def answer_mode() -> str:
+    return _answer_mode
+
+
+# This function asks a yes/no question and returns True when it was answered with `accept`.
+# The question is still printed when it is answered automatically, so batch logs show what was decided.
+def confirm(question: str, accept: str = "y") -> bool:
+    if _answer_mode == "yes":
+        print(f"{question}{accept} (--yes)")
+        return True
+    if _answer_mode == "no":
+        print(f"{question}n (--dry-run)")
+        return False
+    return input(question).strip().lower() == accept
+
+
+# This function asks an open question, e.g. which issue types to delete.
+# With --yes the given default is used as the answer, with --dry-run the answer is empty.
+def ask(question: str, default: Optional[str] = None) -> str:
+    if _answer_mode == "yes":
+        print(f"{question}{default or ''} (--yes)")
+        return (default or "").strip().lower()
+    if _answer_mode == "no":
+        print(f"{question} (--dry-run)")
+        return ""
+    return input(question).strip().lower()
@@ -0,0 +1,196 @@
+import json
+import mmap
+import os
+import shutil
+import cv2
+import numpy as np
+from typing import List, Optional, Tuple
+
+from .image_pairing import pair_dataset
+
+# Bump this when the on-disk layout below changes
+SHARD_FORMAT_VERSION = "1.0"
+
+# On-disk layout of a packed split:
+#   shard-00000.bin ...  image bytes and label bytes of consecutive samples, back to back
+#   index.npy            (N,) structured array, one row per sample (see INDEX_DTYPE)
+#   files.json           version, image file name of every sample and the number of shards
+# A sample without a label file has label_len -1, an empty label file label_len 0.
+INDEX_DTYPE = np.dtype([
+    ("shard", np.int32),
+    ("image_offset", np.int64),
+    ("image_len", np.int64),
+    ("label_offset", np.int64),
+    ("label_len", np.int64),
+])
+
+DEFAULT_SHARD_SIZE = 256 * 1024 * 1024
+
+
+def _shard_name(shard: int) -> str:
+    return f"shard-{shard:05d}.bin"
+
+
+# This function packs the images and labels of a split (split/images, split/labels) into a few large shard files.
+# Samples are stored in file name order; a new shard is started once the current one reaches shard_size bytes.
+# Every image is a sample: when a name has more than one image (a.jpg and a.png), each is stored with the
+# name's label, as Ultralytics trains on both.
+def pack_split(split_dir: str, out_dir: str, shard_size: int = DEFAULT_SHARD_SIZE) -> str:
+    pairing = pair_dataset(os.path.join(split_dir, "images"), os.path.join(split_dir, "labels"))
+    samples = [(stem, image_path, pairing.labels.get(stem))
+               for stem in sorted(pairing.images) for image_path in pairing.images[stem]]
+
+    tmp_dir = out_dir.rstrip("/\\") + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    index = np.zeros(len(samples), dtype=INDEX_DTYPE)
+    names = []
+    shard, offset = 0, 0
+    total_bytes = 0
+    out = open(os.path.join(tmp_dir, _shard_name(shard)), "wb")
+    try:
+        for i, (_, image_path, label_path) in enumerate(samples):
+            with open(image_path, "rb") as f:
+                image_bytes = f.read()
+            label_bytes = None
+            if label_path:
+                with open(label_path, "rb") as f:
+                    label_bytes = f.read()
+
+            size = len(image_bytes) + len(label_bytes or b"")
+            if offset and offset + size > shard_size:
+                out.close()
+                shard, offset = shard + 1, 0
+                out = open(os.path.join(tmp_dir, _shard_name(shard)), "wb")
+
+            out.write(image_bytes)
+            if label_bytes:
+                out.write(label_bytes)
+            index[i] = (
+                shard,
+                offset,
+                len(image_bytes),
+                offset + len(image_bytes),
+                -1 if label_bytes is None else len(label_bytes),
+            )
+            names.append(os.path.basename(image_path))
+            offset += size
+            total_bytes += size
+    finally:
+        out.close()
+
+    np.save(os.path.join(tmp_dir, "index.npy"), index)
+    with open(os.path.join(tmp_dir, "files.json"), "w") as f:
+        json.dump({"version": SHARD_FORMAT_VERSION, "names": names, "num_shards": shard + 1}, f)
+
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(tmp_dir, out_dir)
+
+    print(f"Packed {len(samples)} samples ({total_bytes / 1e6:.1f} MB) from {split_dir} into {shard + 1} shards in {out_dir}")
+    if pairing.orphan_labels:
+        print(f"Skipped {len(pairing.orphan_labels)} label files without an image.")
+    if pairing.conflicts:
+        print(f"{len(pairing.conflicts)} names have more than one image; each image was packed with the same label:")
+        for stem, paths in list(pairing.conflicts.items())[:20]:
+            print(f"  {stem}: {', '.join(os.path.basename(p) for p in paths)}")
+    return out_dir
+
+
+class ShardReader:
+    """
+    Random access to a packed split by sample index.
+    Shard files are memory-mapped, so opening is instant and only the bytes of the requested samples are read.
+    """
+
+    def __init__(self, shard_dir: str):
+        self.shard_dir = shard_dir
+        with open(os.path.join(shard_dir, "files.json"), "r") as f:
+            meta = json.load(f)
+        if meta.get("version") != SHARD_FORMAT_VERSION:
+            raise ValueError(f"Unsupported shard format version: {meta.get('version')}")
+
+        self.names: List[str] = meta["names"]
+        self.index = np.load(os.path.join(shard_dir, "index.npy"), mmap_mode="r")
+        self._positions = {name: i for i, name in enumerate(self.names)}
+        self._files = []
+        self._maps: List[Optional[mmap.mmap]] = []
+        for shard in range(meta["num_shards"]):
+            f = open(os.path.join(shard_dir, _shard_name(shard)), "rb")
+            self._files.append(f)
+            # mmap cannot map an empty file
+            self._maps.append(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else None)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for m in self._maps:
+            if m is not None:
+                m.close()
+        for f in self._files:
+            f.close()
+        self._maps, self._files = [], []
+
+    def position(self, name: str) -> int:
+        return self._positions[name]
+
+    def image_bytes(self, i: int) -> bytes:
+        row = self.index[i]
+        start = int(row["image_offset"])
+        return self._maps[int(row["shard"])][start:start + int(row["image_len"])]
+
+    # Returns the raw label file of a sample, or None if the sample has no label file
+    def label_bytes(self, i: int) -> Optional[bytes]:
+        row = self.index[i]
+        length = int(row["label_len"])
+        if length < 0:
+            return None
+        start = int(row["label_offset"])
+        return self._maps[int(row["shard"])][start:start + length] if length else b""
+
+    def label_text(self, i: int) -> Optional[str]:
+        data = self.label_bytes(i)
+        return None if data is None else data.decode("utf-8")
+
+    # Returns (image file name, image bytes, label text or None)
+    def __getitem__(self, i: int) -> Tuple[str, bytes, Optional[str]]:
+        return self.names[i], self.image_bytes(i), self.label_text(i)
+
+    # Decodes the image of a sample with OpenCV (BGR, like cv2.imread)
+    def image(self, i: int) -> np.ndarray:
+        return cv2.imdecode(np.frombuffer(self.image_bytes(i), dtype=np.uint8), cv2.IMREAD_COLOR)
+
+
+# This function writes a packed split back into the YOLO layout (split/images, split/labels)
+def unpack_shards(shard_dir: str, split_dir: str) -> int:
+    image_dir = os.path.join(split_dir, "images")
+    label_dir = os.path.join(split_dir, "labels")
+    os.makedirs(image_dir, exist_ok=True)
+    os.makedirs(label_dir, exist_ok=True)
+
+    with ShardReader(shard_dir) as reader:
+        for i in range(len(reader)):
+            name = reader.names[i]
+            with open(os.path.join(image_dir, name), "wb") as f:
+                f.write(reader.image_bytes(i))
+            label_bytes = reader.label_bytes(i)
+            if label_bytes is not None:
+                with open(os.path.join(label_dir, os.path.splitext(name)[0] + ".txt"), "wb") as f:
+                    f.write(label_bytes)
+        count = len(reader)
+
+    print(f"Unpacked {count} samples from {shard_dir} into {split_dir}")
+    return count
+
+
+if __name__ == "__main__":
+    DATASET_DIR = "C:/Middlesex/HomeBuddy/merged-dataset"
+    for split in ("train", "valid", "test"):
+        pack_split(os.path.join(DATASET_DIR, split), os.path.join(DATASET_DIR, "shards", split))
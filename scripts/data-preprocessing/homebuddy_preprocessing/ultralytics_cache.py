@@ -0,0 +1,170 @@
+import hashlib
+import os
+import numpy as np
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+
+# Ultralytics DATASET_CACHE_VERSION the labels.cache files of this project were written with
+ULTRALYTICS_CACHE_VERSION = "1.0.3"
+
+# Image formats Ultralytics lists in a split (IMG_FORMATS)
+ULTRALYTICS_IMAGE_EXT = (".bmp", ".dng", ".jpeg", ".jpg", ".mpo", ".png", ".tif", ".tiff", ".webp", ".pfm", ".heic")
+
+# A labels.cache file is a np.save'd dict:
+#   labels   one dict per image: im_file, shape (h, w), cls (n, 1), bboxes (n, 4) normalized xywh, ...
+#   hash     sha256 of the total size of all label and image files followed by their joined paths
+#   results  (found, missing, empty, corrupt, total) label counts
+#   msgs     warnings from the scan
+#   version  Ultralytics cache format version
+# Images Ultralytics found corrupt are left out of labels.
+
+
+class CachedSplit(NamedTuple):
+    cache_path: str
+    data: Dict                      # the cache dict as loaded
+    entries: Dict[str, Dict]        # image file name -> label entry
+
+
+# This function returns where Ultralytics keeps the cache of a split, e.g. train/labels.cache
+def default_cache_path(label_dir: str) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(label_dir)), "labels.cache")
+
+
+# This function is Ultralytics' get_hash: total file size plus the joined path strings
+def get_hash(paths: List[str], total_size: Optional[int] = None) -> str:
+    if total_size is None:
+        total_size = 0
+        for p in paths:
+            try:
+                total_size += os.stat(p).st_size
+            except OSError:
+                continue
+    h = hashlib.sha256(str(total_size).encode())
+    h.update("".join(paths).encode())
+    return h.hexdigest()
+
+
+# This function is Ultralytics' img2label_paths for a path written with the given separator
+def img2label_path(im_file: str, sep: str = os.sep) -> str:
+    sa, sb = f"{sep}images{sep}", f"{sep}labels{sep}"
+    return sb.join(im_file.rsplit(sa, 1)).rsplit(".", 1)[0] + ".txt"
+
+
+def _basename(path: str) -> str:
+    return path.replace("\\", "/").rsplit("/", 1)[-1]
+
+
+def _read_cache(cache_path: str) -> Optional[Dict]:
+    try:
+        data = np.load(cache_path, allow_pickle=True).item()
+    except Exception as e:
+        print(f"Ignoring unreadable {cache_path}: {e}")
+        return None
+    if data.get("version") != ULTRALYTICS_CACHE_VERSION:
+        print(f"Ignoring {cache_path}: cache version {data.get('version')}, expected {ULTRALYTICS_CACHE_VERSION}")
+        return None
+    return data
+
+
+# This function recomputes the cache hash from the files as they are now.
+# The cached paths are kept as written (they may come from another machine) and only the sizes are
+# taken from the current split, so a dataset that was moved or copied still validates.
+# Label files checked out by git with LF instead of the CRLF they were cached with also validate.
+def _hash_matches(data: Dict, image_dir: str, label_dir: str) -> bool:
+    im_files = [entry["im_file"] for entry in data["labels"]]
+    if not im_files:
+        return False
+    sep = "\\" if "\\images\\" in im_files[0] else "/"
+    label_files = [img2label_path(p, sep) for p in im_files]
+
+    image_size = label_size = 0
+    for path in im_files:
+        image_size += os.path.getsize(os.path.join(image_dir, _basename(path)))
+    local_labels = [os.path.join(label_dir, _basename(p)) for p in label_files]
+    local_labels = [p for p in local_labels if os.path.exists(p)]
+    label_size = sum(os.path.getsize(p) for p in local_labels)
+
+    paths = label_files + im_files
+    if get_hash(paths, image_size + label_size) == data["hash"]:
+        return True
+
+    # Same files with CRLF line endings (the size Ultralytics saw on Windows)
+    lf_only = 0
+    for p in local_labels:
+        with open(p, "rb") as f:
+            text = f.read()
+        lf_only += text.count(b"\n") - text.count(b"\r\n")
+    return lf_only > 0 and get_hash(paths, image_size + label_size + lf_only) == data["hash"]
+
+
+# This function loads the Ultralytics labels.cache of a split and checks it still describes the files on disk:
+# same image names, and a hash that matches the current file sizes. Returns None when the cache is missing
+# or stale, in which case the caller reads the files from disk.
+def load_ultralytics_cache(image_dir: str, label_dir: str, cache_path: Optional[str] = None) -> Optional[CachedSplit]:
+    cache_path = cache_path or default_cache_path(label_dir)
+    if not os.path.exists(cache_path):
+        return None
+
+    data = _read_cache(cache_path)
+    if data is None:
+        return None
+
+    entries = {_basename(entry["im_file"]): entry for entry in data["labels"]}
+    with os.scandir(image_dir) as it:
+        on_disk = {e.name for e in it if e.name.lower().endswith(ULTRALYTICS_IMAGE_EXT) and e.is_file()}
+
+    if set(entries) != on_disk:
+        print(f"{cache_path} is stale ({len(entries)} cached images, {len(on_disk)} on disk), reading files instead.")
+        return None
+    if not _hash_matches(data, image_dir, label_dir):
+        print(f"{cache_path} is stale (file sizes changed), reading files instead.")
+        return None
+
+    print(f"Using Ultralytics cache {cache_path} ({len(entries)} images)")
+    return CachedSplit(cache_path, data, entries)
+
+
+# This function returns image file name -> (width, height) from the cache
+def cached_image_sizes(cached: CachedSplit) -> Dict[str, Tuple[int, int]]:
+    return {name: (int(entry["shape"][1]), int(entry["shape"][0])) for name, entry in cached.entries.items()}
+
+
+# This function writes the cache of a split after files were deleted, so the next training run does not
+# re-scan the dataset. Entries of removed images are dropped, image paths are rewritten the way Ultralytics
+# resolves them on this machine, and the hash is recomputed from the files now on disk.
+def write_ultralytics_cache(cached: CachedSplit, image_dir: str, removed_images: Iterable[str] = ()) -> bool:
+    removed = {_basename(p) for p in removed_images}
+    image_root = os.path.realpath(image_dir)
+
+    labels = []
+    for name in sorted(cached.entries):
+        if name in removed or not os.path.exists(os.path.join(image_root, name)):
+            continue
+        entry = dict(cached.entries[name])
+        entry["im_file"] = os.path.join(image_root, name)
+        labels.append(entry)
+
+    im_files = [entry["im_file"] for entry in labels]
+    label_files = [img2label_path(p) for p in im_files]
+    missing = sum(not os.path.exists(p) for p in label_files)
+    empty = sum(len(entry["cls"]) == 0 for entry in labels) - missing
+
+    data = dict(cached.data)
+    data.update(
+        labels=labels,
+        hash=get_hash(label_files + im_files),
+        results=(len(labels) - missing - empty, missing, empty, 0, len(labels)),
+        msgs=[],
+        version=ULTRALYTICS_CACHE_VERSION,
+    )
+
+    tmp_path = cached.cache_path + ".npy"
+    try:
+        np.save(tmp_path, data)
+        os.replace(tmp_path, cached.cache_path)
+    except Exception as e:
+        print(f"Could not write {cached.cache_path}: {e}")
+        return False
+
+    print(f"Updated Ultralytics cache {cached.cache_path} ({len(labels)} images)")
+    return True
@@ -0,0 +1,82 @@
+import os
+import re
+import numpy as np
+from typing import List, NamedTuple, Optional
+
+# Column layout of the label table
+FILE_IDX, CLASS_ID, CX, CY, W, H = range(6)
+
+# A label line is an integer class ID followed by four numbers, like int() and float() accept them
+_NUMBER = rb"[+-]?(?:\d+\.?\d*(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?|(?i:inf|infinity|nan))"
+_WELL_FORMED_LINE = re.compile(rb"^[^\S\n]*[+-]?\d+(?:[^\S\n]+" + _NUMBER + rb"){4}[^\S\n]*$", re.MULTILINE)
+_NON_EMPTY_LINE = re.compile(rb"^[^\S\n]*\S", re.MULTILINE)
+
+
+class LabelTable(NamedTuple):
+    files: List[str]          # label file names, indexed by the file_idx column
+    table: np.ndarray         # (N, 6) float64 rows of file_idx, class, cx, cy, w, h
+    malformed: List[int]      # files with a line that is not "<int> <float> <float> <float> <float>"
+    empty: List[int]          # files without any non-empty line
+    unreadable: List[int]     # files that could not be opened
+
+
+# This function reads every label file of a directory into one NumPy table.
+# Each file is read once and all numbers of the split are converted in a single call.
+def load_label_table(label_dir: str, files: Optional[List[str]] = None) -> LabelTable:
+    if files is None:
+        files = sorted(f for f in os.listdir(label_dir) if f.lower().endswith(".txt"))
+
+    malformed, empty, unreadable = [], [], []
+    texts, kept, counts = [], [], []
+
+    for file_idx, file in enumerate(files):
+        label_path = os.path.join(label_dir, file)
+        try:
+            with open(label_path, "rb") as f:
+                text = f.read()
+        except Exception as e:
+            print(f"Error reading {label_path}: {e}")
+            unreadable.append(file_idx)
+            continue
+
+        num_lines = len(_NON_EMPTY_LINE.findall(text))
+        if num_lines == 0:
+            empty.append(file_idx)
+            continue
+
+        if len(_WELL_FORMED_LINE.findall(text)) != num_lines:
+            malformed.append(file_idx)
+            continue
+
+        texts.append(text)
+        kept.append(file_idx)
+        counts.append(num_lines)
+
+    # Every line was validated above, so the whole split parses in one call
+    values = np.fromstring(b"\n".join(texts).decode("ascii", "replace"), dtype=np.float64, sep=" ")
+    values = values.reshape(-1, 5)
+    file_idx_col = np.repeat(np.array(kept, dtype=np.int64), np.array(counts, dtype=np.int64))
+
+    table = np.column_stack([file_idx_col.astype(np.float64), values])
+    return LabelTable(files, table, malformed, empty, unreadable)
+
+
+# This function returns a boolean mask of the boxes that fail any annotation check:
+# class out of range, coordinates not normalized, or box extending outside the frame.
+def invalid_box_mask(table: np.ndarray, num_classes: int) -> np.ndarray:
+    cls = table[:, CLASS_ID]
+    cx, cy, w, h = table[:, CX], table[:, CY], table[:, W], table[:, H]
+
+    class_ok = (cls >= 0) & (cls < num_classes)
+    normalized = (w > 0) & (w <= 1) & (h > 0) & (h <= 1) & (cx >= 0) & (cx <= 1) & (cy >= 0) & (cy <= 1)
+    inside = (cx - w / 2 >= 0) & (cx + w / 2 <= 1) & (cy - h / 2 >= 0) & (cy + h / 2 <= 1)
+
+    return ~(class_ok & normalized & inside)
+
+
+# This function returns the indices of files with at least one invalid or malformed annotation
+def invalid_files(labels: LabelTable, num_classes: int) -> List[int]:
+    bad_rows = invalid_box_mask(labels.table, num_classes)
+    bad_files = set(labels.table[bad_rows, FILE_IDX].astype(np.int64).tolist())
+    bad_files.update(labels.malformed)
+    return sorted(bad_files)
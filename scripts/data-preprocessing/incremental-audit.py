@@ -0,0 +1,14 @@
+# The code lives in homebuddy_preprocessing.incremental_audit; this script runs it on the example paths below.
+# Installed, the same command runs as: homebuddy-preprocess incremental-audit ...
+from homebuddy_preprocessing.incremental_audit import incremental_audit
+
+
+if __name__ == "__main__":
+    for split in ("train", "valid", "test"):
+        incremental_audit(
+            split_dir=f"C:/Middlesex/HomeBuddy/merged-dataset/{split}",
+            num_classes=6,
+            min_size=(416, 416),
+            max_aspect_ratio=10.0,
+            low_variance_thresh=4.0,
+        )
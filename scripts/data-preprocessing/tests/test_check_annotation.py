@@ -0,0 +1,37 @@
+import os
+
+from homebuddy_preprocessing.check_annotation import validate_and_clean_annotations
+from homebuddy_preprocessing.prompts import set_answer_mode
+from homebuddy_preprocessing.yolo_labels import invalid_files, load_label_table
+
+# Boxes touching the left, right, top and bottom edge of the frame
+EDGE_LABELS = "0 0.05 0.5 0.1 0.2\n1 0.95 0.5 0.1 0.2\n2 0.5 0.1 0.3 0.2\n3 0.5 0.9 0.3 0.2\n"
+
+
+def _make_split(tmp_path, labels):
+    image_dir, label_dir = tmp_path / "images", tmp_path / "labels"
+    image_dir.mkdir()
+    label_dir.mkdir()
+    for stem, text in labels.items():
+        (image_dir / f"{stem}.jpg").write_bytes(b"not decoded by the annotation check")
+        (label_dir / f"{stem}.txt").write_text(text)
+    return str(image_dir), str(label_dir)
+
+
+def test_edge_boxes_are_valid(tmp_path):
+    _, label_dir = _make_split(tmp_path, {"edge": EDGE_LABELS})
+    labels = load_label_table(label_dir)
+    assert invalid_files(labels, num_classes=6) == []
+
+
+def test_edge_boxes_are_not_deleted(tmp_path):
+    image_dir, label_dir = _make_split(tmp_path, {"edge": EDGE_LABELS, "outside": "0 0.98 0.5 0.1 0.2\n"})
+    set_answer_mode("yes")
+    try:
+        validate_and_clean_annotations(label_dir, image_dir, num_classes=6)
+    finally:
+        set_answer_mode("ask")
+
+    assert sorted(f for f in os.listdir(label_dir) if f.endswith(".txt")) == ["edge.txt"]
+    assert sorted(os.listdir(image_dir)) == ["edge.jpg"]
+
@@ -0,0 +1,34 @@
+from homebuddy_preprocessing.image_audit import ISSUE_TYPES, check_quality_chunk, classify_image
+
+
+def _record(width, height, variance=50.0, low=0.0, high=255.0):
+    return {"readable": True, "width": width, "height": height, "dtype": "uint8",
+            "min": low, "max": high, "variance": variance}
+
+
+def _classify(record):
+    issues = {issue_type: [] for issue_type in ISSUE_TYPES}
+    classify_image("img.jpg", record, issues)
+    return {issue_type for issue_type, found in issues.items() if found}
+
+
+def test_very_large_image_is_also_large():
+    assert _classify(_record(5000, 3000)) == {"large", "very_large"}
+    assert _classify(_record(1000, 800)) == {"large"}
+
+
+def test_record_without_pixel_statistics():
+    # A reduced decode without pixels keeps the header size but has no min, max or variance
+    assert _classify(_record(5000, 3000, variance=None, low=None, high=None)) == {"large", "very_large"}
+
+
+def test_quality_chunk_uses_the_same_rules():
+    items = [("small.jpg", _record(40, 300, variance=1.0)),
+             ("no-pixels.jpg", _record(640, 480, variance=None, low=None, high=None))]
+    issues, measured, _ = check_quality_chunk(items, (64, 64), 5.0, 3.0)
+
+    assert measured == {}
+    assert issues["too_small"] == ["small.jpg (40x300)"]
+    assert issues["extreme_aspect"] == ["small.jpg (AR=7.50, 40x300)"]
+    assert issues["low_variance"] == ["small.jpg (var=1.00)"]
+    assert sorted(issues) == ["extreme_aspect", "low_variance", "too_small", "unreadable", "zero_size"]
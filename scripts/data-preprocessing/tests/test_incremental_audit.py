@@ -0,0 +1,44 @@
+import os
+
+from PIL import Image
+
+from homebuddy_preprocessing.audit_cache import default_cache_path
+from homebuddy_preprocessing.dataset_manifest import default_manifest_path
+from homebuddy_preprocessing.incremental_audit import incremental_audit
+from homebuddy_preprocessing.prompts import set_answer_mode
+
+
+def _make_split(tmp_path):
+    for sub in ("images", "labels"):
+        (tmp_path / sub).mkdir()
+    for stem in ("good", "unlabelled"):
+        Image.effect_noise((128, 128), 64).convert("RGB").save(tmp_path / "images" / f"{stem}.jpg")
+    (tmp_path / "labels" / "good.txt").write_text("0 0.5 0.5 0.2 0.2\n")
+    return str(tmp_path)
+
+
+def _audit(split_dir, mode, dry_run=False):
+    set_answer_mode(mode)
+    try:
+        incremental_audit(split_dir, dry_run=dry_run)
+    finally:
+        set_answer_mode("ask")
+
+
+def test_dry_run_writes_nothing(tmp_path):
+    split_dir = _make_split(tmp_path)
+    _audit(split_dir, "no", dry_run=True)
+    assert not os.path.exists(default_manifest_path(split_dir))
+    assert not os.path.exists(default_cache_path(os.path.join(split_dir, "images")))
+    assert os.path.exists(os.path.join(split_dir, "images", "unlabelled.jpg"))
+
+
+def test_declined_issues_are_offered_again(tmp_path):
+    split_dir = _make_split(tmp_path)
+    _audit(split_dir, "no")
+    assert os.path.exists(default_manifest_path(split_dir))
+    assert os.path.exists(os.path.join(split_dir, "images", "unlabelled.jpg"))
+
+    # Nothing changed on disk: the missing label is carried over from the manifest and deleted now
+    _audit(split_dir, "yes")
+    assert sorted(os.listdir(os.path.join(split_dir, "images"))) == ["good.jpg"]
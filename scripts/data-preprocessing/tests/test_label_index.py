@@ -0,0 +1,34 @@
+from homebuddy_preprocessing import label_index
+from homebuddy_preprocessing.label_index import default_index_dir, open_label_index
+
+
+def test_sibling_label_dirs_get_their_own_index(tmp_path):
+    labels = tmp_path / "labels"
+    relabelled = tmp_path / "labels-relabelled"
+    for directory, cls in ((labels, 0), (relabelled, 3)):
+        directory.mkdir()
+        (directory / "a.txt").write_text(f"{cls} 0.5 0.5 0.2 0.2\n")
+
+    assert default_index_dir(str(labels)) != default_index_dir(str(relabelled))
+    assert open_label_index(str(labels)).label_table().table[:, 1].tolist() == [0]
+    assert open_label_index(str(relabelled)).label_table().table[:, 1].tolist() == [3]
+    # The index directory inside the labels directory is not taken for a label file
+    assert len(open_label_index(str(labels))) == 1
+
+
+def test_unwritable_index_falls_back_to_memory(tmp_path, monkeypatch):
+    labels = tmp_path / "labels"
+    labels.mkdir()
+    (labels / "a.txt").write_text("2 0.5 0.5 0.2 0.2\n1 0.3 0.3 0.1 0.1\n")
+    (labels / "b.txt").write_text("")
+
+    def read_only(*args):
+        raise PermissionError(13, "Permission denied", str(labels / ".labels.index.tmp"))
+
+    monkeypatch.setattr(label_index, "build_label_index", read_only)
+    index = open_label_index(str(labels))
+
+    assert index.index_dir is None
+    assert index.label_table().table[:, 1].tolist() == [2, 1]
+    assert index.files_with_status(label_index.STATUS_EMPTY) == [1]
+    assert not (labels / ".labels.index").exists()
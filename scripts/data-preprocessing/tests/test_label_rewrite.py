@@ -0,0 +1,21 @@
+import os
+import stat
+
+from homebuddy_preprocessing.label_rewrite import rewrite_labels
+
+
+def test_only_edited_files_change_and_keep_their_mode(tmp_path):
+    spaced = tmp_path / "spaced.txt"
+    spaced.write_text("0\t0.5  0.5 0.2 0.2\n1 0.3 0.3 0.1 0.1\n")
+    dropped = tmp_path / "dropped.txt"
+    dropped.write_text("0  0.5 0.5 0.2 0.2\n2 0.3 0.3 0.1 0.1\n")
+    for path in (spaced, dropped):
+        os.chmod(path, 0o644)
+
+    summary = rewrite_labels(str(tmp_path), [("drop", 2)])
+
+    assert summary["files_modified"] == 1
+    assert spaced.read_text() == "0\t0.5  0.5 0.2 0.2\n1 0.3 0.3 0.1 0.1\n"
+    # The kept line keeps its spacing
+    assert dropped.read_text() == "0  0.5 0.5 0.2 0.2\n"
+    assert stat.S_IMODE(os.stat(dropped).st_mode) == 0o644
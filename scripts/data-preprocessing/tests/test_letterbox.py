@@ -0,0 +1,30 @@
+import cv2
+import numpy as np
+
+from homebuddy_preprocessing.letterbox import fit_geometry, preresize_dataset
+
+
+def test_letterbox_scales_small_images_up_like_ultralytics():
+    # Ultralytics loads a 320x160 image at 640x320; the letterboxed copy must hold it at that size
+    assert fit_geometry(320, 160, 640, "letterbox") == (640, 320, 640, 640, 0, 160)
+    # resize mode never scales up, Ultralytics does that when it loads the image
+    assert fit_geometry(320, 160, 640, "resize") == (320, 160, 320, 160, 0, 0)
+
+
+def test_every_image_of_a_name_is_resized(tmp_path):
+    images = tmp_path / "data" / "train" / "images"
+    labels = tmp_path / "data" / "train" / "labels"
+    images.mkdir(parents=True)
+    labels.mkdir()
+    for name in ("a.jpg", "a.png"):
+        cv2.imwrite(str(images / name), np.full((100, 200, 3), 80, dtype=np.uint8))
+    (labels / "a.txt").write_text("0 0.5 0.5 0.5 0.5\n")
+
+    summary = preresize_dataset(str(tmp_path / "data"), str(tmp_path / "out"), target=400, mode="letterbox",
+                                splits=("train",), workers=1)
+
+    assert summary["train"]["resized"] == 2
+    out = tmp_path / "out" / "train"
+    assert sorted(p.name for p in (out / "images").iterdir()) == ["a.jpg", "a.png"]
+    assert cv2.imread(str(out / "images" / "a.png")).shape == (400, 400, 3)
+    assert (out / "labels" / "a.txt").read_text() == "0 0.500000 0.500000 0.500000 0.250000\n"
@@ -0,0 +1,23 @@
+from homebuddy_preprocessing.shard_pack import ShardReader, pack_split, unpack_shards
+
+
+def test_every_image_of_a_name_is_packed_with_its_label(tmp_path):
+    split = tmp_path / "split"
+    (split / "images").mkdir(parents=True)
+    (split / "labels").mkdir()
+    (split / "images" / "a.jpg").write_bytes(b"jpeg bytes")
+    (split / "images" / "a.png").write_bytes(b"png bytes")
+    (split / "images" / "b.jpg").write_bytes(b"other")
+    (split / "labels" / "a.txt").write_text("1 0.5 0.5 0.2 0.2\n")
+
+    shards = pack_split(str(split), str(tmp_path / "shards"), shard_size=12)
+    with ShardReader(shards) as reader:
+        samples = [reader[i] for i in range(len(reader))]
+    assert samples == [("a.jpg", b"jpeg bytes", "1 0.5 0.5 0.2 0.2\n"),
+                       ("a.png", b"png bytes", "1 0.5 0.5 0.2 0.2\n"),
+                       ("b.jpg", b"other", None)]
+
+    unpacked = tmp_path / "unpacked"
+    assert unpack_shards(shards, str(unpacked)) == 3
+    assert sorted(p.name for p in (unpacked / "images").iterdir()) == ["a.jpg", "a.png", "b.jpg"]
+    assert (unpacked / "labels" / "a.txt").read_text() == "1 0.5 0.5 0.2 0.2\n"
@@ -0,0 +1,296 @@
+import argparse
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import yaml
+
+# Image formats listed from a train folder, as in Ultralytics
+IMAGE_EXT = (".bmp", ".jpeg", ".jpg", ".png", ".tif", ".tiff", ".webp")
+
+# A ground-truth box counts as found when a prediction of its class overlaps it by at least this IoU
+MATCH_IOU = 0.5
+
+# Predictions below this confidence are ignored when scoring
+SCORE_CONF = 0.05
+
+
+# This function returns the label file Ultralytics uses for an image (.../images/x.jpg -> .../labels/x.txt)
+def label_path_for(image_path: str) -> str:
+    sa, sb = f"{os.sep}images{os.sep}", f"{os.sep}labels{os.sep}"
+    return os.path.splitext(sb.join(os.path.normpath(image_path).rsplit(sa, 1)))[0] + ".txt"
+
+
+# This function reads the class IDs and normalized xywh boxes of a YOLO label file
+def read_yolo_targets(label_path: str) -> Tuple[np.ndarray, np.ndarray]:
+    rows = []
+    if os.path.exists(label_path):
+        with open(label_path, "r") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 5:
+                    rows.append([float(v) for v in parts[:5]])
+    table = np.array(rows, dtype=np.float64).reshape(-1, 5)
+    return table[:, 0].astype(np.int64), table[:, 1:5]
+
+
+def _xywh_to_xyxy(boxes: np.ndarray) -> np.ndarray:
+    xy, wh = boxes[:, :2], boxes[:, 2:4] / 2
+    return np.concatenate([xy - wh, xy + wh], axis=1)
+
+
+def _iou(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    lt = np.maximum(a[:, None, :2], b[None, :, :2])
+    rb = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    inter = np.clip(rb - lt, 0, None).prod(axis=2)
+    area_a = (a[:, 2:] - a[:, :2]).prod(axis=1)
+    area_b = (b[:, 2:] - b[:, :2]).prod(axis=1)
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-9)
+
+
+# This function scores how hard one image is for the model, from 0 (every box found with confidence 1)
+# to 1 (nothing found). Each ground-truth box scores 1 minus the confidence of the best matching prediction
+# of its class; an image without objects scores the confidence of its strongest false positive.
+def image_hardness(gt_cls: np.ndarray, gt_xywh: np.ndarray, pred_cls: np.ndarray, pred_xyxy: np.ndarray,
+                   pred_conf: np.ndarray) -> float:
+    if len(gt_cls) == 0:
+        return float(pred_conf.max()) if len(pred_conf) else 0.0
+    if len(pred_cls) == 0:
+        return 1.0
+    iou = _iou(_xywh_to_xyxy(gt_xywh), pred_xyxy)
+    matched = (iou >= MATCH_IOU) & (gt_cls[:, None] == pred_cls[None, :])
+    best_conf = np.where(matched, pred_conf[None, :], 0.0).max(axis=1)
+    return float(np.mean(1.0 - best_conf))
+
+
+# This function runs the model over the images and returns one hardness score per image.
+# model is an Ultralytics YOLO object; targets holds (class IDs, normalized xywh boxes) per image.
+def score_images(model, image_paths: Sequence[str], targets: Sequence[Tuple[np.ndarray, np.ndarray]],
+                 imgsz: int = 640, batch: int = 16) -> np.ndarray:
+    scores = np.zeros(len(image_paths), dtype=np.float64)
+    results = model.predict(source=list(image_paths), imgsz=imgsz, conf=SCORE_CONF, batch=batch, device="cpu",
+                            stream=True, verbose=False)
+    for i, result in enumerate(results):
+        boxes = result.boxes
+        gt_cls, gt_xywh = targets[i]
+        scores[i] = image_hardness(gt_cls, gt_xywh, boxes.cls.numpy().astype(np.int64), boxes.xyxyn.numpy(),
+                                   boxes.conf.numpy())
+    return scores
+
+
+# This function picks a class-balanced subset of fraction of the images.
+# The budget is first shared equally between the classes: each class takes its hardest images until its share
+# is reached, so rare classes keep all their images when they have fewer than the share. The rest of the
+# budget goes to the hardest images left, except easy_fraction of it, which is sampled at random from the
+# remaining (easy) images so the subset does not lose them entirely. Returns sorted image indices.
+def select_coreset(
+    scores: np.ndarray,
+    image_classes: Sequence[Sequence[int]],
+    fraction: float = 0.5,
+    easy_fraction: float = 0.1,
+    num_classes: Optional[int] = None,
+    seed: int = 0,
+) -> np.ndarray:
+
+    n = len(scores)
+    budget = min(n, max(1, int(round(n * fraction))))
+    num_classes = num_classes or 1 + max((max(c) for c in image_classes if len(c)), default=0)
+    order = np.argsort(-scores, kind="stable")
+    selected = np.zeros(n, dtype=bool)
+
+    # Hardest images per class, in the order of the overall ranking
+    per_class: List[List[int]] = [[] for _ in range(num_classes)]
+    for i in order:
+        for c in set(image_classes[i]):
+            if 0 <= c < num_classes:
+                per_class[c].append(int(i))
+
+    hard_budget = budget - int(round(budget * easy_fraction))
+    share = hard_budget // max(1, num_classes)
+    covered = np.zeros(num_classes, dtype=np.int64)
+    count = 0
+    for c in np.argsort([len(images) for images in per_class], kind="stable"):  # rarest classes first
+        for i in per_class[c]:
+            if covered[c] >= share or count >= hard_budget:
+                break
+            if not selected[i]:
+                selected[i] = True
+                count += 1
+                covered[list({k for k in image_classes[i] if 0 <= k < num_classes})] += 1
+
+    for i in order:
+        if count >= hard_budget:
+            break
+        if not selected[i]:
+            selected[i] = True
+            count += 1
+
+    rest = np.flatnonzero(~selected)
+    rng = np.random.default_rng(seed)
+    extra = budget - count
+    if extra > 0 and len(rest):
+        selected[rng.choice(rest, size=min(extra, len(rest)), replace=False)] = True
+    return np.flatnonzero(selected)
+
+
+# This function lists the train images of a data.yaml (a folder, a list file, or a list of either)
+def train_images(data_yaml: str) -> List[str]:
+    from ultralytics.data.utils import check_det_dataset
+
+    data = check_det_dataset(data_yaml)
+    sources = data["train"] if isinstance(data["train"], list) else [data["train"]]
+    images = []
+    for source in sources:
+        source = str(source)
+        if os.path.isdir(source):
+            images.extend(os.path.join(source, f) for f in sorted(os.listdir(source)) if f.lower().endswith(IMAGE_EXT))
+        else:
+            base = os.path.dirname(source)
+            with open(source, "r") as f:
+                images.extend(os.path.join(base, line.strip()) if line.strip().startswith("./") else line.strip()
+                              for line in f if line.strip())
+    return images
+
+
+# This function writes the subset as a list of image paths and a data.yaml that trains on it.
+# Validation and test sets and the class names are those of the original data.yaml.
+def write_coreset(data_yaml: str, images: Sequence[str], out_dir: str) -> str:
+    from ultralytics.data.utils import check_det_dataset
+
+    os.makedirs(out_dir, exist_ok=True)
+    list_path = os.path.abspath(os.path.join(out_dir, "train.txt"))
+    with open(list_path, "w") as f:
+        f.write("".join(os.path.abspath(p) + "\n" for p in images))
+
+    data = check_det_dataset(data_yaml)
+    subset = {"train": list_path, "val": str(data["val"]), "nc": data["nc"], "names": data["names"]}
+    if data.get("test"):
+        subset["test"] = str(data["test"])
+    yaml_path = os.path.join(out_dir, "data.yaml")
+    with open(yaml_path, "w") as f:
+        yaml.safe_dump(subset, f, sort_keys=False)
+    return yaml_path
+
+
+def _print_selection(scores: np.ndarray, image_classes: Sequence[Sequence[int]], keep: np.ndarray, num_classes: int):
+    def counts(indices):
+        c = np.zeros(num_classes, dtype=np.int64)
+        for i in indices:
+            for k in set(image_classes[i]):
+                if 0 <= k < num_classes:
+                    c[k] += 1
+        return c
+
+    before, after = counts(range(len(scores))), counts(keep)
+    print(f"Kept {len(keep)} of {len(scores)} images, mean hardness {scores[keep].mean():.3f} "
+          f"(all images {scores.mean():.3f})")
+    print("Images per class: " + ", ".join(f"{c}: {after[c]}/{before[c]}" for c in range(num_classes)))
+
+
+# This function scores every train image with the given weights and writes a coreset data.yaml
+def build_coreset(weights: str, data_yaml: str, out_dir: str, fraction: float = 0.5, easy_fraction: float = 0.1,
+                  imgsz: int = 640, batch: int = 16, seed: int = 0) -> str:
+    from ultralytics import YOLO
+
+    os.makedirs(out_dir, exist_ok=True)
+    images = train_images(data_yaml)
+    targets = [read_yolo_targets(label_path_for(p)) for p in images]
+    model = YOLO(weights)
+    print(f"Scoring {len(images)} train images with {weights}...")
+    scores = score_images(model, images, targets, imgsz, batch)
+
+    image_classes = [t[0].tolist() for t in targets]
+    num_classes = len(model.names)
+    keep = select_coreset(scores, image_classes, fraction, easy_fraction, num_classes, seed)
+    _print_selection(scores, image_classes, keep, num_classes)
+    np.save(os.path.join(out_dir, "scores.npy"), scores)
+    return write_coreset(data_yaml, [images[i] for i in keep], out_dir)
+
+
+class CoresetRefresher:
+    """
+    Trains on a subset of the train images and reselects it every refresh_every epochs, via Ultralytics callbacks.
+    The dataloader is built on the full train set as usual; once it is built (before the trainer sizes the
+    epoch from it) and after every refresh_every epochs, the images are scored with the latest weights and
+    the dataset is cut down to the selected subset in place. The subset of each refresh is written to the run directory.
+    """
+
+    # Per-image lists of an Ultralytics YOLODataset that are subset together
+    DATASET_LISTS = ("im_files", "label_files", "labels", "npy_files", "ims", "im_hw0", "im_hw")
+
+    def __init__(self, initial_weights: str, fraction: float = 0.5, refresh_every: int = 5,
+                 easy_fraction: float = 0.1, batch: int = 16, seed: int = 0):
+        self.initial_weights = initial_weights
+        self.fraction = fraction
+        self.refresh_every = refresh_every
+        self.easy_fraction = easy_fraction
+        self.batch = batch
+        self.seed = seed
+        self._full: Dict[str, list] = {}
+
+    def attach(self, model):
+        model.add_callback("on_pretrain_routine_end", self.on_pretrain_routine_end)
+        model.add_callback("on_fit_epoch_end", self.on_fit_epoch_end)
+        return self
+
+    def _dataset(self, trainer):
+        return trainer.train_loader.dataset
+
+    def _refresh(self, trainer, weights: str, epoch: int):
+        from ultralytics import YOLO
+
+        dataset = self._dataset(trainer)
+        if not self._full:
+            self._full = {name: list(getattr(dataset, name)) for name in self.DATASET_LISTS if hasattr(dataset, name)}
+
+        images = self._full["im_files"]
+        targets = [(label["cls"].reshape(-1).astype(np.int64), label["bboxes"].reshape(-1, 4)) for label in self._full["labels"]]
+        scores = score_images(YOLO(weights), images, targets, trainer.args.imgsz, self.batch)
+        image_classes = [t[0].tolist() for t in targets]
+        keep = select_coreset(scores, image_classes, self.fraction, self.easy_fraction, len(trainer.data["names"]),
+                              self.seed + epoch)
+
+        for name, values in self._full.items():
+            setattr(dataset, name, [values[i] for i in keep])
+        dataset.ni = len(keep)
+        if hasattr(dataset, "buffer"):
+            dataset.buffer = []
+        # Dataloader workers hold a copy of the dataset; restart them on the subset
+        trainer.train_loader.reset()
+
+        print(f"\nCoreset after epoch {epoch}:")
+        _print_selection(scores, image_classes, keep, len(trainer.data["names"]))
+        with open(os.path.join(str(trainer.save_dir), f"coreset-epoch-{epoch}.txt"), "w") as f:
+            f.write("".join(images[i] + "\n" for i in keep))
+
+    # Runs after the dataloader is built but before the trainer takes batches per epoch (and the warmup
+    # iterations) from its length, so both follow the subset
+    def on_pretrain_routine_end(self, trainer):
+        self._refresh(trainer, self.initial_weights, 0)
+
+    # Runs after last.pt of the epoch was saved, so the subset is chosen with the newest weights
+    def on_fit_epoch_end(self, trainer):
+        epoch = trainer.epoch + 1
+        if self.refresh_every and epoch % self.refresh_every == 0 and epoch < trainer.epochs:
+            self._refresh(trainer, str(trainer.last), epoch)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Write a class-balanced subset of the hardest train images.")
+    parser.add_argument("weights", help="weights to score the images with, e.g. runs/detect/<run>/weights/best.pt")
+    parser.add_argument("data", help="data.yaml of the full dataset")
+    parser.add_argument("out_dir", help="folder for train.txt, data.yaml and scores.npy")
+    parser.add_argument("--fraction", type=float, default=0.5, help="share of the train images to keep")
+    parser.add_argument("--easy-fraction", type=float, default=0.1, help="share of the subset sampled from easy images")
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--batch", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    path = build_coreset(args.weights, args.data, args.out_dir, args.fraction, args.easy_fraction, args.imgsz,
+                         args.batch, args.seed)
+    print(f"\nCoreset data.yaml: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from importlib import metadata
+from itertools import product
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+import psutil
+
+# Each setting is probed in a fresh Python process: the thread count of the OpenMP/MKL runtimes
+# is fixed once torch is imported, and the peak memory of one probe must not include the others.
+
+
+class ProbeResult(NamedTuple):
+    threads: int
+    workers: int
+    batch: int
+    images_per_sec: float          # 0.0 when the probe failed
+    peak_rss: int                  # bytes, probe process plus its dataloader workers
+    error: Optional[str] = None
+
+
+# This function returns candidate intra-op thread counts for this CPU: all physical cores,
+# half of them, and all logical cores when hyper-threading is available.
+def default_thread_options() -> List[int]:
+    logical = psutil.cpu_count(logical=True) or 1
+    physical = psutil.cpu_count(logical=False) or logical
+    return sorted({max(1, physical // 2), physical, logical})
+
+
+# This function returns candidate dataloader worker counts for this CPU
+def default_worker_options() -> List[int]:
+    logical = psutil.cpu_count(logical=True) or 1
+    return sorted({0, min(2, logical - 1), min(4, logical // 2)})
+
+
+# This function describes the host, model and data a probe was run for.
+# Cached probe results are only reused when it matches.
+def probe_fingerprint(model: str, train_args: Dict, grid: Dict) -> Dict:
+    try:
+        torch_version = metadata.version("torch")
+    except metadata.PackageNotFoundError:
+        torch_version = None
+    return {
+        "host": platform.node(),
+        "processor": platform.processor(),
+        "logical_cores": psutil.cpu_count(logical=True),
+        "physical_cores": psutil.cpu_count(logical=False),
+        "memory_gb": round(psutil.virtual_memory().total / 1e9),
+        "torch": torch_version,
+        "model": os.path.basename(model),
+        "train_args": {k: train_args[k] for k in sorted(train_args)},
+        "grid": grid,
+    }
+
+
+def _process_tree_rss(process: psutil.Process) -> int:
+    total = 0
+    for p in [process] + process.children(recursive=True):
+        try:
+            total += p.memory_info().rss
+        except psutil.Error:
+            continue
+    return total
+
+
+# This function runs inside the probe process: it trains the model for a few batches from the real
+# Ultralytics dataloader (with the augmentation of the stage) and reports images/sec and peak memory.
+def _run_probe(spec: Dict) -> Dict:
+    import torch
+    from ultralytics import YOLO
+    from ultralytics.cfg import get_cfg
+    from ultralytics.data import build_dataloader, build_yolo_dataset
+    from ultralytics.data.utils import check_det_dataset
+
+    torch.set_num_threads(spec["threads"])
+
+    peak = [0]
+    stop = threading.Event()
+    me = psutil.Process()
+
+    def sample():
+        while not stop.is_set():
+            peak[0] = max(peak[0], _process_tree_rss(me))
+            time.sleep(0.1)
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    try:
+        # The probe never caches images in RAM, whatever the stage uses
+        overrides = dict(spec["train_args"], batch=spec["batch"], workers=spec["workers"], cache=False, mode="train")
+        cfg = get_cfg(overrides=overrides)
+        data = check_det_dataset(cfg.data)
+
+        net = YOLO(spec["model"]).model
+        net.args = cfg
+        net.train()
+        for p in net.parameters():
+            p.requires_grad_(True)
+        optimizer = torch.optim.AdamW(net.parameters(), lr=cfg.lr0)
+
+        dataset = build_yolo_dataset(cfg, data["train"], spec["batch"], data, mode="train", stride=32)
+        loader = build_dataloader(dataset, spec["batch"], spec["workers"], shuffle=True)
+
+        images, start = 0, None
+        batches = iter(loader)
+        for i in range(spec["warmup"] + spec["batches"]):
+            if i == spec["warmup"]:
+                images, start = 0, time.perf_counter()
+            batch = next(batches)
+            batch["img"] = batch["img"].float() / 255
+            loss, _ = net(batch)
+            loss.sum().backward()
+            optimizer.step()
+            optimizer.zero_grad()
+            images += batch["img"].shape[0]
+        elapsed = time.perf_counter() - start
+        return {"images_per_sec": images / elapsed, "peak_rss": max(peak[0], _process_tree_rss(me))}
+    finally:
+        stop.set()
+
+
+# This function probes one setting in a separate process and returns its result
+def probe_setting(
+    model: str,
+    train_args: Dict,
+    threads: int,
+    workers: int,
+    batch: int,
+    batches: int = 6,
+    warmup: int = 2,
+    timeout: float = 600,
+) -> ProbeResult:
+
+    spec = {"model": model, "train_args": train_args, "threads": threads, "workers": workers, "batch": batch,
+            "batches": batches, "warmup": warmup}
+    env = dict(os.environ, OMP_NUM_THREADS=str(threads), MKL_NUM_THREADS=str(threads), KMP_DUPLICATE_LIB_OK="TRUE")
+    try:
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), json.dumps(spec)], env=env,
+                              capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return ProbeResult(threads, workers, batch, 0.0, 0, f"timed out after {timeout:.0f}s")
+
+    lines = proc.stdout.strip().splitlines()
+    try:
+        result = json.loads(lines[-1])
+    except (IndexError, ValueError):
+        tail = (proc.stderr.strip().splitlines() or ["no output"])[-1]
+        return ProbeResult(threads, workers, batch, 0.0, 0, tail)
+    if "error" in result:
+        return ProbeResult(threads, workers, batch, 0.0, result.get("peak_rss", 0), result["error"])
+    return ProbeResult(threads, workers, batch, result["images_per_sec"], result["peak_rss"])
+
+
+def _fits(result: ProbeResult, memory_limit: int) -> bool:
+    return result.error is None and result.peak_rss <= memory_limit
+
+
+# This function searches for the fastest threads / workers / batch setting that fits in memory.
+# All thread and worker combinations are probed at the middle batch size first, then the remaining
+# batch sizes with the best of them, so the grid costs len(threads) * len(workers) + len(batches) - 1 probes.
+# A setting fits when its peak memory stays below memory_headroom of the memory available now.
+def find_fastest_setting(
+    model: str,
+    train_args: Dict,
+    thread_options: Optional[Sequence[int]] = None,
+    worker_options: Optional[Sequence[int]] = None,
+    batch_options: Sequence[int] = (8, 16, 32),
+    batches: int = 6,
+    warmup: int = 2,
+    memory_headroom: float = 0.8,
+) -> Optional[ProbeResult]:
+
+    thread_options = list(thread_options or default_thread_options())
+    worker_options = list(worker_options if worker_options is not None else default_worker_options())
+    batch_options = sorted(batch_options)
+    memory_limit = int(psutil.virtual_memory().available * memory_headroom)
+
+    print(f"\nProbing training throughput on {psutil.cpu_count(logical=False)} physical / "
+          f"{psutil.cpu_count(logical=True)} logical cores, memory limit {memory_limit / 1e9:.1f} GB")
+    results = []
+
+    def run(threads, workers, batch):
+        result = probe_setting(model, train_args, threads, workers, batch, batches, warmup)
+        status = result.error or f"{result.images_per_sec:.2f} img/s, peak {result.peak_rss / 1e9:.2f} GB"
+        print(f"  threads={threads:<3} workers={workers:<3} batch={batch:<4} {status}")
+        results.append(result)
+        return result
+
+    middle = batch_options[len(batch_options) // 2]
+    first = [run(t, w, middle) for t, w in product(thread_options, worker_options)]
+    fitting = [r for r in first if _fits(r, memory_limit)]
+    if not fitting:
+        # Nothing fits at the middle size: try the smaller batch sizes with the fastest thread/worker setting
+        fitting = [r for r in first if r.error is None] or first
+    best = max(fitting, key=lambda r: r.images_per_sec)
+    for batch in batch_options:
+        if batch != middle:
+            run(best.threads, best.workers, batch)
+
+    fitting = [r for r in results if _fits(r, memory_limit)]
+    if not fitting:
+        print("No probed setting fits in memory.")
+        return None
+    best = max(fitting, key=lambda r: r.images_per_sec)
+
+    print("\n**** PROBE SUMMARY ****")
+    print(f"Fastest setting: threads={best.threads}, workers={best.workers}, batch={best.batch} "
+          f"({best.images_per_sec:.2f} img/s, peak {best.peak_rss / 1e9:.2f} GB)")
+    return best
+
+
+# This function returns the cached probe result for this fingerprint, or None
+def load_cached_probe(cache_path: str, fingerprint: Dict) -> Optional[ProbeResult]:
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        with open(cache_path, "r") as f:
+            entries = json.load(f)
+    except (OSError, ValueError):
+        return None
+    for entry in entries:
+        if entry["fingerprint"] == fingerprint:
+            return ProbeResult(**entry["result"])
+    return None
+
+
+def save_cached_probe(cache_path: str, fingerprint: Dict, result: ProbeResult):
+    entries = []
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, "r") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            entries = []
+    entries = [e for e in entries if e["fingerprint"] != fingerprint]
+    entries.append({"fingerprint": fingerprint, "result": result._asdict(), "probed_at": time.strftime("%Y-%m-%d %H:%M:%S")})
+    with open(cache_path, "w") as f:
+        json.dump(entries, f, indent=2)
+
+
+if __name__ == "__main__":
+    # Probe process: the setting comes as JSON on the command line, the result goes to stdout as one JSON line
+    try:
+        print(json.dumps(_run_probe(json.loads(sys.argv[1]))))
+    except Exception as e:
+        print(json.dumps({"error": f"{type(e).__name__}: {e}", "peak_rss": _process_tree_rss(psutil.Process())}))
@@ -0,0 +1,462 @@
+import argparse
+import csv
+import math
+import multiprocessing
+import os
+import shutil
+import socket
+import time
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import psutil
+
+# Ultralytics only runs DistributedDataParallel on GPUs. This launcher runs it on CPU instead:
+# one process per group of physical cores, gradients averaged with the gloo backend after every backward pass.
+# Every process gets the same number of cores and OpenMP threads; the dataloader workers of a process
+# inherit its cores, so processes never compete for a core.
+# As in Ultralytics, cfg.optimizer picks the optimizer, gradients are accumulated up to nbs images with the
+# weight decay scaled to match, and mosaic is turned off for the last close_mosaic epochs.
+
+# Columns of results.csv, named as in Ultralytics so run_store.py reads them the same way
+RESULT_FIELDS = ("epoch", "train/box_loss", "train/cls_loss", "train/dfl_loss", "metrics/mAP50(B)",
+                 "metrics/mAP50-95(B)", "lr/pg0", "time", "train_images_per_sec")
+
+# Threads of the current single-process training, the baseline of the scaling report
+BASELINE_THREADS = 4
+
+
+class ScalingResult(NamedTuple):
+    processes: int
+    threads: int                   # per process
+    batch: int                     # global: all processes together
+    images_per_sec: float
+    speedup: float                 # against the single-process baseline
+    efficiency: float              # speedup per core, relative to the baseline's cores
+
+
+def _parse_cpu_list(text: str) -> List[int]:
+    cpus = []
+    for part in text.strip().split(","):
+        if "-" in part:
+            a, b = part.split("-")
+            cpus.extend(range(int(a), int(b) + 1))
+        elif part:
+            cpus.append(int(part))
+    return cpus
+
+
+def _allowed_cpus() -> List[int]:
+    try:
+        return sorted(psutil.Process().cpu_affinity())
+    except (AttributeError, psutil.Error):
+        return list(range(psutil.cpu_count(logical=True) or 1))
+
+
+# This function returns the logical CPUs this process may use, grouped by physical core.
+# Hyper-thread siblings are read from sysfs on Linux; elsewhere every logical CPU is its own core.
+def physical_cores() -> List[List[int]]:
+    groups: Dict[int, List[int]] = {}
+    for cpu in _allowed_cpus():
+        try:
+            with open(f"/sys/devices/system/cpu/cpu{cpu}/topology/thread_siblings_list", "r") as f:
+                key = min(_parse_cpu_list(f.read()))
+        except (OSError, ValueError):
+            key = cpu
+        groups.setdefault(key, []).append(cpu)
+    return [groups[key] for key in sorted(groups)]
+
+
+# This function splits the physical cores into one equal, contiguous group per process.
+# cores_per_process defaults to all cores divided between the processes. Returns the logical CPUs of
+# every group (siblings included) and the thread count per process (its physical cores).
+def partition_cores(processes: int, cores_per_process: Optional[int] = None) -> Tuple[List[List[int]], int]:
+    cores = physical_cores()
+    per = cores_per_process or len(cores) // processes
+    if per < 1 or per * processes > len(cores):
+        raise ValueError(f"{processes} processes x {per} cores do not fit in {len(cores)} physical cores")
+    groups = [[cpu for core in cores[i * per:(i + 1) * per] for cpu in core] for i in range(processes)]
+    return groups, per
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _param_groups(net, weight_decay: float) -> List[Dict]:
+    # As in Ultralytics: no weight decay on biases and normalization weights
+    decay, no_decay = [], []
+    for p in net.parameters():
+        p.requires_grad_(True)
+        (decay if p.ndim > 1 else no_decay).append(p)
+    return [{"params": decay, "weight_decay": weight_decay}, {"params": no_decay, "weight_decay": 0.0}]
+
+
+# This function builds the optimizer named by cfg.optimizer, as Ultralytics' trainer does.
+# "auto" picks SGD for long runs and AdamW with a learning rate fitted to the class count otherwise.
+def _build_optimizer(groups: List[Dict], cfg, num_classes: int, iterations: int):
+    import torch
+
+    name, lr, momentum = cfg.optimizer, cfg.lr0, cfg.momentum
+    if name == "auto":
+        if iterations > 10000:
+            name, lr, momentum = "SGD", 0.01, 0.9
+        else:
+            name, lr, momentum = "AdamW", round(0.002 * 5 / (4 + num_classes), 6), 0.9
+        print(f"optimizer=auto: using {name}(lr={lr}, momentum={momentum})")
+
+    if name in ("Adam", "Adamax", "AdamW", "NAdam", "RAdam"):
+        return getattr(torch.optim, name)(groups, lr=lr, betas=(momentum, 0.999)), lr
+    if name == "RMSProp":
+        return torch.optim.RMSprop(groups, lr=lr, momentum=momentum), lr
+    if name == "SGD":
+        return torch.optim.SGD(groups, lr=lr, momentum=momentum, nesterov=True), lr
+    raise ValueError(f"Optimizer '{name}' is not supported; use SGD, Adam, Adamax, AdamW, NAdam, RAdam, RMSProp or auto")
+
+
+def _save_checkpoint(path: str, ema, epoch: int, best_fitness: float, cfg):
+    import torch
+    from copy import deepcopy
+
+    # The layout of an Ultralytics checkpoint, so YOLO(path) loads it
+    torch.save({
+        "epoch": epoch,
+        "best_fitness": best_fitness,
+        "model": None,
+        "ema": deepcopy(ema.ema).half(),
+        "updates": ema.updates,
+        "optimizer": None,
+        "train_args": vars(cfg),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }, path)
+
+
+# This function runs in every training process. Rank 0 keeps the EMA weights, validates, and writes
+# checkpoints and results.csv; the other ranks wait at a barrier meanwhile.
+def _worker(rank: int, spec: Dict, queue):
+    world = len(spec["cores"])
+    try:
+        psutil.Process().cpu_affinity(spec["cores"][rank])
+    except (AttributeError, psutil.Error):
+        pass
+
+    from datetime import timedelta
+
+    import torch
+    import torch.distributed as dist
+    from torch.nn.parallel import DistributedDataParallel
+    from ultralytics import YOLO
+    from ultralytics.cfg import get_cfg
+    from ultralytics.data import build_dataloader, build_yolo_dataset
+    from ultralytics.data.utils import check_det_dataset
+    from ultralytics.utils.torch_utils import ModelEMA, init_seeds
+
+    torch.set_num_threads(spec["threads"])
+    dist.init_process_group("gloo", init_method=f"tcp://127.0.0.1:{spec['port']}", rank=rank, world_size=world,
+                            timeout=timedelta(hours=2))
+    try:
+        cfg = get_cfg(overrides=dict(spec["train_args"], mode="train", device="cpu"))
+        # Same weights on every rank (DDP broadcasts rank 0's anyway), different augmentation per rank
+        init_seeds(cfg.seed + rank, deterministic=cfg.deterministic)
+        data = check_det_dataset(cfg.data)
+
+        net = YOLO(spec["model"]).model
+        net.args = cfg
+        net.train()
+        model = DistributedDataParallel(net, gradient_as_bucket_view=True)
+        ema = ModelEMA(net) if rank == 0 else None
+
+        # The global batch is split between the processes, so the hyperparameters keep their meaning
+        batch = max(1, spec["batch"] // world)
+        # Rank 0 writes the label cache first, the others read it
+        if rank != 0:
+            dist.barrier()
+        dataset = build_yolo_dataset(cfg, data["train"], batch, data, mode="train", stride=max(int(net.stride.max()), 32))
+        if rank == 0:
+            dist.barrier()
+        loader = build_dataloader(dataset, batch, cfg.workers, shuffle=True, rank=rank)
+
+        # Gradients of the global batch are accumulated up to nbs images per optimizer step; the weight decay
+        # is scaled by the images per step, as in Ultralytics
+        accumulate = max(round(cfg.nbs / spec["batch"]), 1)
+        weight_decay = cfg.weight_decay * spec["batch"] * accumulate / cfg.nbs
+        iterations = math.ceil(len(dataset) / max(spec["batch"], cfg.nbs)) * cfg.epochs
+        optimizer, lr0 = _build_optimizer(_param_groups(net, weight_decay), cfg, len(data["names"]), iterations)
+
+        if spec["benchmark"]:
+            result = _benchmark(model, optimizer, loader, spec["warmup"], spec["batches"], world)
+        else:
+            result = _train(model, net, optimizer, ema, loader, cfg, spec, rank, world, lr0, accumulate)
+        if rank == 0:
+            queue.put(result)
+    finally:
+        dist.destroy_process_group()
+
+
+def _backward(model, batch, world: int):
+    batch["img"] = batch["img"].float() / 255
+    loss, items = model(batch)
+    # DDP averages gradients over the ranks; Ultralytics scales by the world size to sum them instead
+    (loss.sum() * world).backward()
+    return items, batch["img"].shape[0]
+
+
+def _optimizer_step(model, optimizer):
+    import torch
+
+    torch.nn.utils.clip_grad_norm_(model.parameters(), max_norm=10.0)
+    optimizer.step()
+    optimizer.zero_grad()
+
+
+def _step(model, optimizer, batch, world: int):
+    items, n = _backward(model, batch, world)
+    _optimizer_step(model, optimizer)
+    return items, n
+
+
+# This function times a few training steps and returns the images/sec of all ranks together
+def _benchmark(model, optimizer, loader, warmup: int, batches: int, world: int) -> Dict:
+    import torch
+    import torch.distributed as dist
+
+    loader.sampler.set_epoch(0)
+    batch_iter = iter(loader)
+    images, start = 0, time.perf_counter()
+    for i in range(warmup + batches):
+        if i == warmup:
+            dist.barrier()
+            images, start = 0, time.perf_counter()
+        images += _step(model, optimizer, next(batch_iter), world)[1]
+    elapsed = time.perf_counter() - start
+
+    totals = torch.tensor([float(images)])
+    slowest = torch.tensor([elapsed])
+    dist.all_reduce(totals, op=dist.ReduceOp.SUM)
+    dist.all_reduce(slowest, op=dist.ReduceOp.MAX)
+    return {"images_per_sec": float(totals.item() / slowest.item())}
+
+
+def _train(model, net, optimizer, ema, loader, cfg, spec: Dict, rank: int, world: int, lr0: float,
+           accumulate: int) -> Dict:
+    from contextlib import nullcontext
+
+    import numpy as np
+    import torch
+    import torch.distributed as dist
+    from ultralytics import YOLO
+
+    save_dir = spec["save_dir"]
+    weights_dir = os.path.join(save_dir, "weights")
+    last, best = os.path.join(weights_dir, "last.pt"), os.path.join(weights_dir, "best.pt")
+    if rank == 0:
+        os.makedirs(weights_dir, exist_ok=True)
+        with open(os.path.join(save_dir, "results.csv"), "w", newline="") as f:
+            csv.DictWriter(f, fieldnames=RESULT_FIELDS).writeheader()
+
+    epochs = cfg.epochs
+    nb = len(loader)
+    warmup_steps = max(round(cfg.warmup_epochs * nb), 100) if cfg.warmup_epochs > 0 else 0
+    best_fitness, start = 0.0, time.perf_counter()
+    last_opt_step = -1
+
+    for epoch in range(epochs):
+        if epoch == epochs - cfg.close_mosaic:
+            # As Ultralytics' trainer: plain, non-mosaic images for the last close_mosaic epochs
+            if rank == 0:
+                print(f"Closing mosaic for the last {cfg.close_mosaic} epochs")
+            loader.dataset.close_mosaic(hyp=cfg)
+            loader.reset()
+        # Linear decay from lr0 to lr0 * lrf, as Ultralytics does without cos_lr
+        epoch_lr = lr0 * ((1 - epoch / epochs) * (1.0 - cfg.lrf) + cfg.lrf)
+        loader.sampler.set_epoch(epoch)
+        net.train()
+        loss_sum, images, epoch_start = torch.zeros(3), 0, time.perf_counter()
+        for i, batch in enumerate(loader):
+            step = epoch * nb + i
+            lr = epoch_lr * min(1.0, (step + 1) / warmup_steps) if warmup_steps else epoch_lr
+            # Accumulation ramps up from one batch during warmup, as in Ultralytics
+            step_accumulate = (max(1, int(np.interp(step, [0, warmup_steps], [1, accumulate]).round()))
+                               if warmup_steps and step <= warmup_steps else accumulate)
+            for group in optimizer.param_groups:
+                group["lr"] = lr
+            optimizer_step = step - last_opt_step >= step_accumulate or i == nb - 1
+            # Gradients are only averaged between the ranks on the batch the optimizer steps on
+            with nullcontext() if optimizer_step else model.no_sync():
+                items, n = _backward(model, batch, world)
+            if optimizer_step:
+                _optimizer_step(model, optimizer)
+                last_opt_step = step
+                if ema is not None:
+                    ema.update(net)
+            loss_sum += items.detach()
+            images += n
+        train_s = time.perf_counter() - epoch_start
+
+        # Loss and throughput of all ranks together
+        stats = torch.cat([loss_sum / max(1, nb), torch.tensor([float(images)])])
+        dist.all_reduce(stats, op=dist.ReduceOp.SUM)
+        losses = (stats[:3] / world).tolist()
+
+        if rank == 0:
+            _save_checkpoint(last, ema, epoch, best_fitness, cfg)
+            row = {"epoch": epoch + 1, "train/box_loss": losses[0], "train/cls_loss": losses[1],
+                   "train/dfl_loss": losses[2], "lr/pg0": lr, "train_images_per_sec": round(stats[3].item() / train_s, 2)}
+            if cfg.val and ((epoch + 1) % spec["val_every"] == 0 or epoch + 1 == epochs):
+                metrics = YOLO(last).val(data=cfg.data, imgsz=cfg.imgsz, batch=spec["batch"], device="cpu",
+                                         workers=cfg.workers, plots=False, verbose=False, project=save_dir,
+                                         name="val", exist_ok=True)
+                row.update({"metrics/mAP50(B)": metrics.box.map50, "metrics/mAP50-95(B)": metrics.box.map})
+                # Ultralytics' fitness weighting
+                fitness = 0.1 * metrics.box.map50 + 0.9 * metrics.box.map
+                if fitness >= best_fitness:
+                    best_fitness = fitness
+                    shutil.copyfile(last, best)
+            elif not os.path.exists(best):
+                shutil.copyfile(last, best)
+            row["time"] = round(time.perf_counter() - start, 3)
+            with open(os.path.join(save_dir, "results.csv"), "a", newline="") as f:
+                csv.DictWriter(f, fieldnames=RESULT_FIELDS).writerow(row)
+            print(f"Epoch {epoch + 1}/{epochs}: loss {sum(losses):.4f}, {row['train_images_per_sec']:.2f} img/s"
+                  + (f", mAP50-95 {row['metrics/mAP50-95(B)']:.4f}" if "metrics/mAP50-95(B)" in row else ""))
+        # Nobody starts the next epoch before rank 0 has validated and saved
+        dist.barrier()
+
+    return {"best": best, "last": last, "best_fitness": best_fitness, "time_s": time.perf_counter() - start}
+
+
+# This function starts one process per core group and returns what rank 0 reports.
+# If a process fails, the others are stopped instead of waiting for it at the next collective.
+def launch(model: str, train_args: Dict, cores: Sequence[Sequence[int]], threads: int, batch: int,
+           save_dir: Optional[str] = None, benchmark: bool = False, batches: int = 6, warmup: int = 2,
+           val_every: int = 1) -> Dict:
+
+    spec = {"model": model, "train_args": train_args, "cores": [list(c) for c in cores], "threads": threads,
+            "batch": batch, "save_dir": save_dir, "benchmark": benchmark, "batches": batches, "warmup": warmup,
+            "val_every": val_every, "port": _free_port()}
+
+    # torch reads these once, when a process first imports it; spawned processes inherit them
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["MKL_NUM_THREADS"] = str(threads)
+    os.environ["KMP_DUPLICATE_LIB_OK"] = "TRUE"
+
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(rank, spec, queue)) for rank in range(len(cores))]
+    for p in procs:
+        p.start()
+
+    result = None
+    while any(p.is_alive() for p in procs):
+        if any(p.exitcode not in (None, 0) for p in procs):
+            for p in procs:
+                p.terminate()
+            break
+        if result is None and not queue.empty():
+            result = queue.get()
+        time.sleep(0.5)
+    for p in procs:
+        p.join()
+    if result is None and not queue.empty():
+        result = queue.get()
+
+    failed = [rank for rank, p in enumerate(procs) if p.exitcode != 0]
+    if failed or result is None:
+        raise RuntimeError(f"Training process(es) {failed or 'rank 0'} failed; see the output above")
+    return result
+
+
+# This function measures images/sec for each process count, with all cores split between the processes,
+# against one process with BASELINE_THREADS threads (the current single-process training)
+def measure_scaling(model: str, train_args: Dict, process_counts: Sequence[int], batch: int, batches: int = 6,
+                    warmup: int = 2, baseline_threads: int = BASELINE_THREADS) -> List[ScalingResult]:
+
+    cores = physical_cores()
+    baseline_threads = min(baseline_threads, len(cores))
+    print(f"\nMeasuring throughput on {len(cores)} physical cores, global batch {batch}")
+
+    groups, _ = partition_cores(1, baseline_threads)
+    base = launch(model, train_args, groups, baseline_threads, batch, benchmark=True, batches=batches, warmup=warmup)
+    results = [ScalingResult(1, baseline_threads, batch, base["images_per_sec"], 1.0, 1.0)]
+    print(f"  baseline: 1 process x {baseline_threads} threads: {base['images_per_sec']:.2f} img/s")
+
+    for processes in process_counts:
+        try:
+            groups, threads = partition_cores(processes)
+        except ValueError as e:
+            print(f"  {processes} processes: skipped, {e}")
+            continue
+        r = launch(model, train_args, groups, threads, batch, benchmark=True, batches=batches, warmup=warmup)
+        speedup = r["images_per_sec"] / base["images_per_sec"]
+        efficiency = speedup * baseline_threads / (processes * threads)
+        results.append(ScalingResult(processes, threads, batch, r["images_per_sec"], speedup, efficiency))
+        print(f"  {processes} processes x {threads} threads: {r['images_per_sec']:.2f} img/s")
+    return results
+
+
+def print_scaling(results: List[ScalingResult]):
+    print("\n**** SCALING SUMMARY ****")
+    print(f"{'processes':>9} {'threads':>7} {'cores':>5} {'img/s':>8} {'speedup':>8} {'per core':>8}")
+    for r in results:
+        print(f"{r.processes:>9} {r.threads:>7} {r.processes * r.threads:>5} {r.images_per_sec:>8.2f} "
+              f"{r.speedup:>7.2f}x {r.efficiency:>7.0%}")
+    best = max(results, key=lambda r: r.images_per_sec)
+    print(f"Fastest: {best.processes} process(es) x {best.threads} threads, {best.speedup:.2f}x the single-process run")
+
+
+def _parse_overrides(pairs: Sequence[str]) -> Dict:
+    import yaml
+
+    overrides = {}
+    for pair in pairs:
+        key, _, value = pair.partition("=")
+        overrides[key] = yaml.safe_load(value)
+    return overrides
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Data-parallel YOLO training on CPU cores (gloo backend).")
+    parser.add_argument("command", choices=("train", "scale"), help="train a model, or measure throughput scaling")
+    parser.add_argument("--model", required=True, help="model or weights to start from, e.g. yolov8n.pt")
+    parser.add_argument("--data", required=True, help="data.yaml")
+    parser.add_argument("--processes", type=int, nargs="+", default=[4],
+                        help="process count for train; counts to compare for scale (default: 4)")
+    parser.add_argument("--batch", type=int, default=32, help="global batch, split between the processes")
+    parser.add_argument("--workers", type=int, default=2, help="dataloader workers per process")
+    parser.add_argument("--epochs", type=int, default=20)
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--name", default="object-detection-ddp", help="run directory under runs/detect")
+    parser.add_argument("--val-every", type=int, default=1, help="validate every N epochs (and after the last)")
+    parser.add_argument("--batches", type=int, default=6, help="timed batches per setting for scale")
+    parser.add_argument("--baseline-threads", type=int, default=BASELINE_THREADS)
+    parser.add_argument("--set", nargs="*", default=[], metavar="KEY=VALUE",
+                        help="other Ultralytics train arguments, e.g. --set optimizer=SGD lr0=0.01 nbs=64 "
+                             "close_mosaic=10; optimizer, nbs, weight_decay and close_mosaic are applied as in "
+                             "Ultralytics, the learning rate decays linearly (cos_lr is not supported)")
+    args = parser.parse_args(argv)
+
+    train_args = {"data": args.data, "imgsz": args.imgsz, "epochs": args.epochs, "workers": args.workers,
+                  "optimizer": "AdamW", "lr0": 0.0002}
+    train_args.update(_parse_overrides(args.set))
+
+    if args.command == "scale":
+        print_scaling(measure_scaling(args.model, train_args, args.processes, args.batch, args.batches,
+                                      baseline_threads=args.baseline_threads))
+        return
+
+    processes = args.processes[0]
+    groups, threads = partition_cores(processes)
+    save_dir = os.path.join("runs", "detect", args.name)
+    print(f"Training on {processes} processes x {threads} threads, global batch {args.batch} "
+          f"({max(1, args.batch // processes)} per process) -> {save_dir}")
+    result = launch(args.model, train_args, groups, threads, args.batch, save_dir=save_dir, val_every=args.val_every)
+
+    print("\n**** SUMMARY ****")
+    print(f"Best weights: {result['best']} (fitness {result['best_fitness']:.4f})")
+    print(f"Training time: {result['time_s'] / 3600:.2f}h")
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    main()
@@ -0,0 +1,182 @@
+import json
+import os
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+import yaml
+
+from coreset import IMAGE_EXT
+
+# Keys of the distill block used by this module; every other key goes to model.train() of the student
+DISTILL_KEYS = ("teacher", "teacher_imgsz", "student", "name", "kd_weight", "temperature", "latency_images")
+
+
+class DistillationLoss:
+    """
+    The Ultralytics detection loss of the student plus a distillation term against the teacher's head outputs.
+    The teacher sees the same (augmented, resized) batch as the student, so both heads predict on the same grid.
+    Classes: binary cross-entropy against the teacher's softened class probabilities at every anchor.
+    Boxes: KL divergence between the softened DFL bin distributions, weighted by the teacher's class confidence
+    so background anchors do not dominate.
+    """
+
+    def __init__(self, base, teacher, reg_max: int, kd_weight: float = 1.0, temperature: float = 2.0):
+        self.base = base
+        self.teacher = teacher
+        self.reg_max = reg_max
+        self.kd_weight = kd_weight
+        self.temperature = temperature
+
+    def kd_loss(self, student_preds, teacher_preds):
+        import torch
+        import torch.nn.functional as F
+
+        t = self.temperature
+        cls_loss, box_loss = 0.0, 0.0
+        for s, te in zip(student_preds, teacher_preds):
+            b, _, h, w = s.shape
+            s_box, s_cls = s.view(b, -1, h * w).split((4 * self.reg_max, s.shape[1] - 4 * self.reg_max), 1)
+            t_box, t_cls = te.view(b, -1, h * w).split((4 * self.reg_max, te.shape[1] - 4 * self.reg_max), 1)
+
+            t_prob = torch.sigmoid(t_cls / t)
+            cls_loss = cls_loss + F.binary_cross_entropy_with_logits(s_cls / t, t_prob, reduction="mean") * t * t
+
+            weight = t_prob.max(1).values                                      # [b, h*w]
+            s_log = F.log_softmax(s_box.view(b, 4, self.reg_max, -1) / t, dim=2)
+            t_soft = F.softmax(t_box.view(b, 4, self.reg_max, -1) / t, dim=2)
+            kl = (t_soft * (torch.log(t_soft + 1e-9) - s_log)).sum(2).mean(1)  # [b, h*w]
+            box_loss = box_loss + (kl * weight).sum() / weight.sum().clamp(min=1.0) * t * t
+        return (cls_loss + box_loss) / len(student_preds)
+
+    def __call__(self, preds, batch):
+        import torch
+
+        loss, items = self.base(preds, batch)
+        student_preds = preds[1] if isinstance(preds, tuple) else preds
+        with torch.no_grad():
+            teacher_preds = self.teacher(batch["img"])[1]
+        # Ultralytics scales its loss by the batch size; the distillation term is scaled the same way
+        kd = self.kd_loss(student_preds, teacher_preds) * self.kd_weight * batch["img"].shape[0]
+        loss = loss + kd if loss.ndim == 0 else loss + kd / loss.numel()
+        return loss, items
+
+
+# This function writes a model YAML for a student slimmer than YOLOv8n (depth 0.33, width 0.25)
+def write_student_yaml(path: str, depth: float, width: float, max_channels: int = 1024) -> str:
+    from ultralytics.nn.tasks import yaml_model_load
+
+    cfg = yaml_model_load("yolov8n.yaml")
+    cfg = {k: v for k, v in cfg.items() if k not in ("scale", "yaml_file")}
+    cfg["scales"] = {"student": [depth, width, max_channels]}
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        yaml.safe_dump(cfg, f, sort_keys=False)
+    return path
+
+
+# This function trains a student against the teacher and returns the path of the student's best.pt.
+# student {depth, width} builds a slimmer network trained from scratch; without it the student starts as a
+# copy of the teacher and is distilled at the (smaller) imgsz of train_args.
+def train_student(
+    teacher_path: str,
+    train_args: Dict,
+    name: str,
+    student: Optional[Dict] = None,
+    kd_weight: float = 1.0,
+    temperature: float = 2.0,
+) -> str:
+
+    from ultralytics import YOLO
+    from ultralytics.utils.loss import v8DetectionLoss
+
+    teacher = YOLO(teacher_path).model.float().eval()
+    for p in teacher.parameters():
+        p.requires_grad_(False)
+
+    if student:
+        project = train_args.get("project") or os.path.join("runs", "detect")
+        model = YOLO(write_student_yaml(os.path.join(project, f"{name}.yaml"), student["depth"], student["width"],
+                                        student.get("max_channels", 1024)))
+    else:
+        model = YOLO(teacher_path)
+
+    def use_distillation_loss(trainer):
+        net = trainer.model
+        net.criterion = DistillationLoss(v8DetectionLoss(net), teacher, net.model[-1].reg_max, kd_weight, temperature)
+
+    model.add_callback("on_train_start", use_distillation_loss)
+    model.train(name=name, **train_args)
+    return os.path.join(str(model.trainer.save_dir), "weights", "best.pt")
+
+
+def _split_images(data_yaml: str, split: str = "val") -> List[str]:
+    from ultralytics.data.utils import check_det_dataset
+
+    source = str(check_det_dataset(data_yaml)[split])
+    return [os.path.join(source, f) for f in sorted(os.listdir(source)) if f.lower().endswith(IMAGE_EXT)]
+
+
+# This function measures single-image CPU latency as in live-camera-detection.py: images are read into memory
+# first, like camera frames, and each predict() call is timed end to end (preprocess, inference, NMS)
+def measure_latency(model_path: str, images: List[str], imgsz: int, warmup: int = 3) -> Dict:
+    import cv2
+    from ultralytics import YOLO
+
+    model = YOLO(model_path)
+    frames = [cv2.imread(p) for p in images]
+    for frame in frames[:warmup]:
+        model.predict(source=frame, imgsz=imgsz, device="cpu", verbose=False)
+    times = []
+    for frame in frames:
+        start = time.perf_counter()
+        model.predict(source=frame, imgsz=imgsz, device="cpu", verbose=False)
+        times.append((time.perf_counter() - start) * 1000)
+    return {"median_ms": float(np.median(times)), "p90_ms": float(np.percentile(times, 90))}
+
+
+# This function returns mAP, latency and size of a model on the validation split
+def evaluate(model_path: str, data_yaml: str, imgsz: int, latency_images: int = 50) -> Dict:
+    from ultralytics import YOLO
+
+    model = YOLO(model_path)
+    metrics = model.val(data=data_yaml, imgsz=imgsz, device="cpu", plots=False, verbose=False)
+    _, params, _, gflops = model.info(verbose=False)
+    report = {"model": model_path, "imgsz": imgsz, "mAP50": float(metrics.box.map50),
+              "mAP50-95": float(metrics.box.map), "params": int(params), "gflops": float(gflops)}
+    report.update(measure_latency(model_path, _split_images(data_yaml)[:latency_images], imgsz))
+    return report
+
+
+def print_comparison(teacher: Dict, student: Dict):
+    print("\n**** DISTILLATION SUMMARY ****")
+    print(f"{'':<10} {'imgsz':>5} {'mAP50':>7} {'mAP50-95':>9} {'params':>9} {'GFLOPs':>7} {'median ms':>10} {'p90 ms':>7}")
+    for label, r in (("teacher", teacher), ("student", student)):
+        print(f"{label:<10} {r['imgsz']:>5} {r['mAP50']:>7.4f} {r['mAP50-95']:>9.4f} {r['params']:>9,} "
+              f"{r['gflops']:>7.2f} {r['median_ms']:>10.1f} {r['p90_ms']:>7.1f}")
+    kept = student["mAP50-95"] / teacher["mAP50-95"] if teacher["mAP50-95"] else 0.0
+    cost = student["median_ms"] / teacher["median_ms"] if teacher["median_ms"] else 0.0
+    print(f"Student keeps {kept:.0%} of the teacher's mAP50-95 at {cost:.0%} of its CPU latency")
+
+
+# This function runs the distill block of a training config: trains the student, evaluates both models
+# and writes distillation-report.json next to the student's weights
+def run_distillation(distill: Dict, teacher_path: str, train_args: Dict) -> str:
+    name = distill.get("name", "object-detection-student")
+    train_args = dict(train_args, **{k: v for k, v in distill.items() if k not in DISTILL_KEYS})
+    teacher_imgsz = distill.get("teacher_imgsz", 640)
+
+    best = train_student(teacher_path, train_args, name, distill.get("student"), distill.get("kd_weight", 1.0),
+                         distill.get("temperature", 2.0))
+
+    latency_images = distill.get("latency_images", 50)
+    teacher = evaluate(teacher_path, train_args["data"], teacher_imgsz, latency_images)
+    student = evaluate(best, train_args["data"], train_args.get("imgsz", 640), latency_images)
+    print_comparison(teacher, student)
+
+    path = os.path.join(os.path.dirname(os.path.dirname(best)), "distillation-report.json")
+    with open(path, "w") as f:
+        json.dump({"teacher": teacher, "student": student, "distill": distill}, f, indent=2)
+    print(f"Report: {path}")
+    print(f"Student weights: {best} (predict with imgsz={student['imgsz']})")
+    return best
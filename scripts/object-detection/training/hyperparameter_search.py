@@ -0,0 +1,259 @@
+import csv
+import json
+import math
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import product
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import psutil
+import yaml
+
+from ddp_cpu import partition_cores, physical_cores
+from run_store import DEFAULT_METRIC, read_csv_columns
+
+# Successive halving: every trial trains to the first rung's epochs, the best 1/eta of them continue
+# to eta times as many epochs, and so on until max_epochs. A trial runs in its own process pinned to
+# a share of the cores; trials train with epochs=max_epochs and stop at their rung, so the learning
+# rate schedule is the same as in a full run and a surviving trial resumes where it stopped.
+
+# Checkpoint a trial stops at; copied from last.pt before Ultralytics strips its optimizer state
+RUNG_CHECKPOINT = "rung.pt"
+
+
+# This function returns the epochs of each rung: min_epochs, min_epochs * eta, ... up to max_epochs
+def rung_epochs(min_epochs: int, max_epochs: int, eta: int) -> List[int]:
+    rungs = [min_epochs]
+    while rungs[-1] * eta < max_epochs:
+        rungs.append(rungs[-1] * eta)
+    if rungs[-1] != max_epochs:
+        rungs.append(max_epochs)
+    return rungs
+
+
+# This function draws the trial parameters from a search space. A list is a set of choices;
+# {low, high, log} is a range, drawn as whole numbers when low and high are both integers (e.g. batch).
+# When every entry is a list with at most `trials` combinations, the whole grid is used instead of random draws.
+def sample_trials(space: Dict, trials: int, seed: int = 0) -> List[Dict]:
+    # Trials train with epochs=max_epochs and stop at their rung, so epochs cannot be searched
+    if "epochs" in space:
+        raise ValueError("epochs cannot be part of the search space; the rungs set the epochs of a trial "
+                         "(set min_epochs and max_epochs of the search block instead)")
+    if all(isinstance(v, list) for v in space.values()):
+        grid = [dict(zip(space, values)) for values in product(*space.values())]
+        if len(grid) <= trials:
+            return grid
+
+    rng = np.random.default_rng(seed)
+    samples, seen = [], set()
+    for _ in range(trials * 20):
+        params = {}
+        for key, values in space.items():
+            if isinstance(values, list):
+                params[key] = values[int(rng.integers(len(values)))]
+            else:
+                low, high = values["low"], values["high"]
+                if values.get("log"):
+                    value = float(np.exp(rng.uniform(np.log(low), np.log(high))))
+                else:
+                    value = float(rng.uniform(low, high))
+                integer = isinstance(low, int) and isinstance(high, int)
+                params[key] = int(min(max(round(value), low), high)) if integer else value
+        key = json.dumps(params, sort_keys=True)
+        if key not in seen:
+            seen.add(key)
+            samples.append(params)
+        if len(samples) == trials:
+            break
+    return samples
+
+
+# This function runs inside the trial process: it trains (or resumes) one trial up to stop_epoch
+def _run_trial(spec: Dict) -> Dict:
+    try:
+        psutil.Process().cpu_affinity(spec["cores"])
+    except (AttributeError, psutil.Error):
+        pass
+    import torch
+    from ultralytics import YOLO
+
+    torch.set_num_threads(spec["threads"])
+    trial_dir = spec["trial_dir"]
+    checkpoint = os.path.join(trial_dir, RUNG_CHECKPOINT)
+
+    def stop_at_rung(trainer):
+        if trainer.epoch + 1 >= spec["stop_epoch"]:
+            shutil.copyfile(trainer.last, checkpoint)
+            trainer.stop = True
+
+    if spec["resume"]:
+        model = YOLO(checkpoint)
+        model.add_callback("on_fit_epoch_end", stop_at_rung)
+        model.train(resume=True)
+    else:
+        model = YOLO(spec["model"])
+        model.add_callback("on_fit_epoch_end", stop_at_rung)
+        project, name = os.path.split(trial_dir)
+        model.train(project=project, name=name, exist_ok=True, **spec["train_args"])
+
+    columns = read_csv_columns(os.path.join(trial_dir, "results.csv"))
+    values = columns.get(DEFAULT_METRIC, np.array([]))
+    return {"score": float(values[-1]) if len(values) else 0.0, "epochs": int(len(values))}
+
+
+# This function runs one trial up to stop_epoch in a separate process and returns its valid mAP50-95
+def run_trial(model: str, train_args: Dict, trial_dir: str, stop_epoch: int, resume: bool, cores: Sequence[int],
+              threads: int, timeout: Optional[float] = None) -> Dict:
+
+    spec = {"model": model, "train_args": train_args, "trial_dir": os.path.abspath(trial_dir), "stop_epoch": stop_epoch,
+            "resume": resume, "cores": list(cores), "threads": threads}
+    env = dict(os.environ, OMP_NUM_THREADS=str(threads), MKL_NUM_THREADS=str(threads), KMP_DUPLICATE_LIB_OK="TRUE")
+    os.makedirs(trial_dir, exist_ok=True)
+    log_path = os.path.join(trial_dir, "trial.log")
+    try:
+        with open(log_path, "a") as log:
+            proc = subprocess.run([sys.executable, os.path.abspath(__file__), json.dumps(spec)], env=env,
+                                  stdout=subprocess.PIPE, stderr=log, text=True, timeout=timeout)
+            log.write(proc.stdout)
+    except subprocess.TimeoutExpired:
+        return {"score": None, "error": f"timed out after {timeout:.0f}s"}
+
+    lines = proc.stdout.strip().splitlines()
+    try:
+        return json.loads(lines[-1])
+    except (IndexError, ValueError):
+        return {"score": None, "error": f"exit code {proc.returncode}, see {log_path}"}
+
+
+# This function runs the search and returns the trials ranked best first.
+# Each trial is a dict of its params, the score of every rung it reached and its status.
+def successive_halving(
+    model: str,
+    train_args: Dict,
+    trials: List[Dict],
+    project: str,
+    min_epochs: int = 3,
+    max_epochs: int = 24,
+    eta: int = 2,
+    parallel: int = 4,
+) -> List[Dict]:
+
+    rungs = rung_epochs(min_epochs, max_epochs, eta)
+    records = [{"trial": f"trial-{i:03d}", "params": params, "scores": [], "status": "running", "time_s": 0.0}
+               for i, params in enumerate(trials)]
+    alive = list(records)
+    print(f"\n{len(records)} trials, rungs at epochs {rungs}, keeping 1/{eta} after each rung")
+
+    for r, stop_epoch in enumerate(rungs):
+        # Fewer trials left: the same cores are split between fewer, faster trials
+        slots = min(parallel, len(alive), len(physical_cores()))
+        groups, threads = partition_cores(slots)
+        free = queue.Queue()
+        for group in groups:
+            free.put(group)
+        print(f"\nRung {r + 1}/{len(rungs)}: {len(alive)} trials to epoch {stop_epoch}, "
+              f"{slots} at a time with {threads} threads each")
+
+        def run(record):
+            cores = free.get()
+            try:
+                args = dict(train_args, **record["params"], epochs=max_epochs)
+                start = time.perf_counter()
+                result = run_trial(model, args, os.path.join(project, record["trial"]), stop_epoch, r > 0, cores, threads)
+                record["time_s"] += time.perf_counter() - start
+                return record, result
+            finally:
+                free.put(cores)
+
+        with ThreadPoolExecutor(max_workers=slots) as pool:
+            for record, result in pool.map(run, alive):
+                if result.get("score") is None:
+                    record["status"] = f"failed: {result.get('error')}"
+                    print(f"  {record['trial']} {record['params']}: {record['status']}")
+                    continue
+                record["scores"].append(result["score"])
+                print(f"  {record['trial']} {record['params']}: mAP50-95 {result['score']:.4f}")
+
+        finished = [rec for rec in alive if rec["status"] == "running"]
+        finished.sort(key=lambda rec: rec["scores"][-1], reverse=True)
+        if not finished:
+            break
+        if r == len(rungs) - 1:
+            for rec in finished:
+                rec["status"] = "completed"
+            break
+        keep = max(1, math.ceil(len(finished) / eta))
+        for rec in finished[keep:]:
+            rec["status"] = f"stopped at epoch {stop_epoch}"
+        alive = finished[:keep]
+
+    # Trials that got further rank first, then by their score at the last rung they reached
+    return sorted(records, key=lambda rec: (len(rec["scores"]), rec["scores"][-1] if rec["scores"] else -1.0), reverse=True)
+
+
+# This function writes leaderboard.csv and leaderboard.json to the project directory
+def write_leaderboard(ranked: List[Dict], project: str, rungs: Sequence[int]) -> str:
+    os.makedirs(project, exist_ok=True)
+    keys = sorted({key for rec in ranked for key in rec["params"]})
+    path = os.path.join(project, "leaderboard.csv")
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["rank", "trial"] + keys + [f"mAP50-95@{e}" for e in rungs] + ["status", "time_s"])
+        for rank, rec in enumerate(ranked, 1):
+            scores = [f"{s:.4f}" for s in rec["scores"]] + [""] * (len(rungs) - len(rec["scores"]))
+            writer.writerow([rank, rec["trial"]] + [rec["params"].get(k) for k in keys] + scores
+                            + [rec["status"], round(rec["time_s"], 1)])
+    with open(os.path.join(project, "leaderboard.json"), "w") as f:
+        json.dump({"rungs": list(rungs), "trials": ranked}, f, indent=2)
+    return path
+
+
+def print_leaderboard(ranked: List[Dict], top: int = 10):
+    print("\n**** SEARCH SUMMARY ****")
+    for rank, rec in enumerate(ranked[:top], 1):
+        score = f"{rec['scores'][-1]:.4f}" if rec["scores"] else "-"
+        params = ", ".join(f"{k}={v:.3g}" if isinstance(v, float) else f"{k}={v}" for k, v in rec["params"].items())
+        print(f"{rank:>3}. {rec['trial']} mAP50-95 {score} after {len(rec['scores'])} rung(s): {params} [{rec['status']}]")
+
+
+# This function runs the search block of a training config and writes the winning config:
+# the training config with the winning parameters set on the searched stage
+def run_search(config: Dict, search: Dict, model: str, train_args: Dict, project: str) -> Optional[str]:
+    trials = sample_trials(search["space"], search.get("trials", 16), search.get("seed", 0))
+    train_args = dict(train_args, workers=search.get("workers", 2), plots=False)
+    min_epochs, max_epochs, eta = search.get("min_epochs", 3), search.get("max_epochs", 24), search.get("eta", 2)
+
+    ranked = successive_halving(model, train_args, trials, project, min_epochs, max_epochs, eta, search.get("parallel", 4))
+    leaderboard = write_leaderboard(ranked, project, rung_epochs(min_epochs, max_epochs, eta))
+    print_leaderboard(ranked)
+    print(f"Leaderboard: {leaderboard}")
+
+    winner = ranked[0] if ranked and ranked[0]["scores"] else None
+    if winner is None:
+        print("No trial finished.")
+        return None
+    best = json.loads(json.dumps(config))
+    for stage in best["stages"]:
+        if stage["name"] == search["stage"]:
+            stage.update(winner["params"])
+    best.pop("search", None)
+    path = os.path.join(project, "best-config.yaml")
+    with open(path, "w") as f:
+        f.write(f"# Winner of the search in {project}: {winner['trial']}, mAP50-95 {winner['scores'][-1]:.4f}\n")
+        yaml.safe_dump(best, f, sort_keys=False)
+    print(f"Winning config: {path}")
+    return path
+
+
+if __name__ == "__main__":
+    # Trial process: the trial comes as JSON on the command line, the result goes to stdout as one JSON line
+    try:
+        print(json.dumps(_run_trial(json.loads(sys.argv[1]))))
+    except Exception as e:
+        print(json.dumps({"score": None, "error": f"{type(e).__name__}: {e}"}))
@@ -0,0 +1,190 @@
+import json
+import os
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+# Manifests come from the preprocessing package: pip install -e scripts/data-preprocessing
+from homebuddy_preprocessing.dataset_manifest import (changed_stems, default_manifest_path, load_manifest,
+                                                      save_manifest, scan_split, update_manifest)
+
+from coreset import IMAGE_EXT, label_path_for, read_yolo_targets, select_coreset, write_coreset
+from run_store import read_csv_columns
+
+# Every training run keeps a manifest of the train split it was trained on, in its run directory.
+# The next incremental run diffs the train split against it: added or changed images are new data.
+MANIFEST_FILE = "train-manifest.json"
+
+
+class IncrementalData(NamedTuple):
+    data_yaml: str                 # train list of the new images plus the replay sample
+    new_images: List[str]
+    replay_images: List[str]
+    old_images: int                # images already in the previous run's train split
+    train_images: int              # images in the train split now
+
+
+# This function returns the train split folder of a data.yaml (the folder holding images/ and labels/)
+def train_split_dir(data_yaml: str) -> str:
+    from ultralytics.data.utils import check_det_dataset
+
+    train = check_det_dataset(data_yaml)["train"]
+    if isinstance(train, list) or not os.path.isdir(str(train)):
+        raise ValueError(f"Incremental training needs the train split of {data_yaml} to be one images folder")
+    return os.path.dirname(os.path.normpath(str(train)))
+
+
+# This function writes the manifest of the current train split to a run directory.
+# Hashes are reused when size and mtime did not change, from the split's own manifest (incremental-audit)
+# and from the manifest of cache_run_dir, e.g. the run this one started from; only other files are hashed.
+def record_train_manifest(run_dir: str, data_yaml: str, cache_run_dir: Optional[str] = None) -> Dict[str, Dict]:
+    split_dir = train_split_dir(data_yaml)
+    cache = load_manifest(os.path.join(cache_run_dir, MANIFEST_FILE)) if cache_run_dir else {}
+    cache.update(load_manifest(default_manifest_path(split_dir)))
+    entries, _, _ = update_manifest(cache, scan_split(split_dir, IMAGE_EXT))
+    save_manifest(os.path.join(run_dir, MANIFEST_FILE), entries)
+    return entries
+
+
+# This function picks a fixed-size, class-balanced random sample of the older images:
+# every class gets an equal share, rare classes all their images, the rest is filled at random
+def replay_sample(images: List[str], size: int, num_classes: int, seed: int = 0) -> List[str]:
+    if size >= len(images):
+        return list(images)
+    image_classes = [read_yolo_targets(label_path_for(p))[0].tolist() for p in images]
+    # Random scores make the hardest-first order of select_coreset a random one
+    scores = np.random.default_rng(seed).random(len(images))
+    keep = select_coreset(scores, image_classes, size / len(images), 0.0, num_classes, seed)
+    return [images[i] for i in keep]
+
+
+# This function builds the training data of an incremental run: the images added or changed since the previous
+# run's manifest, plus a replay sample of replay_size older images. Writes train.txt and data.yaml to out_dir.
+def prepare_incremental(previous_run_dir: str, data_yaml: str, out_dir: str, replay_size: int = 1000,
+                        seed: int = 0) -> IncrementalData:
+    from ultralytics.data.utils import check_det_dataset
+
+    manifest_path = os.path.join(previous_run_dir, MANIFEST_FILE)
+    previous = load_manifest(manifest_path)
+    if not previous:
+        raise FileNotFoundError(f"{manifest_path} not found: the previous run has no train manifest. Record one with "
+                                f"incremental_training.py record {previous_run_dir} <data.yaml> if it was trained on "
+                                f"the data before the new images were added.")
+
+    split_dir = train_split_dir(data_yaml)
+    _, diff, _ = update_manifest(previous, scan_split(split_dir, IMAGE_EXT))
+    new_stems = set(changed_stems(diff.changed))
+
+    images_dir = os.path.join(split_dir, "images")
+    images = sorted(os.path.join(images_dir, f) for f in os.listdir(images_dir) if f.lower().endswith(IMAGE_EXT))
+    new_images = [p for p in images if os.path.splitext(os.path.basename(p))[0] in new_stems]
+    old_images = [p for p in images if os.path.splitext(os.path.basename(p))[0] not in new_stems]
+    if not new_images:
+        raise ValueError(f"No images were added or changed in {split_dir} since {manifest_path}")
+
+    replay = replay_sample(old_images, replay_size, len(check_det_dataset(data_yaml)["names"]), seed)
+    subset_yaml = write_coreset(data_yaml, new_images + replay, out_dir)
+    return IncrementalData(subset_yaml, new_images, replay, len(old_images), len(images))
+
+
+# This function returns the mAP50-95 of every class on the validation split
+def per_class_map(weights: str, data_yaml: str, imgsz: int = 640) -> Dict[str, float]:
+    from ultralytics import YOLO
+
+    model = YOLO(weights)
+    metrics = model.val(data=data_yaml, imgsz=imgsz, device="cpu", plots=False, verbose=False)
+    return {model.names[i]: float(v) for i, v in enumerate(metrics.box.maps)}
+
+
+# This function returns the training time of a run in seconds (Ultralytics' time column is cumulative)
+def run_time(run_dir: str) -> float:
+    times = read_csv_columns(os.path.join(run_dir, "results.csv")).get("time")
+    return float(np.nanmax(times)) if times is not None and len(times) else 0.0
+
+
+# This function estimates how long a full retrain would take: the previous run's seconds per image and epoch,
+# times the images of the train split now and the epochs of a full run
+def estimate_full_time(previous_run_dir: str, train_images: int, full_epochs: int) -> float:
+    columns = read_csv_columns(os.path.join(previous_run_dir, "results.csv"))
+    epochs = len(columns.get("epoch", []))
+    previous_images = sum(1 for key in load_manifest(os.path.join(previous_run_dir, MANIFEST_FILE))
+                          if key.startswith("images/"))
+    if not epochs or not previous_images:
+        return 0.0
+    return run_time(previous_run_dir) / (epochs * previous_images) * train_images * full_epochs
+
+
+def print_incremental_report(report: Dict):
+    data, times = report["data"], report["times"]
+    print("\n**** INCREMENTAL SUMMARY ****")
+    print(f"New or changed images: {data['new_images']}, replayed: {data['replay_images']} "
+          f"of {data['old_images']} older images ({data['train_images']} in the train split)")
+
+    full = times["full_s"]
+    source = "measured" if times["full_measured"] else "estimated"
+    if full:
+        saved = full - times["incremental_s"]
+        print(f"Training time: incremental {times['incremental_s'] / 3600:.2f}h vs full retrain {full / 3600:.2f}h "
+              f"({source}) -> saved {saved / 3600:.2f}h ({saved / full:.0%})")
+    else:
+        print(f"Training time: incremental {times['incremental_s'] / 3600:.2f}h")
+
+    reference = report["reference"]
+    maps = report["map"]
+    columns = [c for c in ("previous", "full", "incremental") if c in maps]
+    print("\nmAP50-95 per class")
+    print(f"{'class':<12}" + "".join(f" {c:>11}" for c in columns) + f" {'change':>8}")
+    for name in maps["incremental"]:
+        change = maps["incremental"][name] - maps[reference][name]
+        print(f"{name:<12}" + "".join(f" {maps[c][name]:>11.4f}" for c in columns) + f" {change:>+8.4f}")
+    print(f"(change is incremental minus {reference})")
+
+
+# This function compares an incremental run with the previous model and, when given, a full retrain on the
+# same data; without a full retrain run the time is estimated and mAP is compared with the previous model.
+# Writes incremental-report.json to the incremental run directory.
+def compare_with_full(incremental_run_dir: str, previous_run_dir: str, data: IncrementalData, data_yaml: str,
+                      imgsz: int = 640, full_run_dir: Optional[str] = None, full_epochs: int = 40) -> Dict:
+
+    def best(run_dir):
+        return os.path.join(run_dir, "weights", "best.pt")
+
+    maps = {"previous": per_class_map(best(previous_run_dir), data_yaml, imgsz),
+            "incremental": per_class_map(best(incremental_run_dir), data_yaml, imgsz)}
+    reference = "previous"
+    if full_run_dir:
+        maps["full"] = per_class_map(best(full_run_dir), data_yaml, imgsz)
+        reference = "full"
+
+    report = {
+        "data": {"new_images": len(data.new_images), "replay_images": len(data.replay_images),
+                 "old_images": data.old_images, "train_images": data.train_images},
+        "times": {"incremental_s": run_time(incremental_run_dir),
+                  "full_s": run_time(full_run_dir) if full_run_dir else estimate_full_time(previous_run_dir,
+                                                                                           data.train_images, full_epochs),
+                  "full_measured": bool(full_run_dir)},
+        "reference": reference,
+        "map": maps,
+    }
+    with open(os.path.join(incremental_run_dir, "incremental-report.json"), "w") as f:
+        json.dump(report, f, indent=2)
+    print_incremental_report(report)
+    return report
+
+
+def main(argv: Optional[List[str]] = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Record the train manifest of an existing run, for incremental training.")
+    parser.add_argument("command", choices=("record",))
+    parser.add_argument("run_dir", help="run directory, e.g. runs/detect/object-detection-training-4")
+    parser.add_argument("data", help="data.yaml the run was trained on")
+    args = parser.parse_args(argv)
+
+    entries = record_train_manifest(args.run_dir, args.data)
+    print(f"Recorded {sum(1 for key in entries if key.startswith('images/'))} train images to "
+          f"{os.path.join(args.run_dir, MANIFEST_FILE)}")
+
+
+if __name__ == "__main__":
+    main()
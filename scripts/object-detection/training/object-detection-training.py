@@ -0,0 +1,318 @@
+import argparse
+import os
+from typing import Dict, List, Optional
+
+import yaml
+
+from coreset import CoresetRefresher
+from cpu_probe import ProbeResult, find_fastest_setting, load_cached_probe, probe_fingerprint, save_cached_probe
+from distillation import run_distillation
+from hyperparameter_search import run_search
+from run_store import RunStore
+from training_profiler import TrainingProfiler
+
+TRAINING_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CONFIG = os.path.join(TRAINING_DIR, "training-config.yaml")
+
+# Stage keys used by this script; every other key goes to model.train()
+STAGE_KEYS = ("name", "model", "coreset", "shards")
+
+# Keys of the incremental block used by this script; every other key goes to model.train()
+INCREMENTAL_KEYS = ("previous", "name", "replay_size", "seed", "full_run", "full_epochs")
+
+# Train arguments that do not change the per-batch cost, left out of the probe and its cache key
+PROBE_IGNORED_ARGS = ("epochs", "name", "verbose", "batch", "workers", "project", "exist_ok", "patience", "save_period", "plots")
+
+
+def load_config(path: str) -> Dict:
+    with open(path, "r") as f:
+        config = yaml.safe_load(f)
+    names = [stage["name"] for stage in config["stages"]]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Stage names must be unique in {path}")
+    return config
+
+
+# This function returns the train() arguments of a stage: the defaults overridden by the stage
+def stage_train_args(config: Dict, stage: Dict) -> Dict:
+    args = dict(config.get("defaults") or {})
+    args.update({key: value for key, value in stage.items() if key not in STAGE_KEYS})
+    return args
+
+
+# This function returns the directory Ultralytics writes a run to when no trainer is at hand
+def run_dir(train_args: Dict, name: str) -> str:
+    return os.path.join(train_args.get("project") or os.path.join("runs", "detect"), name)
+
+
+# This function returns the weights a stage starts from.
+# model: {from: <stage>} uses the best.pt of that stage, from this run if it was trained in it.
+def resolve_model(config: Dict, stage: Dict, trained: Dict[str, str]) -> str:
+    model = stage["model"]
+    if not isinstance(model, dict):
+        return model
+
+    source = model["from"]
+    if source in trained:
+        return trained[source]
+    source_stage = next((s for s in config["stages"] if s["name"] == source), None)
+    if source_stage is None:
+        raise ValueError(f"Stage {stage['name']} warm starts from unknown stage '{source}'")
+    best = os.path.join(run_dir(stage_train_args(config, source_stage), source), "weights", "best.pt")
+    if not os.path.exists(best):
+        raise FileNotFoundError(f"{best} not found: train stage '{source}' before '{stage['name']}'")
+    return best
+
+
+# This function follows the warm starts of a stage back to the model file the chain started from.
+# All stages of a chain share the architecture, so the probe can run before earlier stages are trained.
+def base_model(config: Dict, stage: Dict) -> str:
+    by_name = {s["name"]: s for s in config["stages"]}
+    seen = set()
+    while isinstance(stage["model"], dict):
+        if stage["name"] in seen:
+            raise ValueError(f"Warm starts of stage {stage['name']} form a loop")
+        seen.add(stage["name"])
+        stage = by_name[stage["model"]["from"]]
+    return stage["model"]
+
+
+# This function returns what the probe of a stage depends on: the model its chain starts from and the
+# train arguments that change the per-batch cost (data, imgsz, augmentation, ...)
+def probe_key(config: Dict, stage: Dict):
+    train_args = {k: v for k, v in stage_train_args(config, stage).items() if k not in PROBE_IGNORED_ARGS}
+    return base_model(config, stage), train_args
+
+
+# This function returns the probed threads / workers / batch setting for a stage.
+# threads fixes the thread count, for stages probed after torch was imported with it.
+# Results are cached per host, model and settings, so only the first run on a machine pays for the probe.
+def choose_setting(config: Dict, stage: Dict, reprobe: bool = False,
+                   threads: Optional[int] = None) -> Optional[ProbeResult]:
+    probe = config.get("probe") or {}
+    if not probe.get("enabled", True):
+        return None
+
+    model, train_args = probe_key(config, stage)
+    grid = {key: probe.get(key, "auto") for key in ("threads", "workers")}
+    if threads is not None:
+        grid["threads"] = [threads]
+    grid.update(batch=probe.get("batch", [8, 16, 32]), batches=probe.get("batches", 6), warmup=probe.get("warmup", 2),
+                memory_headroom=probe.get("memory_headroom", 0.8))
+    cache_path = os.path.join(TRAINING_DIR, probe.get("cache_path", "probe-results.json"))
+    fingerprint = probe_fingerprint(model, train_args, grid)
+
+    if not reprobe:
+        cached = load_cached_probe(cache_path, fingerprint)
+        if cached is not None:
+            print(f"Using probed setting from {cache_path}: threads={cached.threads}, workers={cached.workers}, "
+                  f"batch={cached.batch} ({cached.images_per_sec:.2f} img/s)")
+            return cached
+
+    result = find_fastest_setting(
+        model,
+        train_args,
+        thread_options=None if grid["threads"] == "auto" else grid["threads"],
+        worker_options=None if grid["workers"] == "auto" else grid["workers"],
+        batch_options=grid["batch"],
+        batches=grid["batches"],
+        warmup=grid["warmup"],
+        memory_headroom=grid["memory_headroom"],
+    )
+    if result is not None:
+        save_cached_probe(cache_path, fingerprint, result)
+    return result
+
+
+# This function trains one stage, records it in the run store and returns the path of its best.pt
+def run_stage(
+    stage: Dict,
+    model_path: str,
+    train_args: Dict,
+    setting: Optional[ProbeResult],
+    store: RunStore,
+    parent: Optional[str] = None,
+    profile: bool = True,
+    coreset: Optional[Dict] = None,
+    manifest_data: Optional[str] = None,
+    train_manifest: bool = True,
+    shards: Optional[Dict] = None,
+) -> str:
+    if coreset and shards:
+        raise ValueError(f"Stage {stage['name']}: coreset scores image files and cannot train from shards")
+    # torch reads the thread count once, when it is first imported
+    if setting is not None:
+        os.environ["OMP_NUM_THREADS"] = str(setting.threads)
+        os.environ["MKL_NUM_THREADS"] = str(setting.threads)
+    import torch
+    from ultralytics import YOLO
+
+    if setting is not None:
+        torch.set_num_threads(setting.threads)
+        # A batch or workers value set in the config wins over the probe
+        train_args = dict({"batch": setting.batch, "workers": setting.workers}, **train_args)
+
+    print(f"\n==== Stage {stage['name']}: {model_path} (batch {train_args.get('batch')}, "
+          f"workers {train_args.get('workers')}, threads {torch.get_num_threads()}) ====")
+    model = YOLO(model_path)
+    if profile:
+        # Writes profile.csv / profile.json to the run directory after every epoch
+        TrainingProfiler().attach(model)
+    if coreset:
+        # Scores the train images with the starting weights, trains on the selected subset and reselects it
+        # with the newest weights every refresh_every epochs
+        if parent is None:
+            print(f"Stage {stage['name']} does not warm start from an earlier stage, training on every image")
+        else:
+            CoresetRefresher(model_path, **coreset).attach(model)
+    trainer = None
+    if shards:
+        # Train and val images are read from packed splits (see shard_dataset.py)
+        from shard_dataset import shard_trainer
+        trainer = shard_trainer(shards)
+    results = model.train(name=stage["name"], trainer=trainer, **train_args)
+
+    # Metrics and weights go to the run store instead of a pickled results object
+    results_dir = str(model.trainer.save_dir)
+    run = store.record_run(results_dir, metadata={
+        "stage": stage["name"],
+        "parent": parent,
+        # Blob hash of the starting weights, or None when they are not a local file (e.g. a hub model name)
+        "init_weights": store.put_blob(model_path) if os.path.exists(model_path) else None,
+        "init_model": model_path,
+        "train_args": train_args,
+        "coreset": coreset,
+        "shards": shards,
+        "final_metrics": {k: float(v) for k, v in getattr(results, "results_dict", {}).items()},
+    })
+
+    # The next incremental run trains on what was added to the train split after this one.
+    # manifest_data is the full data.yaml when the run trained on a subset of it.
+    if train_manifest:
+        record_manifest(results_dir, manifest_data or train_args["data"], model_path)
+
+    print(f"\nTraining completed! Run recorded as '{run}' in {store.root}")
+    print(f"Plots, labels, and checkpoints are in '{results_dir}'")
+    return os.path.join(results_dir, "weights", "best.pt")
+
+
+# This function writes the train manifest of a finished run (see incremental_training.py).
+# It needs the preprocessing package; without it the run is trained as usual and only the manifest is skipped.
+def record_manifest(results_dir: str, data_yaml: str, model_path: str):
+    try:
+        from incremental_training import record_train_manifest
+    except ImportError as e:
+        print(f"No train manifest recorded ({e}): pip install -e scripts/data-preprocessing for incremental training")
+        return
+    # Hashes of unchanged files are taken from the manifest of the run this one started from
+    parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(model_path)))
+    try:
+        record_train_manifest(results_dir, data_yaml, parent_dir)
+    except ValueError as e:
+        print(f"No train manifest recorded: {e}")
+
+
+# This function fine-tunes the previous stage's best.pt on the images added since its run plus a replay sample
+# of older images, then compares the result with the previous model or a full retrain
+def run_incremental(config: Dict, incremental: Dict, no_probe: bool = False, reprobe: bool = False) -> str:
+    # Needs the preprocessing package for the manifests: pip install -e scripts/data-preprocessing
+    from incremental_training import compare_with_full, prepare_incremental
+
+    source = next(s for s in config["stages"] if s["name"] == incremental["previous"]["from"])
+    name = incremental.get("name", "object-detection-incremental")
+    previous_best = resolve_model(config, {"name": name, "model": incremental["previous"]}, {})
+    previous_dir = os.path.dirname(os.path.dirname(previous_best))
+
+    train_args = stage_train_args(config, source)
+    train_args.update({k: v for k, v in incremental.items() if k not in INCREMENTAL_KEYS})
+    data_yaml = train_args["data"]
+    data = prepare_incremental(previous_dir, data_yaml, run_dir(train_args, name) + "-data",
+                               incremental.get("replay_size", 1000), incremental.get("seed", 0))
+    print(f"Incremental data: {len(data.new_images)} new or changed images, {len(data.replay_images)} replayed")
+
+    setting = None if no_probe else choose_setting(config, source, reprobe)
+    store = RunStore(config.get("run_store", os.path.join("runs", "store")))
+    stage = {"name": name, "model": incremental["previous"]}
+    # The manifest of the incremental run covers the whole train split, not only the images it trained on
+    best = run_stage(stage, previous_best, dict(train_args, data=data.data_yaml), setting, store, source["name"],
+                     config.get("profile", True), manifest_data=data_yaml)
+
+    compare_with_full(os.path.dirname(os.path.dirname(best)), previous_dir, data, data_yaml, train_args.get("imgsz", 640),
+                      incremental.get("full_run"), incremental.get("full_epochs", 40))
+    return best
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Train the object detection model stage by stage from a YAML config.")
+    parser.add_argument("--config", default=DEFAULT_CONFIG, help="training config (default: training-config.yaml)")
+    parser.add_argument("--stage", action="append", dest="stages", metavar="NAME",
+                        help="stage to run, repeatable; default every stage in order")
+    parser.add_argument("--no-probe", action="store_true", help="skip the throughput probe, use Ultralytics defaults")
+    parser.add_argument("--reprobe", action="store_true", help="probe again even if a cached result matches")
+    parser.add_argument("--search", action="store_true",
+                        help="run the hyperparameter search of the config instead of training, see hyperparameter_search.py")
+    parser.add_argument("--incremental", action="store_true",
+                        help="fine-tune on the images added since the previous run, see incremental_training.py")
+    parser.add_argument("--distill", action="store_true",
+                        help="train the student of the config's distill block against its teacher, see distillation.py")
+    args = parser.parse_args(argv)
+
+    # Avoid OpenMP duplicate runtime crash
+    os.environ["KMP_DUPLICATE_LIB_OK"] = "TRUE"
+
+    config = load_config(args.config)
+    if args.search:
+        search = config["search"]
+        stage = next(s for s in config["stages"] if s["name"] == search["stage"])
+        run_search(config, search, resolve_model(config, stage, {}), stage_train_args(config, stage),
+                   search.get("project", os.path.join("runs", "search")))
+        return
+    if args.distill:
+        distill = config["distill"]
+        teacher = resolve_model(config, {"name": distill.get("name", "student"), "model": distill["teacher"]}, {})
+        run_distillation(distill, teacher, stage_train_args(config, {"name": "student", "model": None}))
+        return
+
+    if args.incremental:
+        run_incremental(config, config["incremental"], args.no_probe, args.reprobe)
+        return
+
+    stages = config["stages"]
+    if args.stages:
+        unknown = set(args.stages) - {s["name"] for s in stages}
+        if unknown:
+            parser.error(f"unknown stage(s): {', '.join(sorted(unknown))}")
+        stages = [s for s in stages if s["name"] in args.stages]
+
+    # The process can only set its thread count once: the first stage's probe chooses the threads for the run.
+    # A stage whose data, model or augmentation differs is probed again for batch and workers at those threads,
+    # so its batch is one whose memory use was measured with its own arguments.
+    setting = None if args.no_probe else choose_setting(config, stages[0], args.reprobe)
+
+    store = RunStore(config.get("run_store", os.path.join("runs", "store")))
+    trained: Dict[str, str] = {}
+    for stage in stages:
+        model_path = resolve_model(config, stage, trained)
+        parent = stage["model"]["from"] if isinstance(stage["model"], dict) else None
+        stage_setting = setting
+        if setting is not None and probe_key(config, stage) != probe_key(config, stages[0]):
+            print(f"\nStage {stage['name']} trains with other arguments than {stages[0]['name']}: "
+                  f"probing batch and workers at {setting.threads} threads")
+            stage_setting = choose_setting(config, stage, args.reprobe, threads=setting.threads)
+            if stage_setting is None:
+                print(f"No probed setting fits stage {stage['name']}; using the setting of {stages[0]['name']}")
+                stage_setting = setting
+        trained[stage["name"]] = run_stage(stage, model_path, stage_train_args(config, stage), stage_setting, store, parent,
+                                           config.get("profile", True), stage.get("coreset"),
+                                           train_manifest=config.get("train_manifest", True),
+                                           shards=stage.get("shards"))
+
+    print("\n**** SUMMARY ****")
+    for name, best in trained.items():
+        print(f"{name}: {best}")
+
+
+if __name__ == "__main__":
+    from multiprocessing import freeze_support
+    freeze_support()
+    main()
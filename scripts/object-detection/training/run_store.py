@@ -0,0 +1,261 @@
+import argparse
+import csv
+import hashlib
+import json
+import os
+import shutil
+import time
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+# Bump this when the layout below changes
+RUN_STORE_VERSION = "1.0"
+
+# Layout of a run store:
+#   blobs/ab/abcdef...      file contents, named by their sha256; identical files are stored once
+#   runs/<run>/run.json     metadata: train arguments, parent run, weights file -> blob hash,
+#                           init_weights (blob hash of the starting weights, or null) and init_model (as given)
+#   runs/<run>/metrics.npz  one float64 column per results.csv / profile.csv column, row per epoch
+# metrics.npz holds plain arrays only and is loaded without pickle.
+
+DEFAULT_METRIC = "metrics/mAP50-95(B)"
+WEIGHT_FILES = ("best.pt", "last.pt")
+PROFILE_PREFIX = "profile/"
+
+_HASH_CHUNK = 1 << 20
+
+
+# This function returns the sha256 of a file, read in 1 MB chunks
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_CHUNK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+# This function reads a CSV of numbers into columns; Ultralytics pads its column names with spaces
+def read_csv_columns(path: str, prefix: str = "") -> Dict[str, np.ndarray]:
+    with open(path, "r", newline="") as f:
+        rows = list(csv.reader(f))
+    if not rows:
+        return {}
+    header = [name.strip() for name in rows[0]]
+    columns = {}
+    for i, name in enumerate(header):
+        values = []
+        for row in rows[1:]:
+            try:
+                values.append(float(row[i]))
+            except (IndexError, ValueError):
+                values.append(np.nan)
+        columns[prefix + name] = np.array(values, dtype=np.float64)
+    return columns
+
+
+class RunStore:
+    """
+    Training runs kept as columnar metrics plus content-addressed weights.
+    Chained stages share weight files (a stage starts from the best.pt of the one before), and best.pt and
+    last.pt are often the same file; each distinct file is stored once.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.blob_dir = os.path.join(root, "blobs")
+        self.run_dir = os.path.join(root, "runs")
+        os.makedirs(self.blob_dir, exist_ok=True)
+        os.makedirs(self.run_dir, exist_ok=True)
+
+    def blob_path(self, digest: str) -> str:
+        return os.path.join(self.blob_dir, digest[:2], digest)
+
+    # Stores a file and returns its hash; a file already in the store is not copied again.
+    # Blobs are always copies, never hard links: Ultralytics and torch.save rewrite weight files in place,
+    # which would change a linked blob under its hash. record_run(remove_weights=True) frees the originals.
+    def put_blob(self, path: str) -> str:
+        digest = file_sha256(path)
+        target = self.blob_path(digest)
+        if not os.path.exists(target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            tmp = f"{target}.{os.getpid()}.tmp"
+            shutil.copyfile(path, tmp)
+            os.replace(tmp, target)
+        return digest
+
+    # Writes a copy of a stored file to dest, so writing to dest later leaves the blob intact
+    def checkout(self, digest: str, dest: str) -> str:
+        source = self.blob_path(digest)
+        if not os.path.exists(source):
+            raise FileNotFoundError(f"Blob {digest} is not in {self.blob_dir}")
+        os.makedirs(os.path.dirname(os.path.abspath(dest)), exist_ok=True)
+        tmp = f"{dest}.{os.getpid()}.tmp"
+        shutil.copyfile(source, tmp)
+        os.replace(tmp, dest)
+        return dest
+
+    # This function records an Ultralytics run directory: results.csv (and profile.csv) become metrics.npz,
+    # the weights go to the blob store. remove_weights deletes the originals once stored.
+    def record_run(
+        self,
+        run_dir: str,
+        name: Optional[str] = None,
+        metadata: Optional[Dict] = None,
+        weight_files: Sequence[str] = WEIGHT_FILES,
+        remove_weights: bool = False,
+    ) -> str:
+
+        name = name or os.path.basename(os.path.normpath(run_dir))
+        columns = {}
+        for file, prefix in (("results.csv", ""), ("profile.csv", PROFILE_PREFIX)):
+            path = os.path.join(run_dir, file)
+            if os.path.exists(path):
+                columns.update(read_csv_columns(path, prefix))
+
+        weights = {}
+        for file in weight_files:
+            path = os.path.join(run_dir, "weights", file)
+            if os.path.exists(path):
+                weights[file] = self.put_blob(path)
+
+        args_path = os.path.join(run_dir, "args.yaml")
+        record = {
+            "version": RUN_STORE_VERSION,
+            "name": name,
+            "source_dir": os.path.abspath(run_dir),
+            "recorded_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "epochs": int(len(next(iter(columns.values())))) if columns else 0,
+            "weights": weights,
+            "args_yaml": self.put_blob(args_path) if os.path.exists(args_path) else None,
+        }
+        record.update(metadata or {})
+
+        target = os.path.join(self.run_dir, name)
+        os.makedirs(target, exist_ok=True)
+        np.savez_compressed(os.path.join(target, "metrics.npz"), **columns)
+        with open(os.path.join(target, "run.json"), "w") as f:
+            json.dump(record, f, indent=2)
+
+        if remove_weights:
+            for file in weights:
+                os.remove(os.path.join(run_dir, "weights", file))
+        return name
+
+    def runs(self) -> List[str]:
+        return sorted(d for d in os.listdir(self.run_dir) if os.path.exists(os.path.join(self.run_dir, d, "run.json")))
+
+    def run_info(self, name: str) -> Dict:
+        with open(os.path.join(self.run_dir, name, "run.json"), "r") as f:
+            return json.load(f)
+
+    def metrics(self, name: str, columns: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+        with np.load(os.path.join(self.run_dir, name, "metrics.npz"), allow_pickle=False) as data:
+            keys = data.files if columns is None else [c for c in columns if c in data.files]
+            return {key: data[key] for key in keys}
+
+    # This function summarises one metric for every run (or the given ones): best value, its epoch,
+    # final value and total training time. mode is "max" for accuracy metrics, "min" for losses.
+    def compare(self, names: Optional[Sequence[str]] = None, metric: str = DEFAULT_METRIC, mode: str = "max") -> List[Dict]:
+        rows = []
+        for name in names or self.runs():
+            data = self.metrics(name, [metric, "epoch", "time"])
+            values = data.get(metric)
+            if values is None or not len(values) or np.isnan(values).all():
+                rows.append({"run": name, "epochs": 0, "best": None, "best_epoch": None, "final": None, "time_s": None})
+                continue
+            i = int(np.nanargmax(values) if mode == "max" else np.nanargmin(values))
+            epochs = data.get("epoch", np.arange(1, len(values) + 1))
+            times = data.get("time")
+            rows.append({
+                "run": name,
+                "epochs": len(values),
+                "best": float(values[i]),
+                "best_epoch": int(epochs[i]),
+                "final": float(values[-1]),
+                # Ultralytics' time column is cumulative
+                "time_s": float(np.nanmax(times)) if times is not None and len(times) else None,
+            })
+        return rows
+
+    # This function deletes blobs no run refers to any more and returns the bytes freed
+    def gc(self) -> int:
+        referenced = set()
+        for name in self.runs():
+            info = self.run_info(name)
+            referenced.update(info.get("weights", {}).values())
+            for key in ("args_yaml", "init_weights"):
+                if info.get(key):
+                    referenced.add(info[key])
+        freed = 0
+        for prefix in os.listdir(self.blob_dir):
+            for digest in os.listdir(os.path.join(self.blob_dir, prefix)):
+                if digest not in referenced:
+                    path = os.path.join(self.blob_dir, prefix, digest)
+                    freed += os.path.getsize(path)
+                    os.remove(path)
+        return freed
+
+    def size(self) -> int:
+        return sum(os.path.getsize(os.path.join(dirpath, f)) for dirpath, _, files in os.walk(self.root) for f in files)
+
+
+# This function records every Ultralytics run directory under runs_dir (e.g. runs/detect) that has a results.csv
+def import_runs(store: RunStore, runs_dir: str, remove_weights: bool = False) -> List[str]:
+    names = []
+    for entry in sorted(os.listdir(runs_dir)):
+        run_dir = os.path.join(runs_dir, entry)
+        if os.path.exists(os.path.join(run_dir, "results.csv")):
+            names.append(store.record_run(run_dir, remove_weights=remove_weights))
+            print(f"Recorded {run_dir}")
+    return names
+
+
+def print_comparison(rows: List[Dict], metric: str):
+    print(f"\n**** {metric} ****")
+    print(f"{'run':<32} {'epochs':>6} {'best':>8} {'at':>4} {'final':>8} {'time':>9}")
+    for row in rows:
+        if row["best"] is None:
+            print(f"{row['run']:<32} {'-':>6}")
+            continue
+        time_s = f"{row['time_s'] / 3600:.2f}h" if row["time_s"] is not None else "-"
+        print(f"{row['run']:<32} {row['epochs']:>6} {row['best']:>8.4f} {row['best_epoch']:>4} {row['final']:>8.4f} {time_s:>9}")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Store and compare training runs without unpickling results.")
+    parser.add_argument("--store", default="runs/store", help="run store directory (default: runs/store)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("import", help="record every run directory under RUNS_DIR")
+    p.add_argument("runs_dir", nargs="?", default="runs/detect")
+    p.add_argument("--remove-weights", action="store_true", help="delete the weights in the run directories once stored")
+
+    p = commands.add_parser("compare", help="best and final value of a metric for each run")
+    p.add_argument("runs", nargs="*")
+    p.add_argument("--metric", default=DEFAULT_METRIC)
+    p.add_argument("--min", action="store_true", help="lower is better (losses)")
+
+    p = commands.add_parser("checkout", help="write the weights of a run to a file")
+    p.add_argument("run")
+    p.add_argument("dest")
+    p.add_argument("--file", default="best.pt", choices=WEIGHT_FILES)
+
+    commands.add_parser("gc", help="delete blobs no run refers to")
+    args = parser.parse_args(argv)
+
+    store = RunStore(args.store)
+    if args.command == "import":
+        import_runs(store, args.runs_dir, args.remove_weights)
+        print(f"Store size: {store.size() / 1e6:.1f} MB ({args.store})")
+    elif args.command == "compare":
+        print_comparison(store.compare(args.runs or None, args.metric, "min" if args.min else "max"), args.metric)
+    elif args.command == "checkout":
+        digest = store.run_info(args.run)["weights"][args.file]
+        print(f"Wrote {store.checkout(digest, args.dest)}")
+    elif args.command == "gc":
+        print(f"Freed {store.gc() / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import io
+import math
+import os
+from typing import Dict, List
+
+import cv2
+import numpy as np
+from PIL import Image
+from ultralytics.data import YOLODataset
+from ultralytics.data.utils import exif_size
+from ultralytics.models.yolo.detect import DetectionTrainer
+from ultralytics.utils import colorstr
+from ultralytics.utils.torch_utils import de_parallel
+
+# Shards come from the preprocessing package: pip install -e scripts/data-preprocessing
+from homebuddy_preprocessing.shard_pack import ShardReader
+
+# A stage trains from packed splits (homebuddy-preprocess pack) with  shards: {train: <dir>, val: <dir>}.
+# Images and labels are read from the memory-mapped shards by sample index instead of one file each;
+# augmentation, batching and validation are Ultralytics' own. A mode without a shard directory reads files.
+
+
+class ShardDataset(YOLODataset):
+    """
+    YOLODataset over a packed split. Image paths are virtual (<shard_dir>/<image name>) and only name samples;
+    images are decoded from the shard bytes and labels parsed from the packed label text.
+    Every process opens its own reader, so the dataset can be sent to spawned dataloader workers.
+    """
+
+    def __init__(self, *args, shard_dir: str, **kwargs):
+        self.shard_dir = shard_dir
+        self._reader = None
+        if kwargs.get("cache") == "disk":
+            raise ValueError("cache: disk writes .npy files next to the images; packed splits support cache: ram or false")
+        super().__init__(*args, **kwargs)
+
+    @property
+    def reader(self) -> ShardReader:
+        if self._reader is None:
+            self._reader = ShardReader(self.shard_dir)
+        return self._reader
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_reader"] = None
+        return state
+
+    def get_img_files(self, img_path) -> List[str]:
+        files = [os.path.join(self.shard_dir, name) for name in self.reader.names]
+        if self.fraction < 1:
+            files = files[:round(len(files) * self.fraction)]
+        return files
+
+    def _sample(self, im_file: str) -> int:
+        return self.reader.position(os.path.basename(im_file))
+
+    def get_labels(self) -> List[Dict]:
+        self.label_files = [os.path.splitext(f)[0] + ".txt" for f in self.im_files]
+        labels, skipped = [], 0
+        for im_file in self.im_files:
+            i = self._sample(im_file)
+            rows = []
+            for line in (self.reader.label_text(i) or "").splitlines():
+                parts = line.split()
+                if len(parts) == 5:
+                    rows.append([float(p) for p in parts])
+                elif parts:
+                    skipped += 1
+            rows = np.array(rows, dtype=np.float32).reshape(-1, 5)
+            with Image.open(io.BytesIO(self.reader.image_bytes(i))) as img:
+                w, h = exif_size(img)
+            labels.append({"im_file": im_file, "shape": (h, w), "cls": rows[:, :1], "bboxes": rows[:, 1:],
+                           "segments": [], "keypoints": None, "normalized": True, "bbox_format": "xywh"})
+        if skipped:
+            print(f"{self.prefix}{skipped} label lines in {self.shard_dir} are not 'class cx cy w h' and were skipped")
+        return labels
+
+    # As BaseDataset.load_image, with the image decoded from the shard instead of read from a file
+    def load_image(self, i: int, rect_mode: bool = True):
+        if self.ims[i] is not None:
+            return self.ims[i], self.im_hw0[i], self.im_hw[i]
+
+        data = np.frombuffer(self.reader.image_bytes(self._sample(self.im_files[i])), dtype=np.uint8)
+        im = cv2.imdecode(data, cv2.IMREAD_COLOR)
+        if im is None:
+            raise FileNotFoundError(f"Image not decodable: {self.im_files[i]}")
+        h0, w0 = im.shape[:2]
+        if rect_mode:
+            r = self.imgsz / max(h0, w0)
+            if r != 1:
+                w, h = min(math.ceil(w0 * r), self.imgsz), min(math.ceil(h0 * r), self.imgsz)
+                im = cv2.resize(im, (w, h), interpolation=cv2.INTER_LINEAR)
+        elif not (h0 == w0 == self.imgsz):
+            im = cv2.resize(im, (self.imgsz, self.imgsz), interpolation=cv2.INTER_LINEAR)
+
+        if self.augment:
+            self.ims[i], self.im_hw0[i], self.im_hw[i] = im, (h0, w0), im.shape[:2]
+            self.buffer.append(i)
+            if 1 < len(self.buffer) >= self.max_buffer_length:
+                j = self.buffer.pop(0)
+                if self.cache != "ram":
+                    self.ims[j], self.im_hw0[j], self.im_hw[j] = None, None, None
+        return im, (h0, w0), im.shape[:2]
+
+
+# This function returns a DetectionTrainer that builds its train and val datasets from packed splits.
+# shards maps a mode ("train", "val") to the directory written by homebuddy-preprocess pack.
+def shard_trainer(shards: Dict[str, str]):
+
+    class ShardTrainer(DetectionTrainer):
+        def build_dataset(self, img_path, mode="train", batch=None):
+            shard_dir = shards.get(mode)
+            if shard_dir is None:
+                return super().build_dataset(img_path, mode, batch)
+            cfg = self.args
+            stride = max(int(de_parallel(self.model).stride.max() if self.model else 0), 32)
+            return ShardDataset(
+                img_path=shard_dir,
+                shard_dir=shard_dir,
+                imgsz=cfg.imgsz,
+                batch_size=batch,
+                augment=mode == "train",
+                hyp=cfg,
+                rect=cfg.rect or mode == "val",
+                cache=cfg.cache or None,
+                single_cls=cfg.single_cls or False,
+                stride=stride,
+                pad=0.0 if mode == "train" else 0.5,
+                prefix=colorstr(f"{mode}: "),
+                task=cfg.task,
+                classes=cfg.classes,
+                data=self.data,
+                fraction=cfg.fraction if mode == "train" else 1.0,
+            )
+
+    return ShardTrainer
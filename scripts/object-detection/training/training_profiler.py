@@ -0,0 +1,202 @@
+import csv
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+import psutil
+
+# Columns of the per-epoch profile, in CSV order
+PROFILE_FIELDS = (
+    "epoch",
+    "batches",
+    "images",
+    "data_wait_s",         # waiting for the dataloader (loading, mosaic/mixup augmentation, collation)
+    "compute_s",           # preprocessing, forward, backward and optimizer step
+    "val_s",               # validation after the epoch
+    "epoch_s",             # wall time from epoch start to the end of validation
+    "train_images_per_sec",
+    "peak_rss_gb",         # training process plus dataloader workers
+    "process_cpu_percent", # CPU time of the same processes, 100% = every logical core busy
+    "system_cpu_percent",
+)
+
+# An epoch is reported as dataloader-bound when waiting for data takes this share of the training time
+DATA_BOUND_SHARE = 0.3
+
+
+class _RssSampler:
+    """Samples the memory of a process and its children in a background thread and keeps the peak."""
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.process = psutil.Process()
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _tree(self) -> List[psutil.Process]:
+        try:
+            return [self.process] + self.process.children(recursive=True)
+        except psutil.Error:
+            return [self.process]
+
+    def rss(self) -> int:
+        total = 0
+        for p in self._tree():
+            try:
+                total += p.memory_info().rss
+            except psutil.Error:
+                continue
+        return total
+
+    def cpu_seconds(self) -> float:
+        total = 0.0
+        for p in self._tree():
+            try:
+                t = p.cpu_times()
+                total += t.user + t.system
+            except psutil.Error:
+                continue
+        return total
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self.rss())
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def reset_peak(self) -> int:
+        peak, self.peak = max(self.peak, self.rss()), 0
+        return peak
+
+    def stop(self):
+        self._stop.set()
+
+
+class TrainingProfiler:
+    """
+    Per-epoch throughput profile of an Ultralytics training run, collected through callbacks.
+    The time between the end of one batch and the start of the next is dataloader wait; the time
+    inside a batch is compute. Results go to profile.csv and profile.json in the run directory.
+    """
+
+    def __init__(self, sample_interval: float = 0.5, print_summary: bool = True):
+        self.sample_interval = sample_interval
+        self.print_summary = print_summary
+        self.epochs: List[Dict] = []
+        self._sampler: Optional[_RssSampler] = None
+        self._reset_epoch()
+
+    def _reset_epoch(self):
+        self._epoch_start = self._mark = time.perf_counter()
+        self._wait = self._compute = 0.0
+        self._batches = 0
+        self._train_end = None
+        self._cpu_start = self._sampler.cpu_seconds() if self._sampler else 0.0
+
+    # This function registers the callbacks on a YOLO model; call it before model.train()
+    def attach(self, model):
+        model.add_callback("on_train_start", self.on_train_start)
+        model.add_callback("on_train_epoch_start", self.on_train_epoch_start)
+        model.add_callback("on_train_batch_start", self.on_train_batch_start)
+        model.add_callback("on_train_batch_end", self.on_train_batch_end)
+        model.add_callback("on_train_epoch_end", self.on_train_epoch_end)
+        model.add_callback("on_fit_epoch_end", self.on_fit_epoch_end)
+        model.add_callback("on_train_end", self.on_train_end)
+        return self
+
+    def on_train_start(self, trainer):
+        self._sampler = _RssSampler(self.sample_interval)
+        self._sampler.start()
+        psutil.cpu_percent(interval=None)
+
+    def on_train_epoch_start(self, trainer):
+        self._reset_epoch()
+        self._sampler.reset_peak()
+        psutil.cpu_percent(interval=None)
+
+    def on_train_batch_start(self, trainer):
+        now = time.perf_counter()
+        self._wait += now - self._mark
+        self._mark = now
+
+    def on_train_batch_end(self, trainer):
+        now = time.perf_counter()
+        self._compute += now - self._mark
+        self._mark = now
+        self._batches += 1
+
+    def on_train_epoch_end(self, trainer):
+        self._train_end = time.perf_counter()
+
+    # Called after validation, so the epoch row includes the validation time
+    def on_fit_epoch_end(self, trainer):
+        now = time.perf_counter()
+        train_end = self._train_end or now
+        epoch_s = now - self._epoch_start
+        train_s = self._wait + self._compute
+        images = min(self._batches * trainer.batch_size, len(trainer.train_loader.dataset))
+        cpu_s = self._sampler.cpu_seconds() - self._cpu_start
+
+        self.epochs.append({
+            "epoch": trainer.epoch + 1,
+            "batches": self._batches,
+            "images": images,
+            "data_wait_s": round(self._wait, 3),
+            "compute_s": round(self._compute, 3),
+            "val_s": round(now - train_end, 3),
+            "epoch_s": round(epoch_s, 3),
+            "train_images_per_sec": round(images / train_s, 2) if train_s else 0.0,
+            "peak_rss_gb": round(self._sampler.reset_peak() / 1e9, 3),
+            "process_cpu_percent": round(100 * cpu_s / (epoch_s * (psutil.cpu_count() or 1)), 1) if epoch_s else 0.0,
+            "system_cpu_percent": psutil.cpu_percent(interval=None),
+        })
+        self.save(str(trainer.save_dir))
+
+    def on_train_end(self, trainer):
+        if self._sampler:
+            self._sampler.stop()
+        self.save(str(trainer.save_dir))
+        if self.print_summary:
+            self.summary()
+
+    def save(self, run_dir: str):
+        with open(os.path.join(run_dir, "profile.csv"), "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=PROFILE_FIELDS)
+            writer.writeheader()
+            writer.writerows(self.epochs)
+        with open(os.path.join(run_dir, "profile.json"), "w") as f:
+            json.dump({"epochs": self.epochs, "totals": self.totals()}, f, indent=2)
+
+    def totals(self) -> Dict:
+        if not self.epochs:
+            return {}
+        wait = sum(e["data_wait_s"] for e in self.epochs)
+        compute = sum(e["compute_s"] for e in self.epochs)
+        images = sum(e["images"] for e in self.epochs)
+        return {
+            "epochs": len(self.epochs),
+            "data_wait_s": round(wait, 3),
+            "compute_s": round(compute, 3),
+            "val_s": round(sum(e["val_s"] for e in self.epochs), 3),
+            "data_wait_share": round(wait / (wait + compute), 3) if wait + compute else 0.0,
+            "train_images_per_sec": round(images / (wait + compute), 2) if wait + compute else 0.0,
+            "peak_rss_gb": max(e["peak_rss_gb"] for e in self.epochs),
+            "bottleneck": "dataloader" if wait >= DATA_BOUND_SHARE * (wait + compute) else "compute",
+        }
+
+    def summary(self):
+        print("\n**** TRAINING PROFILE ****")
+        print(f"{'epoch':>5} {'wait s':>8} {'compute s':>10} {'val s':>7} {'img/s':>7} {'peak GB':>8} {'cpu %':>6}")
+        for e in self.epochs:
+            print(f"{e['epoch']:>5} {e['data_wait_s']:>8.1f} {e['compute_s']:>10.1f} {e['val_s']:>7.1f} "
+                  f"{e['train_images_per_sec']:>7.2f} {e['peak_rss_gb']:>8.2f} {e['process_cpu_percent']:>6.1f}")
+        totals = self.totals()
+        if totals:
+            print(f"Dataloader wait: {totals['data_wait_share']:.0%} of training time, "
+                  f"{totals['train_images_per_sec']:.2f} img/s, peak {totals['peak_rss_gb']:.2f} GB "
+                  f"-> {totals['bottleneck']}-bound")